@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_customuser_department_customuser_employee_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', '-date_joined'], name='user_role_joined_idx'),
+        ),
+    ]
@@ -67,6 +67,12 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin employee list and role counts
+            models.Index(fields=['role', '-date_joined'], name='user_role_joined_idx'),
+        ]
+
     def __str__(self):
         return f"{self.email} ({self.get_role_display()})"
     
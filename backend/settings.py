@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -182,6 +183,26 @@ DATABASES = {
     }
 }
 
+# Caches
+# In-progress assessments live in their own cache until the last answer.
+# The file-based default is shared by every worker on the host and survives
+# restarts; point ASSESSMENT_CACHE_BACKEND at Redis/Memcached for several hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'assessments': {
+        'BACKEND': os.getenv('ASSESSMENT_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('ASSESSMENT_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'assessments')),
+        'TIMEOUT': int(os.getenv('ASSESSMENT_STATE_TTL_SECONDS', '604800')),
+        'OPTIONS': {
+            # Culling would silently drop someone's half-finished assessment
+            'MAX_ENTRIES': int(os.getenv('ASSESSMENT_CACHE_MAX_ENTRIES', '100000')),
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import ChatSession
+
+
+@admin.register(ChatSession)
+class ChatSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'completed_at', 'burnout_level', 'burnout_score', 'validated_score', 'validated_at']
+    list_filter = ['is_complete', 'burnout_level', 'llm_status']
+    list_editable = ['validated_score']
+    readonly_fields = ['burnout_score', 'burnout_level', 'completed_at', 'validated_at']
+
+    def save_model(self, request, obj, form, change):
+        # Also runs for list_editable rows; fine-tuning picks sessions up by this time
+        if 'validated_score' in form.changed_data:
+            obj.validated_at = timezone.now() if obj.validated_score is not None else None
+        super().save_model(request, obj, form, change)
@@ -7,22 +7,34 @@ import warnings
 warnings.filterwarnings('ignore')
 import logging
 
+from ml_model.data_processing import simple_burnout_classification
+from ml_model.early_exit import EarlyExitStats
+from ml_model.prediction_utils import early_exit_margin_from_env, embed_texts, score_long_text, score_texts
+
 logger = logging.getLogger(__name__)
 
+LEVEL_RECOMMENDATIONS = {
+    "LOW": "Maintain healthy work habits and self-care",
+    "MODERATE": "Monitor stress levels and implement coping strategies",
+    "HIGH": "Seek professional support and consider workplace changes",
+}
+
 class AssessmentCalculator:
     def __init__(self, model_path='ml_model/ultimate_burnout_model.pth'):
         self.model_path = model_path
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.tokenizer = None
         self.model = None
+        self.early_exit_margin = early_exit_margin_from_env()
+        self.exit_stats = None
         self._load_model()
     
     def _load_model(self):
         try:
-            from ml_model.model_architecture import UltimateBurnoutClassifier
+            from ml_model.model_architecture import build_classifier, load_architecture_config
             
             self.tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
-            self.model = UltimateBurnoutClassifier()
+            self.model = build_classifier(load_architecture_config(self.model_path))
             
             if torch.cuda.is_available():
                 self.model.load_state_dict(torch.load(self.model_path))
@@ -31,6 +43,7 @@ class AssessmentCalculator:
             
             self.model.to(self.device)
             self.model.eval()
+            self.exit_stats = EarlyExitStats(self.model.encoder.config.n_layers)
             logger.info("ML Model loaded successfully")
             
         except Exception as e:
@@ -50,41 +63,43 @@ class AssessmentCalculator:
     def predict_burnout(self, text):
         try:
             text = self.clean_text(text)
+            score = score_texts(
+                self.model, self.tokenizer, [text], self.device,
+                early_exit_margin=self.early_exit_margin,
+                exit_stats=self.exit_stats,
+            )[0]
 
-            encoding = self.tokenizer(
-                text, 
-                truncation=True, 
-                padding='max_length',
-                max_length=128, 
-                return_tensors='pt'
-            )
-
-            with torch.no_grad():
-                input_ids = encoding['input_ids'].to(self.device)
-                attention_mask = encoding['attention_mask'].to(self.device)
-                score = self.model(input_ids, attention_mask).item()
-
-            if score < 0.33:
-                level, color = "LOW", "🟢"
-                recommendation = "Maintain healthy work habits and self-care"
-            elif score < 0.67:
-                level, color = "MODERATE", "🟡" 
-                recommendation = "Monitor stress levels and implement coping strategies"
-            else:
-                level, color = "HIGH", "🔴"
-                recommendation = "Seek professional support and consider workplace changes"
-            
-            return {
-                'score': score,
-                'level': level,
-                'color': color,
-                'recommendation': recommendation
-            }
+            return self._result_for_score(score)
             
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             return self._fallback_scoring(text)
     
+    def analyze_text(self, text):
+        """Score a free-form message of any length.
+
+        Messages over 128 tokens are split into overlapping windows that are
+        scored together in one batch and combined, instead of being truncated.
+        """
+        try:
+            score, window_scores = score_long_text(
+                self.model, self.tokenizer, self.clean_text(text), self.device,
+                early_exit_margin=self.early_exit_margin,
+                exit_stats=self.exit_stats,
+            )
+        except Exception as e:
+            logger.error(f"Text analysis error: {e}")
+            return self._fallback_scoring(text)
+
+        result = self._result_for_score(score)
+        result['windows'] = len(window_scores)
+        result['peak_score'] = max(window_scores)
+        return result
+
+    def embed_texts(self, texts):
+        """Sentence embeddings from the fine-tuned encoder, one row per text"""
+        return embed_texts(self.model, self.tokenizer, texts, self.device)
+    
     def _fallback_scoring(self, text):
         text_lower = text.lower()
         
@@ -101,15 +116,12 @@ class AssessmentCalculator:
         else:
             score = 0.5
             
-        if score < 0.33:
-            level, color = "LOW", "🟢"
-            recommendation = "Maintain healthy work habits and self-care"
-        elif score < 0.67:
-            level, color = "MODERATE", "🟡"
-            recommendation = "Monitor stress levels and implement coping strategies"
-        else:
-            level, color = "HIGH", "🔴"
-            recommendation = "Seek professional support and consider workplace changes"
+        return self._result_for_score(score)
+
+    def _result_for_score(self, score):
+        # Same boundaries the evaluation gate and early exit use
+        level, color = simple_burnout_classification(score)
+        recommendation = LEVEL_RECOMMENDATIONS[level]
         
         return {
             'score': score,
@@ -0,0 +1,211 @@
+"""In-progress assessments, kept in the cache until the last answer.
+
+An assessment used to write its ``ChatSession`` on start and one
+``ChatMessage`` per question and answer. On SQLite each of those is its own
+autocommit transaction. Now the questions and answers asked so far live in
+the ``assessments`` cache, one entry per user. Only the finished assessment
+is written: the session row and its whole transcript, in one transaction.
+
+The ``assessments`` cache is file-based by default (see ``CACHES`` in
+settings). Every worker on the host shares it, and it survives a restart, so
+a half-finished assessment can be resumed by whichever worker gets the next
+answer.
+
+Each assessment carries an ``assessment_id`` UUID from its first question
+to its stored ``ChatSession``. Updates to one user's entry run under
+``locked(user)``, so concurrent answers (double clicks, two tabs) cannot
+overwrite each other. Completion is idempotent: the finished entry is
+replaced by a marker that points at the stored session, and
+``assessment_id`` is unique on ``ChatSession``.
+"""
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .conversation_flow import ConversationFlow
+from .models import ChatMessage, ChatSession
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to cache.add locks
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'assessments'
+LOCK_WAIT_SECONDS = 10.0
+# A crashed holder's cache lock expires on its own after this long
+LOCK_TTL_SECONDS = 30
+LOCK_POLL_SECONDS = 0.05
+# How long a resent last answer still gets the stored result back
+COMPLETED_MARKER_SECONDS = 600
+
+
+class AssessmentBusy(Exception):
+    """Another request holds this user's assessment for longer than LOCK_WAIT_SECONDS"""
+
+
+class AssessmentConflict(Exception):
+    """The assessment_id is already stored for a different user"""
+
+
+class AssessmentStateStore:
+    """One in-progress assessment per user: ``{'id', 'started_at', 'messages'}``.
+
+    Messages are plain dicts with the ``ChatMessage`` fields, so entries
+    stay readable by every worker version. A finished assessment leaves
+    ``{'id', 'completed_session_id'}`` behind for a while.
+    """
+
+    def __init__(self, alias=CACHE_ALIAS):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, user_id):
+        return f"assessment:{user_id}"
+
+    @contextmanager
+    def locked(self, user):
+        """Serialise read-modify-write of one user's entry across threads and workers"""
+        cache = self.cache
+        if fcntl is not None and isinstance(cache, FileBasedCache):
+            # FileBasedCache.add is check-then-set, so lock a file next to the entries instead
+            os.makedirs(cache._dir, exist_ok=True)
+            with open(os.path.join(cache._dir, f"assessment-{user.pk}.lock"), 'a') as handle:
+                self._acquire(lambda: _try_flock(handle))
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+            return
+
+        lock_key = self.key(user.pk) + ':lock'
+        self._acquire(lambda: cache.add(lock_key, 1, timeout=LOCK_TTL_SECONDS))
+        try:
+            yield
+        finally:
+            cache.delete(lock_key)
+
+    @staticmethod
+    def _acquire(try_lock):
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while not try_lock():
+            if time.monotonic() > deadline:
+                raise AssessmentBusy("Another request is still updating this assessment")
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def start(self, user, first_question):
+        """Begin a new assessment, replacing any unfinished one"""
+        state = {'id': str(uuid.uuid4()), 'started_at': timezone.now(), 'messages': []}
+        message = self.add_message(state, 'question', first_question['question'], first_question['id'])
+        with self.locked(user):
+            self.save(user, state)
+        return state, message
+
+    def from_answers(self, answers, assessment_id=None):
+        """A finished assessment from answers keyed by ConversationFlow field, never cached"""
+        state = {'id': str(assessment_id or uuid.uuid4()), 'started_at': timezone.now(), 'messages': []}
+        for question in ConversationFlow.get_questions():
+            self.add_message(state, 'question', question['question'], question['id'])
+            self.add_message(state, 'answer', answers[question['field']], question['id'])
+        return state
+
+    def get(self, user):
+        return self.cache.get(self.key(user.pk))
+
+    def save(self, user, state):
+        self.cache.set(self.key(user.pk), state)
+
+    def discard(self, user):
+        self.cache.delete(self.key(user.pk))
+
+    @staticmethod
+    def add_message(state, message_type, content, question_id=None):
+        timestamp = timezone.now()
+        if state['messages']:
+            # Transcripts are ordered by timestamp; keep them strictly increasing on coarse clocks
+            timestamp = max(timestamp, state['messages'][-1]['timestamp'] + timedelta(microseconds=1))
+        message = {
+            'message_type': message_type,
+            'content': content,
+            'question_id': question_id,
+            'timestamp': timestamp,
+        }
+        state['messages'].append(message)
+        return message
+
+    def persist(self, user, state, discard=True, **session_fields):
+        """Write the session and its transcript in one transaction.
+
+        Costs one INSERT for the session and one bulk INSERT for the
+        messages. Returns ``(session, messages, created)``. If this
+        assessment was already stored, the stored one comes back with
+        ``created=False``; if another user owns its ``assessment_id``,
+        ``AssessmentConflict`` is raised. The cache entry is only replaced
+        after the commit, so a failed write leaves the assessment ready for
+        the answer to be resent. Pass ``discard=False`` for states that
+        never came from the cache.
+        """
+        try:
+            with transaction.atomic():
+                chat_session = ChatSession.objects.create(
+                    user=user,
+                    assessment_id=state['id'],
+                    started_at=state['started_at'],
+                    **session_fields
+                )
+                messages = ChatMessage.objects.bulk_create(
+                    ChatMessage(session=chat_session, **message) for message in state['messages']
+                )
+            created = True
+            logger.info("Persisted assessment %s with %d messages", chat_session.id, len(messages))
+        except IntegrityError:
+            chat_session = self.stored_session(user, state['id'])
+            if chat_session is None:
+                raise
+            messages = list(chat_session.messages.order_by('timestamp'))
+            created = False
+            logger.info("Assessment %s was already stored as session %s", state['id'], chat_session.id)
+
+        if discard:
+            self.cache.set(
+                self.key(user.pk),
+                {'id': state['id'], 'completed_session_id': chat_session.id},
+                timeout=COMPLETED_MARKER_SECONDS,
+            )
+        return chat_session, messages, created
+
+
+    @staticmethod
+    def stored_session(user, assessment_id):
+        """The user's session stored for ``assessment_id``, or None.
+
+        ``assessment_id`` is unique across all users, so an id that is
+        already another user's raises ``AssessmentConflict``.
+        """
+        chat_session = ChatSession.objects.filter(assessment_id=assessment_id).first()
+        if chat_session is not None and chat_session.user_id != user.pk:
+            raise AssessmentConflict("This assessment_id is already in use")
+        return chat_session
+
+
+def _try_flock(handle):
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+assessment_store = AssessmentStateStore()
@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot.assessment_logic import assessment_calculator
+from ml_model.semantic_cache import SemanticRecommendationCache
+
+
+class Command(BaseCommand):
+    help = ("Check the semantic recommendation cache threshold against held-out answer-set pairs "
+            "labelled same/different")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'pairs',
+            help='JSON list of {"burnout_level", "answers_a", "answers_b", "same"}; answers are lists of strings',
+        )
+        parser.add_argument('--threshold', type=float, help="Threshold to check (default: LLM_CACHE_THRESHOLD)")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['pairs']) as handle:
+                pairs = [
+                    (
+                        item['burnout_level'],
+                        [{'response': answer} for answer in item['answers_a']],
+                        [{'response': answer} for answer in item['answers_b']],
+                        bool(item['same']),
+                    )
+                    for item in json.load(handle)
+                ]
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            raise CommandError(f"Could not read pairs file: {exc}")
+
+        cache = SemanticRecommendationCache(assessment_calculator.embed_texts, threshold=options['threshold'])
+        report = cache.calibrate(pairs)
+        if report['same'] is None or report['different'] is None:
+            raise CommandError("Need at least one same and one different pair at matching levels and answer counts")
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for group in ('same', 'different'):
+            stats = report[group]
+            self.stdout.write(
+                f"{group:>9}: {stats['count']} pairs, similarity "
+                f"min {stats['min']:.4f}  median {stats['median']:.4f}  max {stats['max']:.4f}"
+            )
+        self.stdout.write(
+            f"Threshold {report['threshold']}: {report['same_hit_rate']:.0%} of same pairs hit, "
+            f"{report['false_hits']} different pairs hit"
+        )
+        self.stdout.write(
+            f"Lowest threshold with no false hit: {report['min_safe_threshold']:.4f} "
+            f"({report['same_hit_rate_at_min_safe']:.0%} of same pairs hit)"
+        )
+        if report['false_hits']:
+            raise CommandError("The threshold lets different answer sets share recommendations; raise LLM_CACHE_THRESHOLD")
+        self.stdout.write(self.style.SUCCESS("No different pair would share recommendations"))
@@ -0,0 +1,166 @@
+import random
+import re
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from chatbot.models import ChatMessage, ChatSession
+from chatbot.serializers import ChatSessionSummarySerializer
+
+# Plan lines that mean a whole table is read, per backend
+FULL_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)\s*$'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+EXTRA_SORT = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?Sort\b', re.MULTILINE),
+}
+LEVELS = ('LOW', 'MODERATE', 'HIGH')
+
+
+class Command(BaseCommand):
+    help = ("Load a large synthetic chat dataset and print the EXPLAIN plan of every chatbot, "
+            "training and admin query, flagging full table scans")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--sessions-per-user', type=int, default=50)
+        parser.add_argument('--messages-per-session', type=int, default=13)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true', help="Commit the synthetic rows instead of rolling them back")
+        parser.add_argument('--fail-on-scan', action='store_true', help="Exit non-zero if any query reads a whole table")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['sessions_per_user'] < 1:
+            raise CommandError("--users and --sessions-per-user must be at least 1")
+
+        with transaction.atomic():
+            user = self._load(options)
+            scans = self._explain_all(user)
+            if not options['keep']:
+                # Plans were taken inside the transaction; nothing synthetic is left behind
+                transaction.set_rollback(True)
+
+        if scans:
+            message = f"{len(scans)} queries read a whole table: {', '.join(scans)}"
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every query is served by an index"))
+
+    def _load(self, options):
+        rng = random.Random(options['seed'])
+        run = uuid.uuid4().hex[:8]
+        User = get_user_model()
+        password = make_password(None)
+        now = timezone.now()
+
+        users = User.objects.bulk_create(
+            [User(email=f"explain-{run}-{index}@example.invalid", password=password,
+                  role='ADMIN' if index % 50 == 0 else 'EMPLOYEE')
+             for index in range(options['users'])],
+            batch_size=1000,
+        )
+
+        sessions = []
+        for user in users:
+            for index in range(options['sessions_per_user']):
+                # Only finished assessments are stored; in-progress ones live in the cache
+                score = rng.random()
+                validated = rng.random() < 0.3
+                started_at = now - timedelta(minutes=rng.randint(0, 525600))
+                sessions.append(ChatSession(
+                    user=user,
+                    started_at=started_at,
+                    is_complete=True,
+                    completed_at=started_at + timedelta(minutes=rng.randint(2, 30)),
+                    burnout_score=score,
+                    burnout_level=LEVELS[min(int(score * 3), 2)],
+                    validated_score=score if validated else None,
+                    validated_at=started_at + timedelta(days=rng.randint(1, 30)) if validated else None,
+                    llm_status=rng.choice(('ready', 'ready', 'ready', 'failed', 'pending')),
+                ))
+        sessions = ChatSession.objects.bulk_create(sessions, batch_size=1000)
+
+        kinds = ('question', 'answer')
+        ChatMessage.objects.bulk_create(
+            (ChatMessage(session=session, message_type=kinds[index % 2] if index < 12 else 'system',
+                         content=f"Synthetic message {index}", question_id=index // 2 + 1 if index < 12 else None)
+             for session in sessions for index in range(options['messages_per_session'])),
+            batch_size=2000,
+        )
+
+        if connection.vendor in ('sqlite', 'postgresql'):
+            # Give the planner statistics for the new rows
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(
+            f"Loaded {len(users)} users, {len(sessions)} sessions and "
+            f"{len(sessions) * options['messages_per_session']} messages ({connection.vendor})"
+        )
+        return users[1] if len(users) > 1 else users[0]
+
+    def _queries(self, user):
+        session = ChatSession.objects.filter(user=user).order_by('-started_at').first()
+        history = ChatSession.objects.filter(user=user).order_by('-started_at', '-id')
+        labelled = ChatSession.objects.filter(is_complete=True, validated_score__isnull=False)
+        changelist = ChatSession.objects.select_related('user').order_by('-started_at', '-pk')
+        User = get_user_model()
+
+        return [
+            ('chatbot', 'transcript', session.messages.all().order_by('timestamp')),
+            ('chatbot', 'history: first page',
+             history.only(*ChatSessionSummarySerializer.Meta.fields)[:21]),
+            ('chatbot', 'history: next page',
+             history.filter(Q(started_at__lt=session.started_at) | Q(started_at=session.started_at, id__lt=session.id))[:21]),
+            ('chatbot', 'history: messages prefetch',
+             ChatMessage.objects.filter(session__in=list(history.values_list('id', flat=True)[:20]))),
+            ('chatbot', 'session detail', ChatSession.objects.filter(id=session.id, user=user)),
+            ('training', 'labelled sessions page',
+             labelled.filter(validated_at__gt=timezone.now() - timedelta(days=90), validated_at__lte=timezone.now())
+             .order_by('validated_at', 'id').values_list('id', 'validated_at', 'validated_score')[:500]),
+            ('training', 'labelled answers',
+             ChatMessage.objects.filter(session_id__in=list(labelled.values_list('id', flat=True)[:500]),
+                                        message_type='answer').order_by('session_id', 'timestamp')),
+            # Same plan as the Max('validated_at') aggregate, which cannot be explained directly
+            ('training', 'latest validation',
+             labelled.filter(validated_at__isnull=False).order_by('-validated_at').values('validated_at')[:1]),
+            ('admin', 'chat session changelist', changelist[:100]),
+            ('admin', 'changelist ?is_complete=0', changelist.filter(is_complete=False)[:100]),
+            ('admin', 'changelist ?llm_status=failed', changelist.filter(llm_status='failed')[:100]),
+            ('admin', 'employee list', User.objects.filter(role='EMPLOYEE').order_by('-date_joined')),
+            ('admin', 'admin count', User.objects.filter(role='ADMIN').values('id')),
+        ]
+
+    def _explain_all(self, user):
+        full_scan = FULL_SCAN.get(connection.vendor)
+        extra_sort = EXTRA_SORT.get(connection.vendor)
+        if full_scan is None:
+            self.stdout.write(self.style.WARNING(f"No scan detection for {connection.vendor}; printing plans only"))
+
+        scans = []
+        for area, name, queryset in self._queries(user):
+            plan = queryset.explain()
+            tables = set()
+            if full_scan:
+                tables = {match.group(1) for match in map(full_scan.search, plan.splitlines()) if match}
+            label = f"[{area}] {name}"
+            if tables:
+                scans.append(name)
+                self.stdout.write(self.style.WARNING(f"{label}: FULL SCAN of {', '.join(sorted(tables))}"))
+            elif extra_sort and extra_sort.search(plan):
+                self.stdout.write(f"{label}: indexed, with a sort step")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{label}: indexed"))
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+        return scans
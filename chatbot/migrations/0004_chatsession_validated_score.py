@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_chatsession_detailed_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='validated_score',
+            field=models.FloatField(blank=True, help_text='HR-validated burnout score used as a training label', null=True),
+        ),
+    ]
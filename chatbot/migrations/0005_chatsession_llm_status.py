@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_chatsession_validated_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='llm_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10, null=True),
+        ),
+    ]
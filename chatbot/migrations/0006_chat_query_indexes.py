@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_chatsession_llm_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(condition=models.Q(('is_complete', False)), fields=['user', '-started_at'], name='chat_sess_user_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['user', '-started_at', '-id'], name='chat_sess_user_hist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['-started_at', '-id'], name='chat_sess_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(condition=models.Q(('is_complete', True), ('validated_score__isnull', False)), fields=['completed_at', 'id'], name='chat_sess_labelled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['session', 'timestamp'], name='chat_msg_session_ts_idx'),
+        ),
+        migrations.AlterField(
+            model_name='chatsession',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='chat_sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chatbot.chatsession'),
+        ),
+    ]
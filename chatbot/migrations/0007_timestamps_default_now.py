@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_chat_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatsession',
+            name='started_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0007_timestamps_default_now'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatsession',
+            name='llm_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('generating', 'Generating'), ('streaming', 'Streaming'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10, null=True),
+        ),
+    ]
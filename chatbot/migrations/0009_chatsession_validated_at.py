@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+def backfill_validated_at(apps, schema_editor):
+    # Sessions scored before this field existed were already covered by the completed_at watermark
+    ChatSession = apps.get_model('chatbot', 'ChatSession')
+    ChatSession.objects.filter(validated_score__isnull=False).update(validated_at=models.F('completed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0008_alter_chatsession_llm_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='validated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_validated_at, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='chatsession',
+            name='chat_sess_labelled_idx',
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(condition=models.Q(('is_complete', True), ('validated_score__isnull', False)), fields=['validated_at', 'id'], name='chat_sess_labelled_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0009_chatsession_validated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='assessment_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0010_chatsession_assessment_id'),
+    ]
+
+    operations = [
+        # In-progress assessments live in the cache, so no open rows are written any more
+        migrations.RemoveIndex(
+            model_name='chatsession',
+            name='chat_sess_user_open_idx',
+        ),
+    ]
@@ -1,9 +1,22 @@
 from django.db import models
+from django.utils import timezone
 from django.conf import settings  # Add this import
 
 class ChatSession(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chat_sessions')  # Change this line
-    started_at = models.DateTimeField(auto_now_add=True)
+    LLM_STATUSES = [
+        ('pending', 'Pending'),
+        ('generating', 'Generating'),
+        ('streaming', 'Streaming'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    # Indexed through the composite indexes below, which all lead with user
+    # Stable from the first question on; unique so a resent completion cannot store twice
+    assessment_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chat_sessions', db_index=False)
+    # Not auto_now_add: sessions are written on completion and keep their real start time
+    started_at = models.DateTimeField(default=timezone.now, editable=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     burnout_score = models.FloatField(null=True, blank=True)
     burnout_level = models.CharField(max_length=20, null=True, blank=True)
@@ -11,10 +24,26 @@ class ChatSession(models.Model):
     llm_recommendations = models.TextField(null=True, blank=True)
     detailed_analysis = models.TextField(null=True, blank=True)
     is_complete = models.BooleanField(default=False)
+    validated_score = models.FloatField(null=True, blank=True, help_text='HR-validated burnout score used as a training label')
+    # When HR last set validated_score; incremental fine-tuning's watermark
+    validated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    llm_status = models.CharField(max_length=10, choices=LLM_STATUSES, null=True, blank=True)
     
     class Meta:
         db_table = 'chat_sessions'
         ordering = ['-started_at']
+        indexes = [
+            # Chat history keyset pages
+            models.Index(fields=['user', '-started_at', '-id'], name='chat_sess_user_hist_idx'),
+            # Admin changelist, which adds -pk to the default ordering
+            models.Index(fields=['-started_at', '-id'], name='chat_sess_started_idx'),
+            # Incremental fine-tuning pages labelled sessions by (validated_at, id)
+            models.Index(
+                fields=['validated_at', 'id'],
+                name='chat_sess_labelled_idx',
+                condition=models.Q(is_complete=True, validated_score__isnull=False),
+            ),
+        ]
 
 class ChatMessage(models.Model):
     MESSAGE_TYPES = [
@@ -23,12 +52,18 @@ class ChatMessage(models.Model):
         ('system', 'System'),
     ]
     
-    session = models.ForeignKey('ChatSession', on_delete=models.CASCADE, related_name='messages')  # Use string reference
+    # Indexed through chat_msg_session_ts_idx; a second single-column index would only slow inserts
+    session = models.ForeignKey('ChatSession', on_delete=models.CASCADE, related_name='messages', db_index=False)
     message_type = models.CharField(max_length=10, choices=MESSAGE_TYPES)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: bulk-created transcripts keep the time each message was sent
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     question_id = models.IntegerField(null=True, blank=True)
     
     class Meta:
         db_table = 'chat_messages'
-        ordering = ['timestamp']
\ No newline at end of file
+        ordering = ['timestamp']
+        indexes = [
+            # Transcripts, answer pairs and the history prefetch, all per session in timestamp order
+            models.Index(fields=['session', 'timestamp'], name='chat_msg_session_ts_idx'),
+        ]
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ChatHistoryPagination(CursorPagination):
+    """Keyset pagination on started_at: no COUNT query and no OFFSET scan"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # id breaks ties between sessions started in the same instant
+    ordering = ('-started_at', '-id')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import ChatSession, ChatMessage
+from .conversation_flow import ConversationFlow
 
 class ChatMessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,12 +13,39 @@ class ChatSessionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ChatSession
-        fields = ['id', 'user', 'started_at', 'completed_at', 'burnout_score', 
-                 'burnout_level', 'recommendation','llm_recommendations', 'detailed_analysis', 'is_complete', 'messages']
+        fields = ['id', 'assessment_id', 'user', 'started_at', 'completed_at', 'burnout_score', 
+                 'burnout_level', 'recommendation','llm_recommendations', 'detailed_analysis', 'llm_status', 'is_complete', 'messages']
+
+class ChatSessionSummarySerializer(serializers.ModelSerializer):
+    """History listing row: no messages, no user lookup"""
+    class Meta:
+        model = ChatSession
+        fields = ['id', 'started_at', 'completed_at', 'burnout_score', 'burnout_level', 'llm_status', 'is_complete']
 
 class StartChatSessionSerializer(serializers.Serializer):
     pass
 
 class SubmitAnswerSerializer(serializers.Serializer):
     question_id = serializers.IntegerField()
-    answer = serializers.CharField(max_length=1000)
\ No newline at end of file
+    answer = serializers.CharField(max_length=1000)
+
+class SubmitAssessmentSerializer(serializers.Serializer):
+    """Every answer at once, keyed by ConversationFlow field"""
+    answers = serializers.DictField(child=serializers.CharField(max_length=1000))
+    # Client-generated; resending the same id returns the stored result
+    assessment_id = serializers.UUIDField(required=False)
+    stream_recommendations = serializers.BooleanField(default=False)
+    compact = serializers.BooleanField(default=False)
+
+    def validate_answers(self, answers):
+        fields = [question['field'] for question in ConversationFlow.get_questions()]
+        missing = [field for field in fields if field not in answers]
+        unknown = sorted(set(answers) - set(fields))
+        if missing or unknown:
+            errors = []
+            if missing:
+                errors.append(f"Missing answers for: {', '.join(missing)}")
+            if unknown:
+                errors.append(f"Unknown fields: {', '.join(unknown)}")
+            raise serializers.ValidationError(errors)
+        return {field: answers[field] for field in fields}
@@ -0,0 +1,76 @@
+"""Server-Sent Events stream of LLM recommendations for a completed session.
+
+Each recommendation is sent as a ``recommendation`` event as soon as the
+provider has finished its JSON object. The final payload is persisted and
+sent as one ``complete`` event.
+
+Only the connection that takes the session from ``pending`` to
+``streaming`` calls the LLM. A second tab, an EventSource reconnect or a
+stream that arrives after the worker started gets one ``complete`` event
+with the stored status and is closed straight away, so it never holds a
+WSGI worker; while that status is still ``pending`` the client polls the
+recommendations endpoint. If the owning client disconnects early, the job
+goes back to ``pending`` and the background worker finishes it.
+"""
+import json
+import logging
+
+from ml_model.llm_api_recommender import llm_api_recommender
+
+from .models import ChatSession
+from .tasks import IN_FLIGHT_STATUSES, claim_llm_job, enqueue_llm_recommendations, release_llm_job, save_llm_payload
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def recommendation_events(chat_session, structured_answers):
+    """Generator of SSE frames for ``StreamingHttpResponse``"""
+    if not claim_llm_job(chat_session.id, 'streaming'):
+        # Already generated or failed, or someone else is generating it
+        yield _current_result(chat_session.id)
+        return
+
+    finished = False
+    try:
+        for event in llm_api_recommender.stream_recommendations(structured_answers, chat_session.burnout_level):
+            if event['type'] == 'recommendation':
+                yield sse_event('recommendation', {
+                    'index': event['index'],
+                    'recommendation': event['recommendation'],
+                })
+            else:
+                result = save_llm_payload(chat_session.id, event['payload'], 'streaming')
+                finished = True
+                yield sse_event('complete', result)
+    except Exception as exc:
+        logger.warning("Streaming recommendations failed for session %s: %s", chat_session.id, exc)
+        ChatSession.objects.filter(pk=chat_session.id, llm_status='streaming').update(llm_status='failed')
+        finished = True
+        yield sse_event('complete', {
+            'llm_status': 'failed',
+            'llm_recommendations': chat_session.recommendation,
+            'detailed_analysis': chat_session.detailed_analysis,
+        })
+    finally:
+        if not finished:
+            # Only the owner gets here; give the job back to the worker
+            logger.info("Client left the stream for session %s; finishing in background", chat_session.id)
+            release_llm_job(chat_session.id, 'streaming')
+            enqueue_llm_recommendations(chat_session.id, structured_answers, chat_session.burnout_level)
+
+
+def _current_result(session_id):
+    """The stored result as it is now; ``pending`` tells the client to poll"""
+    session = ChatSession.objects.filter(pk=session_id).values(
+        'llm_status', 'recommendation', 'detailed_analysis'
+    ).first() or {}
+    llm_status = session.get('llm_status')
+    return sse_event('complete', {
+        'llm_status': 'pending' if llm_status in IN_FLIGHT_STATUSES else llm_status,
+        'llm_recommendations': session.get('recommendation'),
+        'detailed_analysis': session.get('detailed_analysis'),
+    })
@@ -0,0 +1,178 @@
+"""Background generation of LLM recommendations for completed sessions.
+
+``submit_answer`` stores the ML score with score-based fallback advice and
+returns straight away. The Groq call then runs on a small in-process thread
+pool, and the session's ``llm_status`` moves from ``pending`` to ``ready``
+(LLM advice saved) or ``failed`` (fallback advice kept).
+
+Jobs only live in this process, so a restart or deploy loses them. A
+session still in flight ``LLM_PENDING_TIMEOUT_SECONDS`` after completion is
+reported and stored as ``failed`` the next time it is polled, and keeps its
+score-based advice.
+
+Exactly one generator owns a session at a time. The worker or an SSE stream
+takes it with a conditional UPDATE from ``pending`` to ``generating`` or
+``streaming``; everyone else waits for the stored result.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ml_model.llm_api_recommender import llm_api_recommender
+from ml_model.rate_limiter import BATCH
+from ml_model.semantic_cache import SemanticRecommendationCache
+
+from .assessment_logic import assessment_calculator
+from .models import ChatSession
+
+logger = logging.getLogger(__name__)
+
+LLM_WORKERS = int(os.getenv('LLM_WORKERS', '4'))
+# How long the worker leaves a streaming client to open stream_url before generating itself
+LLM_STREAM_HANDOFF_SECONDS = float(os.getenv('LLM_STREAM_HANDOFF_SECONDS', '15'))
+
+# Longer than queueing for quota plus the client deadline; past this the job is presumed lost
+LLM_PENDING_TIMEOUT_SECONDS = float(os.getenv('LLM_PENDING_TIMEOUT_SECONDS', '300'))
+
+# Statuses the client sees as "pending": nobody has produced a result yet
+IN_FLIGHT_STATUSES = ('pending', 'generating', 'streaming')
+
+_executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix='llm-recommendations')
+
+# Near-identical answer sets at the same level reuse an earlier completion
+if os.getenv('LLM_SEMANTIC_CACHE', 'true').lower() in ('1', 'true', 'yes'):
+    llm_api_recommender.cache = SemanticRecommendationCache(assessment_calculator.embed_texts)
+
+
+def claim_llm_job(session_id, owner_status):
+    """Take a pending session for one generator; True for exactly one caller"""
+    return ChatSession.objects.filter(pk=session_id, llm_status='pending').update(llm_status=owner_status) == 1
+
+
+def expire_if_stale(session_id, completed_at):
+    """Mark a job lost to a restart as failed; True if it was"""
+    cutoff = timezone.now() - timedelta(seconds=LLM_PENDING_TIMEOUT_SECONDS)
+    if completed_at is None or completed_at >= cutoff:
+        return False
+    expired = ChatSession.objects.filter(pk=session_id, llm_status__in=IN_FLIGHT_STATUSES).update(llm_status='failed')
+    if expired:
+        logger.warning("LLM recommendations for session %s never finished; keeping fallback advice", session_id)
+    return bool(expired)
+
+
+def release_llm_job(session_id, owner_status):
+    """Hand an unfinished job back to ``pending`` so the worker can take it"""
+    ChatSession.objects.filter(pk=session_id, llm_status=owner_status).update(llm_status='pending')
+
+
+def enqueue_llm_recommendations(session_id, structured_answers, burnout_level=None, delay=0.0):
+    """Queue LLM generation once the session's transaction has committed.
+
+    With ``delay`` the job only starts after that many seconds. If a stream
+    has taken the session by then, the worker finds nothing to do.
+    """
+    def submit():
+        _executor.submit(generate_llm_recommendations, session_id, structured_answers, burnout_level)
+
+    def schedule():
+        if delay > 0:
+            timer = threading.Timer(delay, submit)
+            timer.daemon = True
+            timer.start()
+        else:
+            submit()
+
+    transaction.on_commit(schedule)
+
+
+def generate_llm_recommendations(session_id, structured_answers, burnout_level=None):
+    """Call the LLM and store its recommendations on the session"""
+    close_old_connections()
+    try:
+        if not claim_llm_job(session_id, 'generating'):
+            logger.debug("Session %s is already generated or owned by a stream", session_id)
+            return
+        llm_payload = llm_api_recommender.generate_recommendations(
+            structured_answers, burnout_level, priority=BATCH  # the client already shows fallback advice; streams go first
+        )
+        if save_llm_payload(session_id, llm_payload, 'generating')['llm_status'] == 'ready':
+            logger.info("LLM recommendations ready for session %s", session_id)
+    except Exception as exc:
+        logger.warning("LLM recommendations failed for session %s: %s", session_id, exc)
+        ChatSession.objects.filter(pk=session_id, llm_status='generating').update(llm_status='failed')
+    finally:
+        close_old_connections()
+
+
+def save_llm_payload(session_id, llm_payload, owner_status):
+    """Persist a parsed LLM payload and return the fields the client shows.
+
+    An ``unparsed`` payload is only a placeholder, so the session is marked
+    ``failed`` and keeps its score-based advice, as when the call fails.
+    """
+    if llm_payload.get('unparsed'):
+        logger.warning("LLM response for session %s could not be parsed; keeping fallback advice", session_id)
+        ChatSession.objects.filter(pk=session_id, llm_status=owner_status).update(llm_status='failed')
+        session = ChatSession.objects.filter(pk=session_id).values('recommendation', 'detailed_analysis').first() or {}
+        return {
+            'llm_status': 'failed',
+            'llm_recommendations': session.get('recommendation'),
+            'detailed_analysis': session.get('detailed_analysis'),
+        }
+
+    result = {
+        'llm_status': 'ready',
+        'llm_recommendations': format_llm_recommendations(llm_payload.get('recommendations', [])),
+        'detailed_analysis': llm_payload.get('summary'),
+    }
+    ChatSession.objects.filter(pk=session_id).update(
+        recommendation=result['llm_recommendations'],
+        llm_recommendations=result['llm_recommendations'],
+        detailed_analysis=result['detailed_analysis'],
+        llm_status='ready',
+    )
+    return result
+
+
+def format_llm_recommendations(recommendations: list) -> str:
+    """Convert structured recommendations into properly formatted bullet points"""
+    if not recommendations:
+        return ""
+
+    formatted_lines = []
+    for idx, rec in enumerate(recommendations, start=1):
+        title = rec.get('title', f'Recommendation {idx}').strip()
+        description = rec.get('description', '').strip()
+        why_it_helps = rec.get('why_it_helps', '').strip()
+        timeframe = rec.get('timeframe', '').strip()
+        priority = rec.get('priority', '').replace('_', ' ').title()
+
+        # Build each recommendation with proper line breaks
+        parts = []
+
+        # Main title and description
+        parts.append(f"**{idx}. {title}**")
+        parts.append(f"   {description}")
+
+        # Optional fields (only if they exist)
+        if why_it_helps:
+            parts.append(f"   **Why it helps:** {why_it_helps}")
+        if timeframe:
+            parts.append(f"   **When to start:** {timeframe}")
+        if priority:
+            parts.append(f"   **Priority:** {priority}")
+
+        # Add spacing between recommendations
+        formatted_lines.extend(parts)
+        formatted_lines.append("")  # Empty line between recommendations
+
+    # Remove the last empty line and join with newlines
+    if formatted_lines and formatted_lines[-1] == "":
+        formatted_lines.pop()
+
+    return "\n".join(formatted_lines)
@@ -0,0 +1,62 @@
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .conversation_flow import ConversationFlow
+from .models import ChatSession
+
+
+class SubmitAssessmentTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(email='employee@example.com', password='password')
+        self.other_user = User.objects.create_user(email='colleague@example.com', password='password')
+        self.client = APIClient()
+        self.client.force_login(self.user)
+        self.answers = {question['field']: "Tired most days" for question in ConversationFlow.get_questions()}
+
+        # Score without the model and keep LLM generation out of the test
+        score = mock.patch(
+            'chatbot.views.assessment_calculator.calculate_score_from_answers',
+            return_value={'score': 0.5, 'level': 'MODERATE'},
+        )
+        self.calculate_score = score.start()
+        self.addCleanup(score.stop)
+        available = mock.patch('chatbot.views.llm_api_recommender.is_available', return_value=False)
+        available.start()
+        self.addCleanup(available.stop)
+
+    def submit(self, assessment_id):
+        return self.client.post(
+            reverse('submit_assessment'),
+            {'answers': self.answers, 'assessment_id': str(assessment_id), 'compact': True},
+            format='json',
+        )
+
+    def test_resend_returns_stored_session_without_rescoring(self):
+        assessment_id = uuid.uuid4()
+
+        first = self.submit(assessment_id)
+        second = self.submit(assessment_id)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['session_id'], first.data['session_id'])
+        self.assertEqual(second.data['assessment_id'], str(assessment_id))
+        self.assertEqual(ChatSession.objects.filter(assessment_id=assessment_id).count(), 1)
+        self.assertEqual(self.calculate_score.call_count, 1)
+
+    def test_assessment_id_of_another_user_conflicts(self):
+        assessment_id = uuid.uuid4()
+        ChatSession.objects.create(user=self.other_user, assessment_id=assessment_id, is_complete=True)
+
+        response = self.submit(assessment_id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertNotIn('does not exist', response.data['error'])
+        self.assertFalse(ChatSession.objects.filter(user=self.user).exists())
+        self.calculate_score.assert_not_called()
@@ -4,8 +4,11 @@ from . import views
 urlpatterns = [
     path('start-session/', views.start_chat_session, name='start_chat_session'),
     path('submit-answer/', views.submit_answer, name='submit_answer'),
+    path('submit-assessment/', views.submit_assessment, name='submit_assessment'),
     path('history/', views.get_chat_history, name='chat_history'),
     path('session/<int:session_id>/', views.get_session_detail, name='session_detail'),
+    path('session/<int:session_id>/recommendations/', views.get_session_recommendations, name='session_recommendations'),
+    path('session/<int:session_id>/stream/', views.stream_session_recommendations, name='stream_session_recommendations'),
     path('session/<int:session_id>/delete/', views.delete_session, name='delete_session'),
     path('analyze-burnout/', views.analyze_burnout_message, name='analyze_burnout'),
 ]
\ No newline at end of file
@@ -1,19 +1,32 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 import logging
-from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 
 from .models import ChatSession, ChatMessage
-from .serializers import ChatSessionSerializer
+from .serializers import (
+    ChatMessageSerializer, ChatSessionSerializer, ChatSessionSummarySerializer, SubmitAssessmentSerializer
+)
+from .pagination import ChatHistoryPagination
 from .conversation_flow import ConversationFlow
 from .assessment_logic import assessment_calculator
-from ml_model.llm_api_recommender import (
-    llm_api_recommender,
-    GroqAPIUnavailable,  
+from .assessment_store import AssessmentBusy, AssessmentConflict, assessment_store
+from .tasks import (
+    IN_FLIGHT_STATUSES,
+    LLM_STREAM_HANDOFF_SECONDS,
+    enqueue_llm_recommendations,
+    expire_if_stale,
+    format_llm_recommendations,
 )
+from .streaming import recommendation_events
+from ml_model.llm_api_recommender import llm_api_recommender
+from ml_model.llm_recommender import llm_recommender
 
 logger = logging.getLogger(__name__)
 
@@ -25,24 +38,15 @@ def start_chat_session(request):
         print(f"User starting session: {request.user}")
         print(f"Authenticated: {request.user.is_authenticated}")
         
-        # Create new chat session
-        chat_session = ChatSession.objects.create(user=request.user)
-        
         # Get first question
         first_question = ConversationFlow.get_questions()[0]
         
-        # Save first question as a message
-        ChatMessage.objects.create(
-            session=chat_session,
-            message_type='question',
-            content=first_question['question'],
-            question_id=first_question['id']
-        )
+        # Nothing is written to the database until the last answer
+        state, _ = assessment_store.start(request.user, first_question)
         
-        serializer = ChatSessionSerializer(chat_session)
         return Response({
             'success': True,
-            'session': serializer.data,
+            'session': _in_progress_session(request.user, state),
             'current_question': first_question
         })
         
@@ -60,6 +64,11 @@ def submit_answer(request):
     try:
         question_id = request.data.get('question_id')
         answer = request.data.get('answer')
+        # Clients that open the SSE stream generate recommendations there
+        stream_recommendations = bool(request.data.get('stream_recommendations'))
+        # Compact clients keep the transcript themselves and only get what changed;
+        # the full transcript stays available from the session detail endpoint
+        compact = bool(request.data.get('compact'))
         
         if not question_id or not answer:
             return Response(
@@ -67,54 +76,15 @@ def submit_answer(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get the latest active session for user
-        chat_session = ChatSession.objects.filter(
-            user=request.user, 
-            is_complete=False
-        ).order_by('-started_at').first()
-        
-        if not chat_session:
-            return Response(
-                {'error': 'No active chat session found'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Save user's answer
-        ChatMessage.objects.create(
-            session=chat_session,
-            message_type='answer',
-            content=answer,
-            question_id=question_id
-        )
-        
-        # Check if this is the last question
-        next_question_id = ConversationFlow.get_next_question_id(question_id)
-        
-        if next_question_id is None:
-            # All questions answered - calculate results
-            return _complete_assessment(chat_session)
-        else:
-            # Get next question
-            next_question = ConversationFlow.get_question_by_id(next_question_id)
-            ChatMessage.objects.create(
-                session=chat_session,
-                message_type='question',
-                content=next_question['question'],
-                question_id=next_question['id']
-            )
-            
-            serializer = ChatSessionSerializer(chat_session)
-            return Response({
-                'success': True,
-                'session': serializer.data,
-                'current_question': next_question,
-                'progress': {
-                    'current': question_id,
-                    'total': len(ConversationFlow.get_questions()),
-                    'percentage': int((question_id / len(ConversationFlow.get_questions())) * 100)
-                }
-            })
+        # One answer at a time per user, whichever worker receives it
+        with assessment_store.locked(request.user):
+            return _apply_answer(request.user, question_id, answer, stream_recommendations, compact)
             
+    except AssessmentBusy as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_409_CONFLICT
+        )
     except Exception as e:
         logger.error(f"Failed to process answer: {str(e)}")
         return Response(
@@ -122,18 +92,169 @@ def submit_answer(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-def _complete_assessment(chat_session):
-    """Complete the assessment using ML model + LLM recommendations"""
+def _apply_answer(user, question_id, answer, stream_recommendations, compact):
+    """Record one answer; the caller holds the user's assessment lock"""
+    state = assessment_store.get(user)
+    
+    if state and 'completed_session_id' in state:
+        # The last answer was sent again: return the stored result, never a second session
+        chat_session = ChatSession.objects.filter(pk=state['completed_session_id'], user=user).first()
+        if chat_session and question_id == ConversationFlow.get_questions()[-1]['id']:
+            result_message = chat_session.messages.filter(message_type='system').order_by('-timestamp').first()
+            return _completion_response(chat_session, result_message, stream_recommendations, compact)
+        state = None
+    
+    if not state:
+        return Response(
+            {'error': 'No active chat session found'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    answered = {message['question_id'] for message in state['messages'] if message['message_type'] == 'answer'}
+    if question_id in answered:
+        # Double click or second tab: the answer is already recorded, nothing changes
+        return _progress_response(user, state, question_id, [], compact)
+    
+    expected_question_id = state['messages'][-1]['question_id']
+    if question_id != expected_question_id:
+        return Response(
+            {'error': f'Expected an answer to question {expected_question_id}'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Record user's answer
+    assessment_store.add_message(state, 'answer', answer, question_id)
+    
+    # Check if this is the last question
+    next_question_id = ConversationFlow.get_next_question_id(question_id)
+    
+    if next_question_id is None:
+        # All questions answered - calculate results and persist everything at once
+        return _complete_assessment(user, state, stream_recommendations, compact)
+    
+    # Get next question
+    next_question = ConversationFlow.get_question_by_id(next_question_id)
+    question_message = assessment_store.add_message(
+        state, 'question', next_question['question'], next_question['id']
+    )
+    assessment_store.save(user, state)
+    return _progress_response(user, state, question_id, [question_message], compact)
+
+def _progress_response(user, state, question_id, new_messages, compact):
+    """Next question and progress after ``question_id`` was answered"""
+    current_question = ConversationFlow.get_question_by_id(state['messages'][-1]['question_id'])
+    total_questions = len(ConversationFlow.get_questions())
+    progress = {
+        'current': question_id,
+        'total': total_questions,
+        'percentage': int((question_id / total_questions) * 100)
+    }
+    if compact:
+        return Response({
+            'success': True,
+            # No ChatSession exists until the last answer; assessment_id is stable throughout
+            'session_id': None,
+            'assessment_id': state['id'],
+            'current_question': current_question,
+            'progress': progress,
+            'new_messages': ChatMessageSerializer([ChatMessage(**message) for message in new_messages], many=True).data
+        })
+
+    return Response({
+        'success': True,
+        'session': _in_progress_session(user, state),
+        'current_question': current_question,
+        'progress': progress
+    })
+
+@api_view(['POST'])
+@login_required
+def submit_assessment(request):
+    """Submit every answer at once and get the results.
+
+    For clients that collect the answers offline: one request replaces
+    start-session plus six submit-answer calls. The answers are checked
+    against the question bank, scored once and saved with the full
+    transcript in one transaction. Any assessment the user has in progress
+    elsewhere is left alone. Resending the same ``assessment_id`` returns
+    the stored result instead of creating a second session.
+    """
+    serializer = SubmitAssessmentSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        # Get all answers from the session
-        answers = {}
-        
-        messages = chat_session.messages.all().order_by('timestamp')
-        for message in messages:
-            if message.message_type == 'answer':
-                question = ConversationFlow.get_question_by_id(message.question_id)
-                if question:
-                    answers[question['field']] = message.content
+        assessment_id = serializer.validated_data.get('assessment_id')
+        stream_recommendations = serializer.validated_data['stream_recommendations']
+        compact = serializer.validated_data['compact']
+        if assessment_id:
+            # A resend gets the stored result without scoring the answers again
+            chat_session = assessment_store.stored_session(request.user, assessment_id)
+            if chat_session:
+                result_message = chat_session.messages.filter(message_type='system').order_by('-timestamp').first()
+                return _completion_response(chat_session, result_message, stream_recommendations, compact)
+
+        state = assessment_store.from_answers(serializer.validated_data['answers'], assessment_id)
+        return _complete_assessment(
+            request.user,
+            state,
+            stream_recommendations,
+            compact,
+            discard_state=False,
+        )
+
+    except AssessmentConflict as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    except Exception as e:
+        logger.error(f"Failed to submit assessment: {str(e)}")
+        return Response(
+            {'error': f'Failed to submit assessment: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+def _in_progress_session(user, state):
+    """ChatSessionSerializer's shape for an assessment that is still only in the state store"""
+    session = {field: None for field in ChatSessionSerializer.Meta.fields}
+    session.update(
+        assessment_id=state['id'],
+        user=str(user),
+        started_at=serializers.DateTimeField().to_representation(state['started_at']),
+        is_complete=False,
+        messages=ChatMessageSerializer([ChatMessage(**message) for message in state['messages']], many=True).data,
+    )
+    return session
+
+def _answers_by_field(answer_messages):
+    """(question_id, content) pairs keyed by ConversationFlow field"""
+    answers = {}
+    for question_id, content in answer_messages:
+        question = ConversationFlow.get_question_by_id(question_id)
+        if question:
+            answers[question['field']] = content
+    return answers
+
+def _session_answers(chat_session):
+    """Answers of a stored session keyed by ConversationFlow field"""
+    messages = chat_session.messages.all().order_by('timestamp')
+    return _answers_by_field(
+        (message.question_id, message.content) for message in messages if message.message_type == 'answer'
+    )
+
+def _state_answers(state):
+    """Answers of an in-progress assessment keyed by ConversationFlow field"""
+    return _answers_by_field(
+        (message['question_id'], message['content']) for message in state['messages']
+        if message['message_type'] == 'answer'
+    )
+
+def _complete_assessment(user, state, stream_recommendations=False, compact=False, discard_state=True):
+    """Score the assessment, write it in one transaction and queue LLM recommendations"""
+    try:
+        # Get all answers from the in-progress state
+        answers = _state_answers(state)
         
         print(f"Processing assessment with {len(answers)} answers")
         
@@ -142,56 +263,54 @@ def _complete_assessment(chat_session):
         
         print(f"ML Model result: {result['level']} (Score: {result['score']})")
         
-        # 🆕 CRITICAL: Save the score to database FIRST, before LLM processing
-        chat_session.burnout_score = result['score']
-        chat_session.burnout_level = result['level']
-        chat_session.completed_at = timezone.now()
-        chat_session.is_complete = True
-        
-        # ✅ Initialize with fallback values FIRST
+        # Fallback values are served until the background LLM call finishes
         llm_recommendations = _get_score_based_recommendations(result['score'], result['level'])
         detailed_analysis = _get_score_based_analysis(result['score'], result['level'])
-        
-        # ✅ THEN try to override with LLM if available
-        try:
-            structured_answers = _structure_answers_for_llm(answers)
-            if structured_answers:
-                llm_payload = llm_api_recommender.generate_recommendations(structured_answers)
-                llm_recommendations = _format_llm_recommendations(llm_payload.get('recommendations', []))
-                detailed_analysis = llm_payload.get('summary')
-                print("Hosted LLM recommendations generated successfully")
-        except Exception as exc:
-            print(f"LLM API failed: {exc}")
-            # ✅ No action needed - fallback values are already set
-        
-        # Save LLM results
-        chat_session.recommendation = llm_recommendations
-        chat_session.detailed_analysis = detailed_analysis
-        chat_session.save()  # 🆕 Save everything at once
-        
+
+        structured_answers = _structure_answers_for_llm(answers)
+        if not structured_answers:
+            llm_status = None
+        elif llm_api_recommender.is_available():
+            llm_status = 'pending'
+        else:
+            # Circuit open: keep the score-based recommendations, skip the LLM
+            llm_status = 'failed'
+
         # Add result message
-        ChatMessage.objects.create(
-            session=chat_session,
-            message_type='system',
-            content=f"Assessment complete! Burnout level: {result['level']} (Score: {result['score']:.3f})"
+        assessment_store.add_message(
+            state, 'system', f"Assessment complete! Burnout level: {result['level']} (Score: {result['score']:.3f})"
         )
+
+        # One transaction: the session row plus the whole transcript in one bulk insert
+        chat_session, messages, created = assessment_store.persist(
+            user,
+            state,
+            discard=discard_state,
+            burnout_score=result['score'],
+            burnout_level=result['level'],
+            completed_at=timezone.now(),
+            is_complete=True,
+            recommendation=llm_recommendations,
+            detailed_analysis=detailed_analysis,
+            llm_status=llm_status,
+        )
+
+        if created and chat_session.llm_status == 'pending':
+            # Streaming clients get a head start; if they never open stream_url the worker takes over
+            enqueue_llm_recommendations(
+                chat_session.id,
+                structured_answers,
+                result['level'],
+                delay=LLM_STREAM_HANDOFF_SECONDS if stream_recommendations else 0.0,
+            )
         
-        # Prepare response
-        response_result = {
-            'level': result['level'],
-            'score': result['score'],
-            'llm_recommendations': llm_recommendations,
-            'detailed_analysis': detailed_analysis
-        }
-        
-        serializer = ChatSessionSerializer(chat_session)
-        return Response({
-            'success': True,
-            'session': serializer.data,
-            'result': response_result,
-            'assessment_complete': True
-        })
+        return _completion_response(chat_session, messages[-1], stream_recommendations, compact)
         
+    except AssessmentConflict as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_409_CONFLICT
+        )
     except Exception as e:
         logger.error(f"Failed to complete assessment: {str(e)}")
         logger.error(f"Traceback:", exc_info=True)
@@ -199,6 +318,37 @@ def _complete_assessment(chat_session):
             {'error': f'Failed to complete assessment: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+def _completion_response(chat_session, result_message, stream_recommendations=False, compact=False):
+    """Result of a stored assessment, for its first submission and for any resend"""
+    llm_status = 'pending' if chat_session.llm_status in IN_FLIGHT_STATUSES else chat_session.llm_status
+    response_result = {
+        'level': chat_session.burnout_level,
+        'score': chat_session.burnout_score,
+        'llm_recommendations': chat_session.recommendation,
+        'detailed_analysis': chat_session.detailed_analysis,
+        'llm_status': llm_status
+    }
+    if stream_recommendations and llm_status == 'pending':
+        response_result['stream_url'] = reverse('stream_session_recommendations', args=[chat_session.id])
+    
+    if compact:
+        return Response({
+            'success': True,
+            'session_id': chat_session.id,
+            'assessment_id': str(chat_session.assessment_id) if chat_session.assessment_id else None,
+            'result': response_result,
+            'assessment_complete': True,
+            'new_messages': ChatMessageSerializer([result_message] if result_message else [], many=True).data
+        })
+
+    serializer = ChatSessionSerializer(chat_session)
+    return Response({
+        'success': True,
+        'session': serializer.data,
+        'result': response_result,
+        'assessment_complete': True
+    })
         
 def _get_score_based_recommendations(score, level):
     """Generate detailed recommendations based on burnout score"""
@@ -383,56 +533,35 @@ def _build_answer_summary(answers: dict) -> str:
     return summary
 
 
-def _format_llm_recommendations(recommendations: list) -> str:
-    """Convert structured recommendations into properly formatted bullet points"""
-    if not recommendations:
-        return ""
-    
-    formatted_lines = []
-    for idx, rec in enumerate(recommendations, start=1):
-        title = rec.get('title', f'Recommendation {idx}').strip()
-        description = rec.get('description', '').strip()
-        why_it_helps = rec.get('why_it_helps', '').strip()
-        timeframe = rec.get('timeframe', '').strip()
-        priority = rec.get('priority', '').replace('_', ' ').title()
-        
-        # Build each recommendation with proper line breaks
-        parts = []
-        
-        # Main title and description
-        parts.append(f"**{idx}. {title}**")
-        parts.append(f"   {description}")
-        
-        # Optional fields (only if they exist)
-        if why_it_helps:
-            parts.append(f"   **Why it helps:** {why_it_helps}")
-        if timeframe:
-            parts.append(f"   **When to start:** {timeframe}")
-        if priority:
-            parts.append(f"   **Priority:** {priority}")
-        
-        # Add spacing between recommendations
-        formatted_lines.extend(parts)
-        formatted_lines.append("")  # Empty line between recommendations
-    
-    # Remove the last empty line and join with newlines
-    if formatted_lines and formatted_lines[-1] == "":
-        formatted_lines.pop()
-    
-    return "\n".join(formatted_lines)
-    
 @api_view(['GET'])
 @login_required
 def get_chat_history(request):
-    """Get user's previous chat sessions"""
+    """Get a page of the user's previous chat sessions.
+
+    Summary rows by default; ``?include=messages`` adds the transcripts,
+    fetched with one prefetch query. Pass ``next_cursor`` back as ``cursor``
+    for the next page. A page costs the same queries however long the
+    history is.
+    """
     try:
-        sessions = ChatSession.objects.filter(user=request.user).order_by('-started_at')
-        serializer = ChatSessionSerializer(sessions, many=True)
+        include_messages = request.query_params.get('include') == 'messages'
+        sessions = ChatSession.objects.filter(user=request.user)
+        if include_messages:
+            sessions = sessions.select_related('user').prefetch_related('messages')
+            serializer_class = ChatSessionSerializer
+        else:
+            sessions = sessions.only(*ChatSessionSummarySerializer.Meta.fields)
+            serializer_class = ChatSessionSummarySerializer
+
+        paginator = ChatHistoryPagination()
+        page = paginator.paginate_queryset(sessions, request)
+        serializer = serializer_class(page, many=True)
         
         return Response({
             'success': True,
             'sessions': serializer.data,
-            'total_sessions': sessions.count()
+            'next_cursor': _cursor_param(paginator.get_next_link()),
+            'has_more': paginator.has_next
         })
         
     except Exception as e:
@@ -442,12 +571,20 @@ def get_chat_history(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def _cursor_param(link):
+    """The ``cursor`` value of a paginator link, so clients need not parse URLs"""
+    if not link:
+        return None
+    return parse_qs(urlparse(link).query).get('cursor', [None])[0]
+
 @api_view(['GET'])
 @login_required
 def get_session_detail(request, session_id):
     """Get details of a specific chat session"""
     try:
-        session = ChatSession.objects.get(id=session_id, user=request.user)
+        session = ChatSession.objects.select_related('user').prefetch_related('messages').get(
+            id=session_id, user=request.user
+        )
         serializer = ChatSessionSerializer(session)
         
         return Response({
@@ -467,6 +604,53 @@ def get_session_detail(request, session_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@login_required
+def get_session_recommendations(request, session_id):
+    """Poll the background LLM recommendations of a completed session"""
+    session = ChatSession.objects.filter(id=session_id, user=request.user).values(
+        'id', 'llm_status', 'recommendation', 'detailed_analysis', 'completed_at'
+    ).first()
+    if session is None:
+        return Response(
+            {'error': 'Chat session not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    # Clients only tell "still working" from "done"; who is generating is internal
+    llm_status = 'pending' if session['llm_status'] in IN_FLIGHT_STATUSES else session['llm_status']
+    if llm_status == 'pending' and expire_if_stale(session['id'], session['completed_at']):
+        # The job was lost (worker restart, deploy); the score-based advice stays
+        llm_status = 'failed'
+    response_data = {
+        'success': True,
+        'session_id': session['id'],
+        'llm_status': llm_status,
+    }
+    # Recommendations only change once the worker finishes
+    if llm_status != 'pending':
+        response_data['llm_recommendations'] = session['recommendation']
+        response_data['detailed_analysis'] = session['detailed_analysis']
+    return Response(response_data)
+
+@login_required
+@require_GET
+def stream_session_recommendations(request, session_id):
+    """Stream LLM recommendations of a completed session as Server-Sent Events"""
+    # Plain Django view: DRF content negotiation would reject text/event-stream
+    chat_session = ChatSession.objects.filter(id=session_id, user=request.user, is_complete=True).first()
+    if chat_session is None:
+        return JsonResponse({'error': 'Chat session not found'}, status=404)
+
+    structured_answers = _structure_answers_for_llm(_session_answers(chat_session))
+    response = StreamingHttpResponse(
+        recommendation_events(chat_session, structured_answers),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 # Add this to your views.py - after the existing views
 @api_view(['DELETE'])
 @login_required
@@ -510,39 +694,20 @@ def analyze_burnout_message(request):
         
         print(f"🧠 Analyzing burnout message from {request.user}: {user_message[:50]}...")
         
-        # Import and use your legacy offline LLM recommender for this endpoint
-        import sys
-        import importlib
-        project_root = Path(__file__).resolve().parents[2]
-        root_str = str(project_root)
-        if root_str not in sys.path:
-            sys.path.append(root_str)
-        llm_module = importlib.import_module("ml_model.llm_recommender")
-        llm_recommender = getattr(llm_module, "llm_recommender")
-        
-        # Get LLM recommendations
-        llm_result = llm_recommender.get_recommendations(user_message)
-        
-        # Also get assessment from your existing model if possible
-        try:
-            # Try to use your existing assessment logic
-            burnout_result = assessment_calculator.analyze_text(user_message)
-        except:
-            # Fallback to simple analysis
-            text_lower = user_message.lower()
-            if any(word in text_lower for word in ['exhausted', 'burned out', 'overwhelmed', 'stress', 'anxious']):
-                burnout_result = {'level': 'HIGH', 'score': 0.85, 'color': '🔴'}
-            elif any(word in text_lower for word in ['love', 'great', 'happy', 'energized', 'motivated']):
-                burnout_result = {'level': 'LOW', 'score': 0.15, 'color': '🟢'}
-            else:
-                burnout_result = {'level': 'MODERATE', 'score': 0.5, 'color': '🟡'}
+        # Score first so the offline recommender can favour entries for this level.
+        # Long messages are scored in overlapping windows; the keyword fallback
+        # only applies if the model itself fails.
+        burnout_result = assessment_calculator.analyze_text(user_message)
+
+        # Curated recommendations, indexed once at startup
+        llm_result = llm_recommender.get_recommendations(user_message, burnout_result['level'])
         
         response_data = {
             'success': True,
             'burnout_level': burnout_result['level'],
             'burnout_score': burnout_result.get('score', 0.5),
             'color': burnout_result.get('color', '🟡'),
-            'llm_recommendations': llm_result['recommendations'],
+            'llm_recommendations': format_llm_recommendations(llm_result['recommendations']),
             'summary': llm_result['summary'],
             'user_input': user_message,
             'timestamp': timezone.now().isoformat()
@@ -12,6 +12,7 @@ const Dashboard = () => {
   const [activeTab, setActiveTab] = useState('chat');
   const [isLoadingAssessments, setIsLoadingAssessments] = useState(false);
   const [selectedAssessment, setSelectedAssessment] = useState(null);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const [showUserMenu, setShowUserMenu] = useState(false);
   const [error, setError] = useState(null);
   const [chatbotKey, setChatbotKey] = useState(0);
@@ -20,12 +21,12 @@ const Dashboard = () => {
     logout();
   };
 
-  const fetchAssessments = async () => {
+  const fetchAssessments = async (cursor = null) => {
       if (user.is_admin) return;
       
       setIsLoadingAssessments(true);
       try {
-          const response = await chatbotService.getChatHistory();
+          const response = await chatbotService.getChatHistory(cursor);
           console.log('Chat history response:', response); // Debug log
           
           // Handle different response structures
@@ -50,17 +51,17 @@ const Dashboard = () => {
                   status: 'Completed',
                   level: session.burnout_level,
                   score: session.burnout_score,
-                  recommendation: session.recommendation || session.llm_recommendations,
                   timestamp: session.completed_at || session.started_at,
-                  messages: session.messages || [],
-                  summary: session.detailed_analysis || session.summary
+                  // Details are loaded from the session endpoint when an assessment is opened
+                  messages: []
               }))
               .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
           
-          setAssessments(completedAssessments);
+          setAssessments(prev => cursor ? [...prev, ...completedAssessments] : completedAssessments);
+          setHistoryCursor(response.has_more ? response.next_cursor : null);
       } catch (error) {
           console.error('Failed to fetch assessments:', error);
-          setAssessments([]);
+          if (!cursor) setAssessments([]);
       } finally {
           setIsLoadingAssessments(false);
       }
@@ -81,9 +82,20 @@ const Dashboard = () => {
     fetchAssessments();
   };
 
-  const handleAssessmentClick = (assessment) => {
+  const handleAssessmentClick = async (assessment) => {
     setSelectedAssessment(assessment);
     setActiveTab('assessment-details');
+    try {
+      const { session } = await chatbotService.getSessionDetail(assessment.id);
+      setSelectedAssessment(current => current?.id === assessment.id ? {
+        ...assessment,
+        recommendation: session.recommendation || session.llm_recommendations,
+        messages: session.messages || [],
+        summary: session.detailed_analysis
+      } : current);
+    } catch (error) {
+      console.error('Failed to load assessment details:', error);
+    }
   };
 
   const handleBackToChat = () => {
@@ -205,7 +217,7 @@ const Dashboard = () => {
           <div className="assessments-header">
             <h3>Recent Assessments</h3>
             <button 
-              onClick={fetchAssessments} 
+              onClick={() => fetchAssessments()} 
               className="refresh-assessments-btn"
               disabled={isLoadingAssessments}
             >
@@ -251,6 +263,14 @@ const Dashboard = () => {
                 </div>
               ))
             )}
+            {historyCursor && !isLoadingAssessments && (
+              <button
+                className="load-more-assessments-btn"
+                onClick={() => fetchAssessments(historyCursor)}
+              >
+                Load older assessments
+              </button>
+            )}
 </div>
         </div>
 
@@ -1,6 +1,19 @@
 import { useState, useEffect } from 'react';
 import { chatbotService } from '../services/chatbot';
 
+const LLM_POLL_INTERVAL_MS = 2000;
+// Five minutes, matching the server's LLM_PENDING_TIMEOUT_SECONDS default
+const MAX_LLM_POLLS = 150;
+
+// Same layout as the server-side recommendation formatter
+const formatRecommendations = (recommendations) => recommendations.map((rec, idx) => [
+    `**${idx + 1}. ${rec.title}**`,
+    `   ${rec.description}`,
+    rec.why_it_helps && `   **Why it helps:** ${rec.why_it_helps}`,
+    rec.timeframe && `   **When to start:** ${rec.timeframe}`,
+    rec.priority && `   **Priority:** ${rec.priority.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase())}`
+].filter(Boolean).join('\n')).join('\n\n');
+
 export const useChatbot = () => {
     const [currentSession, setCurrentSession] = useState(null);
     const [currentQuestion, setCurrentQuestion] = useState(null);
@@ -53,8 +66,17 @@ export const useChatbot = () => {
           // THEN make the API call
           const response = await chatbotService.submitAnswer(questionId, answer);
           
-          // Update with the real server response
-          setCurrentSession(response.session);
+          // Compact responses carry only the messages this answer created
+          if (response.session) {
+            setCurrentSession(response.session);
+          } else {
+            // The session only gets an id once the finished assessment is saved
+            setCurrentSession(prev => prev && {
+              ...prev,
+              id: response.session_id ?? prev.id,
+              messages: [...prev.messages, ...(response.new_messages || [])]
+            });
+          }
           
           if (response.assessment_complete) {
             setAssessmentComplete(true);
@@ -71,6 +93,56 @@ export const useChatbot = () => {
         }
       };
 
+    // Stream LLM recommendations one by one in place of the fallback ones
+    useEffect(() => {
+        if (result?.llm_status !== 'pending' || !result?.stream_url) return;
+
+        const streamed = [];
+        const source = chatbotService.streamRecommendations(result.stream_url, {
+            onRecommendation: ({ recommendation }) => {
+                streamed.push(recommendation);
+                setResult(prev => ({ ...prev, llm_recommendations: formatRecommendations(streamed) }));
+            },
+            // A stream that did not own the job completes with llm_status 'pending'; polling takes over
+            onComplete: (final) => setResult(prev => ({ ...prev, ...final, stream_url: null })),
+            // Dropping stream_url hands over to the polling effect below
+            onError: () => setResult(prev => ({ ...prev, stream_url: null }))
+        });
+
+        return () => source.close();
+    }, [result?.llm_status, result?.stream_url]);
+
+    // Poll until the background LLM recommendations replace the fallback ones
+    useEffect(() => {
+        if (result?.llm_status !== 'pending' || result?.stream_url || !currentSession) return;
+
+        let polls = 0;
+        const timer = setInterval(async () => {
+            polls += 1;
+            if (polls > MAX_LLM_POLLS) {
+                // Give up and keep the fallback recommendations already shown
+                clearInterval(timer);
+                setResult(prev => ({ ...prev, llm_status: 'failed' }));
+                return;
+            }
+            try {
+                const response = await chatbotService.getRecommendations(currentSession.id);
+                if (response.llm_status !== 'pending') {
+                    setResult(prev => ({
+                        ...prev,
+                        llm_status: response.llm_status,
+                        llm_recommendations: response.llm_recommendations,
+                        detailed_analysis: response.detailed_analysis
+                    }));
+                }
+            } catch (err) {
+                console.error('Failed to poll recommendations:', err);
+            }
+        }, LLM_POLL_INTERVAL_MS);
+
+        return () => clearInterval(timer);
+    }, [result?.llm_status, result?.stream_url, currentSession?.id]);
+
     // Auto-start session only once
     useEffect(() => {
         if (!hasInitialized && !currentSession && !isLoading) {
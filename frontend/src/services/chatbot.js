@@ -15,7 +15,10 @@ export const chatbotService = {
         try {
             const response = await api.post('/chatbot/submit-answer/', {
                 question_id: questionId,
-                answer: answer
+                answer: answer,
+                stream_recommendations: typeof EventSource !== 'undefined',
+                // Only the new question and progress come back; the hook keeps the transcript
+                compact: true
             });
             return response.data;
         } catch (error) {
@@ -23,15 +26,49 @@ export const chatbotService = {
         }
     },
 
-    getChatHistory: async () => {
+    getRecommendations: async (sessionId) => {
         try {
-            const response = await api.get('/chatbot/history/');
+            const response = await api.get(`/chatbot/session/${sessionId}/recommendations/`);
+            return response.data;
+        } catch (error) {
+            throw new Error(error.response?.data?.error || 'Failed to get recommendations');
+        }
+    },
+
+    streamRecommendations: (streamUrl, { onRecommendation, onComplete, onError }) => {
+        const source = new EventSource(`${api.defaults.baseURL}${streamUrl}`, { withCredentials: true });
+        source.addEventListener('recommendation', (event) => onRecommendation(JSON.parse(event.data)));
+        source.addEventListener('complete', (event) => {
+            source.close();
+            onComplete(JSON.parse(event.data));
+        });
+        // Never let EventSource reconnect on its own: the caller falls back to polling
+        source.onerror = () => {
+            source.close();
+            if (onError) onError();
+        };
+        return source;
+    },
+
+    // One page of summary rows; pass the previous response's next_cursor for older sessions
+    getChatHistory: async (cursor = null) => {
+        try {
+            const response = await api.get('/chatbot/history/', { params: cursor ? { cursor } : {} });
             return response.data;
         } catch (error) {
             throw new Error(error.response?.data?.error || 'Failed to get chat history');
         }
     },
 
+    getSessionDetail: async (sessionId) => {
+        try {
+            const response = await api.get(`/chatbot/session/${sessionId}/`);
+            return response.data;
+        } catch (error) {
+            throw new Error(error.response?.data?.error || 'Failed to get session details');
+        }
+    },
+
     //DELETE METHOD
   deleteSession: async (sessionId) => {
     try {
@@ -0,0 +1,238 @@
+"""Structured pruning of attention heads and classification-head neurons.
+
+Unit importance is measured on validation_set.csv using first-order Taylor
+scores:
+- for attention heads, the gradient of the loss with respect to a head mask;
+- for head neurons, |activation x gradient|.
+The least important units are removed until the estimated FLOPs fit the
+budget. The model is then briefly fine-tuned and saved with physically
+smaller weight matrices. The architecture sidecar records the pruned heads
+and the new head widths, so the checkpoint reloads without masks.
+"""
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+from .distillation import load_model
+from .model_architecture import FocalLoss, save_checkpoint, set_trainable_layers
+from .training_pipeline import DEFAULT_MODEL_PATH, build_token_cache, evaluate_model, load_token_cache
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_flops(model, seq_len: int) -> int:
+    """Multiply-accumulate FLOPs (x2) of one forward pass for a sequence of ``seq_len`` tokens"""
+    config = model.encoder.config
+    dim, head_size, ffn_dim = config.dim, config.dim // config.n_heads, config.hidden_dim
+    flops = 0
+    for layer in model.encoder.distilbert.transformer.layer:
+        inner = layer.attention.n_heads * head_size
+        flops += 2 * seq_len * dim * inner * 3           # q, k, v projections
+        flops += 2 * seq_len * seq_len * inner * 2       # scores and weighted values
+        flops += 2 * seq_len * inner * dim               # output projection
+        flops += 2 * seq_len * dim * ffn_dim * 2         # feed-forward
+    flops += 2 * dim * dim                               # pre_classifier on [CLS]
+    in_dim = dim
+    for width in model.head_dims:
+        flops += 2 * in_dim * width
+        in_dim = width
+    return flops + 2 * in_dim
+
+
+def _head_blocks(model) -> List[int]:
+    """Indices of the hidden Linear layers inside the classifier Sequential"""
+    return [4 * block + 1 for block in range(len(model.head_dims))]
+
+
+def compute_importance(model, loader, device):
+    """Return (head importance [layers, heads], list of neuron importance per head block)"""
+    if model.pruned_heads:
+        raise ValueError("Importance scoring expects a model without pruned attention heads")
+
+    config = model.encoder.config
+    classifier = model.encoder.classifier
+    head_mask = torch.ones(config.n_layers, config.n_heads, device=device, requires_grad=True)
+    head_importance = torch.zeros(config.n_layers, config.n_heads, device=device)
+    neuron_importance = [torch.zeros(width, device=device) for width in model.head_dims]
+
+    activations = {}
+
+    def capture(block):
+        def hook(_module, _inputs, output):
+            output.retain_grad()
+            activations[block] = output
+        return hook
+
+    # GELU outputs of each hidden block
+    hooks = [
+        classifier[index + 1].register_forward_hook(capture(block))
+        for block, index in enumerate(_head_blocks(model))
+    ]
+    criterion = nn.MSELoss()
+    model.eval()
+    try:
+        for input_ids, attention_mask, scores in loader:
+            outputs = model.encoder(
+                input_ids=input_ids.to(device),
+                attention_mask=attention_mask.to(device),
+                head_mask=head_mask,
+            ).logits.reshape(-1)
+            criterion(outputs, scores.to(device)).backward()
+
+            head_importance += head_mask.grad.abs()
+            head_mask.grad = None
+            for block, activation in activations.items():
+                neuron_importance[block] += (activation * activation.grad).abs().sum(dim=0)
+            model.zero_grad(set_to_none=True)
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+    # Per-layer L2 normalisation (Michel et al.) so layers are comparable
+    head_importance = head_importance / head_importance.norm(dim=1, keepdim=True).clamp_min(1e-12)
+    return head_importance.cpu(), [importance.cpu() for importance in neuron_importance]
+
+
+def _slice_linear(linear, out_index=None, in_index=None):
+    weight, bias = linear.weight.data, linear.bias.data
+    if out_index is not None:
+        weight, bias = weight[out_index], bias[out_index]
+    if in_index is not None:
+        weight = weight[:, in_index]
+    sliced = nn.Linear(weight.shape[1], weight.shape[0])
+    sliced.weight.data = weight.clone()
+    sliced.bias.data = bias.clone()
+    return sliced
+
+
+def prune_head_neurons(model, neuron_importance, keep_ratio: float) -> List[int]:
+    """Keep the ``keep_ratio`` most important neurons of every hidden head layer"""
+    classifier = model.encoder.classifier
+    new_dims = []
+    previous_keep = None
+    for block, index in enumerate(_head_blocks(model)):
+        width = model.head_dims[block]
+        keep = max(1, int(round(width * keep_ratio)))
+        kept = torch.topk(neuron_importance[block], keep).indices.sort().values
+
+        classifier[index] = _slice_linear(classifier[index], out_index=kept, in_index=previous_keep)
+        norm = classifier[index + 2]
+        new_norm = nn.LayerNorm(keep, eps=norm.eps)
+        new_norm.weight.data = norm.weight.data[kept].clone()
+        new_norm.bias.data = norm.bias.data[kept].clone()
+        classifier[index + 2] = new_norm
+
+        previous_keep = kept
+        new_dims.append(keep)
+
+    output_index = 4 * len(model.head_dims) + 1
+    classifier[output_index] = _slice_linear(classifier[output_index], in_index=previous_keep)
+    model.head_dims = tuple(new_dims)
+    return new_dims
+
+
+def select_heads_to_prune(model, head_importance, flop_budget: int, seq_len: int) -> Dict[int, List[int]]:
+    """Greedily drop the least important heads until the FLOP estimate fits the budget"""
+    config = model.encoder.config
+    head_size = config.dim // config.n_heads
+    flops_per_head = 2 * seq_len * config.dim * head_size * 4 + 2 * seq_len * seq_len * head_size * 2
+
+    flops = estimate_flops(model, seq_len)
+    remaining = {layer: config.n_heads for layer in range(config.n_layers)}
+    to_prune: Dict[int, List[int]] = {}
+    order = torch.argsort(head_importance.flatten()).tolist()
+    for flat_index in order:
+        if flops <= flop_budget:
+            break
+        layer, head = divmod(flat_index, config.n_heads)
+        if remaining[layer] <= 1:
+            continue
+        to_prune.setdefault(layer, []).append(head)
+        remaining[layer] -= 1
+        flops -= flops_per_head
+    return to_prune
+
+
+def recover(model, dataset, device, steps: int = 100, batch_size: int = 16, learning_rate: float = 2e-5) -> int:
+    """Short fine-tune after pruning; returns the number of steps taken"""
+    set_trainable_layers(model, 3)
+    optimizer = torch.optim.AdamW([p for p in model.parameters() if p.requires_grad], lr=learning_rate)
+    criterion = FocalLoss()
+    taken = 0
+    model.train()
+    while taken < steps:
+        for input_ids, attention_mask, scores in DataLoader(dataset, batch_size=batch_size, shuffle=True):
+            optimizer.zero_grad()
+            outputs = model(input_ids.to(device), attention_mask.to(device)).reshape(-1)
+            criterion(outputs, scores.to(device)).backward()
+            optimizer.step()
+            taken += 1
+            if taken >= steps:
+                break
+    model.eval()
+    return taken
+
+
+def compress(
+    output_path: str,
+    model_path: str = DEFAULT_MODEL_PATH,
+    flop_budget: float = 0.75,
+    head_keep_ratio: float = 0.5,
+    recovery_steps: int = 100,
+    batch_size: int = 16,
+    cache_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Prune ``model_path`` to ``flop_budget`` x its FLOPs, fine-tune briefly and save it"""
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    cache_path = cache_path or os.path.join(os.path.dirname(os.path.abspath(output_path)), 'token_cache.pt')
+    build_token_cache(cache_path)
+    train_dataset, val_dataset = load_token_cache(cache_path)
+    val_loader = DataLoader(val_dataset, batch_size=batch_size)
+
+    model = load_model(model_path, device)
+    # FLOPs are estimated at the mean validation length, matching dynamic padding at inference
+    seq_len = int(round(val_dataset.tensors[1].sum(dim=1).float().mean().item()))
+    flops_before = estimate_flops(model, seq_len)
+    val_mae_before, _ = evaluate_model(model, val_loader, device)
+
+    head_importance, neuron_importance = compute_importance(model, val_loader, device)
+    head_dims_before = list(model.head_dims)
+    prune_head_neurons(model, neuron_importance, head_keep_ratio)
+
+    heads_to_prune = select_heads_to_prune(model, head_importance, int(flops_before * flop_budget), seq_len)
+    if heads_to_prune:
+        model.prune_attention_heads(heads_to_prune)
+    model.to(device)
+    flops_after = estimate_flops(model, seq_len)
+    if flops_after > flops_before * flop_budget:
+        logger.warning(
+            "FLOP budget %.0f%% not reachable with one head per layer kept; achieved %.0f%%",
+            flop_budget * 100, flops_after / flops_before * 100,
+        )
+
+    val_mae_pruned, _ = evaluate_model(model, val_loader, device)
+    steps = recover(model, train_dataset, device, steps=recovery_steps, batch_size=batch_size)
+    val_mae_after, _ = evaluate_model(model, val_loader, device)
+
+    save_checkpoint(model, output_path, extra={'compressed_from': os.path.basename(model_path)})
+    return {
+        'seq_len': seq_len,
+        'flops_before': flops_before,
+        'flops_after': flops_after,
+        'flop_ratio': flops_after / flops_before,
+        'heads_pruned': sum(len(heads) for heads in heads_to_prune.values()),
+        'heads_total': model.encoder.config.n_layers * model.encoder.config.n_heads,
+        'pruned_heads': heads_to_prune,
+        'head_dims_before': head_dims_before,
+        'head_dims_after': list(model.head_dims),
+        'val_mae_before': val_mae_before,
+        'val_mae_pruned': val_mae_pruned,
+        'val_mae_after': val_mae_after,
+        'recovery_steps': steps,
+        'size_bytes_before': os.path.getsize(model_path),
+        'size_bytes_after': os.path.getsize(output_path),
+    }
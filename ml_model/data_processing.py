@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import re
+import torch
 from torch.utils.data import Dataset
 from transformers import DistilBertTokenizer
 
@@ -15,31 +16,52 @@ def clean_text(text):
     text = text.lower()
     return text
 
+# Level boundaries shared by production results, early exit and the evaluation gate
+LOW_BOUNDARY = 0.35
+HIGH_BOUNDARY = 0.65
+
 def simple_burnout_classification(score):
     """Simple classification without borderline cases"""
-    if score < 0.35:
+    if score < LOW_BOUNDARY:
         return "LOW", "🟢"
-    elif score < 0.65:
+    elif score < HIGH_BOUNDARY:
         return "MODERATE", "🟡"
     else:
         return "HIGH", "🔴"
 
+LABEL_MAPPING = {
+    "Category 1: 'Risk' (Low performance, Low potential)": 0.98,
+    "Category 2: 'Average performer' (Moderate performance, Low potential)": 0.90,
+    "Category 4: 'Inconsistent Player' (Low performance, Moderate potential)": 0.82,
+    "Category 5: 'Core Player' (Moderate performance, Moderate potential)": 0.50,
+    "Category 7: 'Potential Gem' (Low performance, High potential)": 0.58,
+    "Category 8: 'High Potential' (Moderate performance, High potential)": 0.42,
+    "Category 3: 'Solid Performer' (High performance, Low potential)": 0.15,
+    "Category 6: 'High Performer' (High performance, Moderate potential)": 0.08,
+    "Category 9: 'Star' (High performance, High potential)": 0.02
+}
+
+def clean_text_series(texts):
+    """Vectorized clean_text over a pandas Series"""
+    texts = texts.fillna('').astype(str)
+    texts = texts.str.replace(r'http\S+|www\S+|https\S+', '', regex=True)
+    texts = texts.str.replace(r'[^\w\s.,!?]', ' ', regex=True)
+    texts = texts.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return texts.str.lower()
+
 def ultimate_label_mapping(df, label_col):
     """Ultimate label mapping"""
-    label_mapping = {
-        "Category 1: 'Risk' (Low performance, Low potential)": 0.98,
-        "Category 2: 'Average performer' (Moderate performance, Low potential)": 0.90,
-        "Category 4: 'Inconsistent Player' (Low performance, Moderate potential)": 0.82,
-        "Category 5: 'Core Player' (Moderate performance, Moderate potential)": 0.50,
-        "Category 7: 'Potential Gem' (Low performance, High potential)": 0.58,
-        "Category 8: 'High Potential' (Moderate performance, High potential)": 0.42,
-        "Category 3: 'Solid Performer' (High performance, Low potential)": 0.15,
-        "Category 6: 'High Performer' (High performance, Moderate potential)": 0.08,
-        "Category 9: 'Star' (High performance, High potential)": 0.02
-    }
-    df['burnout_score'] = df[label_col].map(label_mapping)
+    df['burnout_score'] = df[label_col].map(LABEL_MAPPING)
     return df
 
+def load_labelled_reviews(csv_path, text_col='feedback', label_col='nine_box_category'):
+    """Load a review CSV as cleaned text plus mapped burnout scores"""
+    df = pd.read_csv(csv_path)
+    df = ultimate_label_mapping(df, label_col)
+    df = df.dropna(subset=['burnout_score'])
+    df['text'] = clean_text_series(df[text_col])
+    return df[df['text'].str.len() > 0].reset_index(drop=True)
+
 class BurnoutDataset(Dataset):
     """PyTorch Dataset for burnout detection"""
     def __init__(self, texts, scores, tokenizer, max_length=128):
@@ -0,0 +1,151 @@
+"""Knowledge distillation of UltimateBurnoutClassifier into a compact student.
+
+The student keeps an evenly spaced subset of the teacher's transformer layers
+and a narrower head. It is initialised from the teacher's weights. Training
+uses a blend of the teacher's scores and the true labels as targets. The
+result is a normal checkpoint with an architecture sidecar, so
+BurnoutDetectionService and AssessmentCalculator can load it directly.
+"""
+import copy
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from .model_architecture import (
+    FocalLoss,
+    build_classifier,
+    kept_layer_indices,
+    load_architecture_config,
+    save_checkpoint,
+    set_trainable_layers,
+)
+from .training_pipeline import DEFAULT_MODEL_PATH, build_token_cache, evaluate_model, load_token_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STUDENT_CONFIG = {
+    'encoder_layers': 3,
+    'head_dims': [256],
+    'head_dropouts': [0.1, 0.1],
+}
+
+
+def load_model(model_path, device):
+    model = build_classifier(load_architecture_config(model_path))
+    model.load_state_dict(torch.load(model_path, map_location=device), strict=False)
+    return model.to(device).eval()
+
+
+def init_student_from_teacher(student, teacher):
+    """Copy the teacher's embeddings, kept transformer layers and pre-classifier into the student"""
+    teacher_encoder, student_encoder = teacher.encoder, student.encoder
+    kept = kept_layer_indices(teacher_encoder.config.n_layers, student_encoder.config.n_layers)
+
+    student_encoder.distilbert.embeddings.load_state_dict(teacher_encoder.distilbert.embeddings.state_dict())
+    for target, source in enumerate(kept):
+        student_encoder.distilbert.transformer.layer[target].load_state_dict(
+            teacher_encoder.distilbert.transformer.layer[source].state_dict()
+        )
+    student_encoder.pre_classifier.load_state_dict(teacher_encoder.pre_classifier.state_dict())
+
+
+def teacher_scores(teacher, dataset, device, batch_size=64):
+    """Run the teacher once over a dataset; its outputs are the soft targets"""
+    outputs = []
+    with torch.no_grad():
+        for input_ids, attention_mask, _ in DataLoader(dataset, batch_size=batch_size):
+            outputs.append(teacher(input_ids.to(device), attention_mask.to(device)).reshape(-1).cpu())
+    return torch.cat(outputs)
+
+
+def distill(
+    output_path: str,
+    teacher_path: str = DEFAULT_MODEL_PATH,
+    student_config: Optional[Dict[str, Any]] = None,
+    max_epochs: int = 8,
+    patience: int = 2,
+    batch_size: int = 16,
+    learning_rate: float = 5e-5,
+    alpha: float = 0.7,
+    cache_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Train a student against the teacher's scores and save it to ``output_path``.
+
+    The loss is ``alpha * MSE(student, teacher) + (1 - alpha) * FocalLoss(student, label)``.
+    Early stopping uses validation MAE against the true labels.
+    """
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    student_config = {**DEFAULT_STUDENT_CONFIG, **(student_config or {})}
+    cache_path = cache_path or os.path.join(os.path.dirname(os.path.abspath(output_path)), 'token_cache.pt')
+
+    build_token_cache(cache_path)
+    train_dataset, val_dataset = load_token_cache(cache_path)
+
+    teacher = load_model(teacher_path, device)
+    soft_targets = teacher_scores(teacher, train_dataset, device)
+    distill_dataset = TensorDataset(*train_dataset.tensors, soft_targets)
+
+    student = build_classifier(student_config)
+    init_student_from_teacher(student, teacher)
+    del teacher
+    student.to(device)
+    set_trainable_layers(student, student.encoder.config.n_layers)
+
+    distill_criterion = nn.MSELoss()
+    label_criterion = FocalLoss()
+    optimizer = torch.optim.AdamW([p for p in student.parameters() if p.requires_grad], lr=learning_rate)
+    train_loader = DataLoader(distill_dataset, batch_size=batch_size, shuffle=True)
+    val_loader = DataLoader(val_dataset, batch_size=batch_size * 4)
+
+    best_mae, best_epoch, best_state = float('inf'), 0, None
+    epochs_without_improvement = 0
+    for epoch in range(1, max_epochs + 1):
+        student.train()
+        for input_ids, attention_mask, labels, targets in train_loader:
+            optimizer.zero_grad()
+            outputs = student(input_ids.to(device), attention_mask.to(device)).reshape(-1)
+            loss = (
+                alpha * distill_criterion(outputs, targets.to(device))
+                + (1 - alpha) * label_criterion(outputs, labels.to(device))
+            )
+            loss.backward()
+            optimizer.step()
+
+        val_mae, _ = evaluate_model(student, val_loader, device)
+        logger.info("Distillation epoch %d: val MAE %.4f", epoch, val_mae)
+        if val_mae < best_mae:
+            best_mae, best_epoch = val_mae, epoch
+            best_state = copy.deepcopy(student.state_dict())
+            epochs_without_improvement = 0
+        else:
+            epochs_without_improvement += 1
+            if epochs_without_improvement >= patience:
+                break
+
+    if best_state is not None:
+        student.load_state_dict(best_state)
+    save_checkpoint(student, output_path, extra={
+        'distilled_from': os.path.basename(teacher_path),
+        'best_val_mae': best_mae,
+    })
+    return {'best_val_mae': best_mae, 'best_epoch': best_epoch, 'student_config': student_config}
+
+
+def compare_to_teacher(student_path: str, teacher_path: str = DEFAULT_MODEL_PATH, batch_size: int = 64) -> Dict[str, Any]:
+    """Evaluate teacher and student on test_set.csv through the production inference path"""
+    from .evaluation import evaluate_checkpoint
+
+    teacher = evaluate_checkpoint(teacher_path, batch_size=batch_size)
+    student = evaluate_checkpoint(student_path, batch_size=batch_size)
+    return {
+        'teacher': teacher,
+        'student': student,
+        'speedup': teacher['latency_ms_per_sample'] / student['latency_ms_per_sample'],
+        'mae_delta': student['mae'] - teacher['mae'],
+        'r2_delta': student['r2'] - teacher['r2'],
+        'level_accuracy_delta': student['level_accuracy'] - teacher['level_accuracy'],
+    }
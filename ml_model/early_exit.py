@@ -0,0 +1,136 @@
+"""Early-exit inference for models trained with intermediate exit heads.
+
+Forward hooks on the exit layers score the [CLS] state. A sample takes the
+exit score when it is clearly LOW or clearly HIGH, i.e. at least ``margin``
+beyond the 0.35/0.65 level boundaries. Once every sample in the batch has
+exited, the hook stops the forward pass, so the remaining layers never run.
+Ambiguous samples continue to the main head at full depth.
+
+Hooks let the model run its own attention-mask preparation, so this works
+across transformers versions without re-implementing the encoder loop.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+import torch
+
+from .data_processing import HIGH_BOUNDARY, LOW_BOUNDARY
+
+logger = logging.getLogger(__name__)
+
+
+class _ExitReached(Exception):
+    """Raised from a layer hook once every sample in the batch has exited"""
+
+    def __init__(self, layers_run):
+        super().__init__(layers_run)
+        self.layers_run = layers_run
+
+
+class EarlyExitStats:
+    """Thread-safe counters of exit layers and layers executed"""
+
+    def __init__(self, total_layers: int, log_every: int = 500):
+        self.total_layers = total_layers
+        self.log_every = log_every
+        self._lock = threading.Lock()
+        self._exits = Counter()
+        self._samples = 0
+        self._layers_executed = 0
+        self._next_log = log_every
+
+    def record(self, exit_layers, layers_run: int) -> None:
+        with self._lock:
+            self._exits.update(exit_layers)
+            self._samples += len(exit_layers)
+            self._layers_executed += layers_run * len(exit_layers)
+            should_log = self.log_every and self._samples >= self._next_log
+            if should_log:
+                self._next_log = self._samples + self.log_every
+        if should_log:
+            summary = self.summary()
+            logger.info(
+                "Early exit after %d samples: %.2f/%d layers on average, exit distribution %s",
+                summary['samples'], summary['average_layers_executed'], self.total_layers,
+                summary['exit_distribution'],
+            )
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            samples = self._samples
+            return {
+                'samples': samples,
+                'average_layers_executed': self._layers_executed / samples if samples else 0.0,
+                'exit_distribution': {
+                    layer: count / samples for layer, count in sorted(self._exits.items())
+                } if samples else {},
+            }
+
+
+def is_confident(scores: torch.Tensor, margin: float) -> torch.Tensor:
+    """True where a score is clearly LOW or clearly HIGH"""
+    return (scores <= LOW_BOUNDARY - margin) | (scores >= HIGH_BOUNDARY + margin)
+
+
+# Per-thread state of the batch currently running in early-exit mode
+_active = threading.local()
+_install_lock = threading.Lock()
+
+
+def _exit_hook(model, layer):
+    def hook(_module, _inputs, output):
+        state = getattr(_active, 'state', None)
+        if state is None or state['model'] is not model:
+            return
+        hidden = output[-1] if isinstance(output, tuple) else output
+        scores = model.exit_heads[str(layer)](hidden[:, 0]).reshape(-1)
+        exited_at = state['exited_at']
+        newly_confident = (exited_at < 0) & is_confident(scores, state['margin'])
+        state['results'][newly_confident] = scores[newly_confident]
+        exited_at[newly_confident] = layer + 1
+        if bool((exited_at >= 0).all()):
+            raise _ExitReached(layer + 1)
+    return hook
+
+
+def install_exit_hooks(model) -> None:
+    """Attach the exit hooks once; they are inert outside early_exit_scores"""
+    with _install_lock:
+        if getattr(model, '_exit_hooks_installed', False):
+            return
+        layers = model.encoder.distilbert.transformer.layer
+        for layer in model.exit_layers:
+            if layer < len(layers) - 1:
+                layers[layer].register_forward_hook(_exit_hook(model, layer))
+        model._exit_hooks_installed = True
+
+
+def early_exit_scores(model, input_ids, attention_mask, margin: float, stats: Optional[EarlyExitStats] = None):
+    """Score a batch, returning each sample's exit score where it was confident early"""
+    install_exit_hooks(model)
+    total_layers = len(model.encoder.distilbert.transformer.layer)
+    batch_size = input_ids.shape[0]
+    state = {
+        'model': model,
+        'margin': margin,
+        'results': torch.full((batch_size,), float('nan'), device=input_ids.device),
+        'exited_at': torch.full((batch_size,), -1, dtype=torch.long, device=input_ids.device),
+    }
+
+    layers_run = total_layers
+    _active.state = state
+    try:
+        main_scores = model(input_ids, attention_mask).reshape(-1)
+        pending = state['exited_at'] < 0
+        state['results'][pending] = main_scores[pending]
+        state['exited_at'][pending] = total_layers
+    except _ExitReached as reached:
+        layers_run = reached.layers_run
+    finally:
+        _active.state = None
+
+    if stats is not None:
+        stats.record(state['exited_at'].tolist(), layers_run)
+    return state['results']
@@ -0,0 +1,136 @@
+"""Batched evaluation of a checkpoint plus a quality/throughput regression gate.
+
+Scoring goes through ``BurnoutDetectionService.score_batch``, the same
+batched path used for production predictions. Metrics are computed with
+vectorized numpy/sklearn over the whole split.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import confusion_matrix, mean_absolute_error, r2_score
+
+from .data_processing import HIGH_BOUNDARY, LOW_BOUNDARY, ultimate_label_mapping
+from .early_exit import EarlyExitStats
+from .model_service import BurnoutDetectionService
+from .training_pipeline import DEFAULT_MODEL_PATH, TEST_CSV
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ["LOW", "MODERATE", "HIGH"]
+LEVEL_THRESHOLDS = [LOW_BOUNDARY, HIGH_BOUNDARY]
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'evaluation_baseline.json')
+
+# Allowed regression of a candidate against the stored baseline
+DEFAULT_TOLERANCES = {
+    'mae_increase': 0.01,        # absolute MAE points
+    'r2_decrease': 0.02,         # absolute R² points
+    'level_accuracy_decrease': 0.02,
+    'latency_increase': 0.10,    # relative, per-sample latency
+}
+
+
+def scores_to_levels(scores) -> np.ndarray:
+    """Vectorized simple_burnout_classification: 0=LOW, 1=MODERATE, 2=HIGH"""
+    return np.digitize(np.asarray(scores, dtype=float), LEVEL_THRESHOLDS)
+
+
+def load_evaluation_split(csv_path: str = TEST_CSV, text_col: str = 'feedback', label_col: str = 'nine_box_category'):
+    df = pd.read_csv(csv_path)
+    df = ultimate_label_mapping(df, label_col).dropna(subset=['burnout_score'])
+    return df[text_col].fillna('').astype(str).tolist(), df['burnout_score'].to_numpy(dtype=float)
+
+
+def evaluate_checkpoint(
+    model_path: str = DEFAULT_MODEL_PATH,
+    csv_path: str = TEST_CSV,
+    batch_size: int = 64,
+    service: Optional[BurnoutDetectionService] = None,
+    early_exit_margin: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Score a split in batches and return quality and latency metrics.
+
+    Raises if ``model_path`` is missing or does not load exactly, so random
+    weights are never scored or saved as a baseline.
+    """
+    service = service or BurnoutDetectionService(model_path, early_exit_margin=early_exit_margin, strict=True)
+    texts, targets = load_evaluation_split(csv_path)
+
+    # Warm-up batch so lazy kernel/thread-pool initialisation is not timed
+    service.score_batch(texts[:batch_size], batch_size=batch_size)
+    service.exit_stats = EarlyExitStats(service.model.encoder.config.n_layers, log_every=0)
+
+    started = time.perf_counter()
+    predictions = np.asarray(service.score_batch(texts, batch_size=batch_size), dtype=float)
+    elapsed = time.perf_counter() - started
+
+    true_levels = scores_to_levels(targets)
+    predicted_levels = scores_to_levels(predictions)
+    matrix = confusion_matrix(true_levels, predicted_levels, labels=range(len(LEVELS)))
+
+    return {
+        'checkpoint': model_path,
+        'dataset': os.path.basename(csv_path),
+        'samples': len(texts),
+        'batch_size': batch_size,
+        'mae': float(mean_absolute_error(targets, predictions)),
+        'r2': float(r2_score(targets, predictions)),
+        'level_accuracy': float(np.mean(true_levels == predicted_levels)),
+        'level_confusion': {
+            LEVELS[i]: {LEVELS[j]: int(matrix[i, j]) for j in range(len(LEVELS))}
+            for i in range(len(LEVELS))
+        },
+        'total_seconds': elapsed,
+        'latency_ms_per_sample': elapsed * 1000 / max(len(texts), 1),
+        'samples_per_second': len(texts) / elapsed if elapsed else float('inf'),
+        'early_exit_margin': service.early_exit_margin,
+        'early_exit': service.exit_stats.summary(),
+    }
+
+
+def check_regression(
+    candidate: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerances: Optional[Dict[str, float]] = None,
+) -> List[str]:
+    """Return the reasons the candidate fails the gate (empty when it passes)"""
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    failures = []
+
+    if candidate['mae'] > baseline['mae'] + tolerances['mae_increase']:
+        failures.append(
+            f"MAE {candidate['mae']:.4f} exceeds baseline {baseline['mae']:.4f} + {tolerances['mae_increase']}"
+        )
+    if candidate['r2'] < baseline['r2'] - tolerances['r2_decrease']:
+        failures.append(
+            f"R² {candidate['r2']:.4f} below baseline {baseline['r2']:.4f} - {tolerances['r2_decrease']}"
+        )
+    if candidate['level_accuracy'] < baseline['level_accuracy'] - tolerances['level_accuracy_decrease']:
+        failures.append(
+            f"level accuracy {candidate['level_accuracy']:.3f} below baseline "
+            f"{baseline['level_accuracy']:.3f} - {tolerances['level_accuracy_decrease']}"
+        )
+    latency_limit = baseline['latency_ms_per_sample'] * (1 + tolerances['latency_increase'])
+    if candidate['latency_ms_per_sample'] > latency_limit:
+        failures.append(
+            f"latency {candidate['latency_ms_per_sample']:.2f} ms/sample exceeds "
+            f"{latency_limit:.2f} ms/sample (baseline {baseline['latency_ms_per_sample']:.2f} "
+            f"+{tolerances['latency_increase']:.0%})"
+        )
+    return failures
+
+
+def load_baseline(path: str = DEFAULT_BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_baseline(metrics: Dict[str, Any], path: str = DEFAULT_BASELINE_PATH) -> None:
+    with open(path, 'w') as handle:
+        json.dump(metrics, handle, indent=2)
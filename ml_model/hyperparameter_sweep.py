@@ -0,0 +1,181 @@
+"""Parallel hyperparameter sweep over the classifier head and focal loss.
+
+Trials run in a process pool. Each worker pins itself to its own slice of
+CPU cores, and every trial reads the same pre-tokenized dataset cache.
+"""
+import csv
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from .training_pipeline import TrainingConfig, build_token_cache, load_token_cache, train_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {
+    'head_dims': [[1024, 512, 256], [512, 256], [256]],
+    'head_dropouts': [[0.3, 0.2, 0.1, 0.1], [0.1, 0.1, 0.1, 0.1]],
+    'focal_alpha': [0.5, 1.0],
+    'focal_gamma': [1.0, 2.0],
+}
+
+LEADERBOARD_FIELDS = [
+    'rank', 'trial_id', 'best_val_mae', 'best_val_r2', 'best_epoch', 'epochs_run',
+    'wall_clock_seconds', 'cores', 'cpu_hours', 'checkpoint', 'params', 'error',
+]
+
+# Core slice owned by the current worker process, set by _pin_worker
+_worker_cores: List[int] = []
+
+
+def expand_grid(grid: Dict[str, List[Any]], max_trials: Optional[int] = None, seed: int = 42) -> List[Dict[str, Any]]:
+    """Expand a parameter grid into trial parameter dicts.
+
+    ``head_dropouts`` lists are trimmed or padded with their last value to fit
+    the depth of the ``head_dims`` they are paired with.
+    """
+    keys = sorted(grid)
+    trials = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(zip(keys, values))
+        if 'head_dims' in params and 'head_dropouts' in params:
+            params['head_dropouts'] = _fit_dropouts(params['head_dropouts'], len(params['head_dims']))
+        if params not in trials:
+            trials.append(params)
+
+    if max_trials and len(trials) > max_trials:
+        trials = random.Random(seed).sample(trials, max_trials)
+    return trials
+
+
+def _fit_dropouts(dropouts, num_hidden):
+    dropouts = list(dropouts)[:num_hidden + 1]
+    while len(dropouts) < num_hidden + 1:
+        dropouts.append(dropouts[-1])
+    return dropouts
+
+
+def core_slices(workers: int, cores_per_trial: Optional[int] = None) -> List[List[int]]:
+    """Split the cores available to this process into one disjoint slice per worker"""
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    if cores_per_trial is None:
+        cores_per_trial = max(1, len(available) // workers)
+    if cores_per_trial * workers > len(available):
+        raise ValueError(
+            f"{workers} workers x {cores_per_trial} cores needs more than the {len(available)} available cores"
+        )
+    return [available[i * cores_per_trial:(i + 1) * cores_per_trial] for i in range(workers)]
+
+
+def _pin_worker(slice_queue):
+    """Pool initializer: claim a core slice and restrict this process to it"""
+    global _worker_cores
+    _worker_cores = slice_queue.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, _worker_cores)
+    torch.set_num_threads(len(_worker_cores))
+    torch.set_num_interop_threads(1)
+
+
+def _run_trial(trial_id: int, params: Dict[str, Any], cache_path: str, output_dir: str, base_config: Dict[str, Any]):
+    config = TrainingConfig(**{**base_config, **params})
+    checkpoint = os.path.join(output_dir, f'trial_{trial_id:03d}.pth')
+    cores = len(_worker_cores) or torch.get_num_threads()
+
+    started = time.perf_counter()
+    try:
+        train_dataset, val_dataset = load_token_cache(cache_path)
+        _, metrics = train_model(
+            config, train_dataset, val_dataset,
+            device=torch.device('cpu'),
+            output_path=checkpoint,
+        )
+        error = ''
+    except Exception as exc:
+        logger.error("Trial %d failed: %s", trial_id, exc, exc_info=True)
+        metrics = {'best_val_mae': float('inf'), 'best_val_r2': float('nan'), 'best_epoch': 0, 'epochs_run': 0}
+        checkpoint = ''
+        error = str(exc)
+    wall_clock = time.perf_counter() - started
+
+    return {
+        'trial_id': trial_id,
+        **metrics,
+        'wall_clock_seconds': round(wall_clock, 2),
+        'cores': cores,
+        'cpu_hours': round(wall_clock * cores / 3600, 4),
+        'checkpoint': checkpoint,
+        'params': json.dumps(params, sort_keys=True),
+        'error': error,
+    }
+
+
+def run_sweep(
+    output_dir: str,
+    grid: Optional[Dict[str, List[Any]]] = None,
+    workers: int = 2,
+    cores_per_trial: Optional[int] = None,
+    max_trials: Optional[int] = None,
+    base_config: Optional[Dict[str, Any]] = None,
+    cache_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run every trial of the grid and write ``leaderboard.csv`` to ``output_dir``.
+
+    The leaderboard is ranked by validation MAE and records each trial's
+    wall-clock time and CPU-hours (wall-clock x pinned cores).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    trials = expand_grid(grid or DEFAULT_GRID, max_trials=max_trials)
+    base_config = base_config or {}
+    cache_path = cache_path or os.path.join(output_dir, 'token_cache.pt')
+
+    build_token_cache(cache_path)
+    slices = core_slices(workers, cores_per_trial)
+    logger.info("Running %d trials on %d workers with core slices %s", len(trials), workers, slices)
+
+    # spawn keeps torch's thread pools from leaking across forked workers
+    context = multiprocessing.get_context('spawn')
+    slice_queue = context.Queue()
+    for cores in slices:
+        slice_queue.put(cores)
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_pin_worker,
+        initargs=(slice_queue,),
+    ) as pool:
+        futures = [
+            pool.submit(_run_trial, trial_id, params, cache_path, output_dir, base_config)
+            for trial_id, params in enumerate(trials, start=1)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            logger.info(
+                "Trial %d finished: val MAE %.4f in %.1fs",
+                result['trial_id'], result['best_val_mae'], result['wall_clock_seconds'],
+            )
+            results.append(result)
+
+    results.sort(key=lambda row: row['best_val_mae'])
+    for rank, row in enumerate(results, start=1):
+        row['rank'] = rank
+    write_leaderboard(results, os.path.join(output_dir, 'leaderboard.csv'))
+    return results
+
+
+def write_leaderboard(results: List[Dict[str, Any]], path: str) -> None:
+    with open(path, 'w', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=LEADERBOARD_FIELDS)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({key: row.get(key, '') for key in LEADERBOARD_FIELDS})
@@ -0,0 +1,234 @@
+"""Incremental fine-tuning from completed, HR-validated assessments.
+
+Each run starts from the latest published checkpoint. It pulls only sessions
+HR validated after that checkpoint's ``trained_through`` timestamp, reading
+them from the database in keyset-paginated chunks. The watermark follows
+``validated_at``, not ``completed_at``. A session completed before a run but
+scored by HR after it is still picked up by the next run. It fine-tunes the head and the
+top transformer layers for a bounded number of steps, then publishes the
+result as the next versioned checkpoint.
+"""
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from transformers import DistilBertTokenizer
+
+from .data_processing import clean_text, load_labelled_reviews
+from .model_architecture import (
+    FocalLoss,
+    architecture_config_path,
+    build_classifier,
+    load_architecture_config,
+    save_checkpoint,
+    set_trainable_layers,
+)
+from .training_pipeline import DEFAULT_MODEL_PATH, VALIDATION_CSV, evaluate_model, tokenize_texts
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), 'checkpoints')
+_VERSION_PATTERN = re.compile(r'^burnout_v(\d+)\.pth$')
+
+Chunk = List[Tuple[str, float]]
+
+
+def checkpoint_path(version: int, checkpoint_dir: str = CHECKPOINT_DIR) -> str:
+    return os.path.join(checkpoint_dir, f'burnout_v{version:03d}.pth')
+
+
+def latest_checkpoint(checkpoint_dir: str = CHECKPOINT_DIR) -> Tuple[int, Optional[str]]:
+    """Return (version, path) of the newest published checkpoint, or (0, None)"""
+    if not os.path.isdir(checkpoint_dir):
+        return 0, None
+    versions = [
+        int(match.group(1))
+        for match in map(_VERSION_PATTERN.match, os.listdir(checkpoint_dir))
+        if match
+    ]
+    if not versions:
+        return 0, None
+    version = max(versions)
+    return version, checkpoint_path(version, checkpoint_dir)
+
+
+def iter_validated_sessions(since: Optional[datetime], until: datetime, chunk_size: int = 500) -> Iterator[Chunk]:
+    """Yield (combined answers, validated score) for sessions validated in (since, until].
+
+    Sessions are paged by (validated_at, id) so each chunk is a bounded query,
+    and the answers for a whole chunk are fetched with one extra query.
+    """
+    from django.db.models import Q
+    from chatbot.models import ChatMessage, ChatSession
+
+    sessions = ChatSession.objects.filter(
+        is_complete=True,
+        validated_score__isnull=False,
+        validated_at__lte=until,
+    )
+    if since is not None:
+        sessions = sessions.filter(validated_at__gt=since)
+    sessions = sessions.order_by('validated_at', 'id')
+
+    last_key = None
+    while True:
+        page = sessions
+        if last_key is not None:
+            validated_at, session_id = last_key
+            page = page.filter(Q(validated_at__gt=validated_at) | Q(validated_at=validated_at, id__gt=session_id))
+        rows = list(page.values_list('id', 'validated_at', 'validated_score')[:chunk_size])
+        if not rows:
+            return
+
+        answers: Dict[int, List[str]] = {}
+        for session_id, content in (
+            ChatMessage.objects
+            .filter(session_id__in=[row[0] for row in rows], message_type='answer')
+            .order_by('session_id', 'timestamp')
+            .values_list('session_id', 'content')
+        ):
+            if content and content.strip():
+                answers.setdefault(session_id, []).append(content)
+
+        yield [
+            (" ".join(answers[session_id]), score)
+            for session_id, _, score in rows
+            if session_id in answers
+        ]
+        last_key = (rows[-1][1], rows[-1][0])
+
+
+def _validation_loader(tokenizer, batch_size):
+    df = load_labelled_reviews(VALIDATION_CSV)
+    input_ids, attention_mask = tokenize_texts(tokenizer, df['text'])
+    scores = torch.tensor(df['burnout_score'].values, dtype=torch.float)
+    return DataLoader(TensorDataset(input_ids, attention_mask, scores), batch_size=batch_size * 4)
+
+
+def finetune_incremental(
+    chunk_source: Callable[[], Iterator[Chunk]],
+    base_checkpoint: str,
+    output_path: str,
+    max_steps: int = 200,
+    epochs: int = 1,
+    batch_size: int = 16,
+    learning_rate: float = 1e-5,
+    top_layers: int = 2,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Fine-tune ``base_checkpoint`` on the chunks from ``chunk_source`` and save it.
+
+    ``chunk_source`` is called once per epoch. Training stops after
+    ``max_steps`` optimizer steps whatever the amount of new data.
+    """
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
+
+    architecture = load_architecture_config(base_checkpoint)
+    model = build_classifier(architecture)
+    model.load_state_dict(torch.load(base_checkpoint, map_location=device), strict=False)
+    model.to(device)
+    set_trainable_layers(model, top_layers)
+
+    criterion = FocalLoss()
+    optimizer = torch.optim.AdamW([p for p in model.parameters() if p.requires_grad], lr=learning_rate)
+    val_loader = _validation_loader(tokenizer, batch_size)
+    val_mae_before, _ = evaluate_model(model, val_loader, device)
+
+    steps, samples = 0, 0
+    for _ in range(epochs):
+        for chunk in chunk_source():
+            if not chunk:
+                continue
+            texts = [clean_text(text) for text, _ in chunk]
+            input_ids, attention_mask = tokenize_texts(tokenizer, texts)
+            scores = torch.tensor([score for _, score in chunk], dtype=torch.float)
+            loader = DataLoader(TensorDataset(input_ids, attention_mask, scores), batch_size=batch_size, shuffle=True)
+            samples += len(chunk)
+
+            model.train()
+            for batch_ids, batch_mask, batch_scores in loader:
+                optimizer.zero_grad()
+                outputs = model(batch_ids.to(device), batch_mask.to(device))
+                loss = criterion(outputs.reshape(-1), batch_scores.to(device).reshape(-1))
+                loss.backward()
+                optimizer.step()
+                steps += 1
+                if steps >= max_steps:
+                    break
+            if steps >= max_steps:
+                break
+        if steps >= max_steps:
+            break
+
+    val_mae_after, val_r2_after = evaluate_model(model, val_loader, device)
+    metrics = {
+        'steps': steps,
+        'samples': samples,
+        'val_mae_before': val_mae_before,
+        'val_mae_after': val_mae_after,
+        'val_r2_after': val_r2_after,
+    }
+    if samples:
+        save_checkpoint(model, output_path, extra={**(extra or {}), **metrics})
+    return metrics
+
+
+def run_incremental_update(
+    checkpoint_dir: str = CHECKPOINT_DIR,
+    chunk_size: int = 500,
+    promote: bool = False,
+    **finetune_options,
+) -> Dict[str, Any]:
+    """Fine-tune on sessions validated since the latest checkpoint and publish the next version"""
+    version, base = latest_checkpoint(checkpoint_dir)
+    base = base or DEFAULT_MODEL_PATH
+    since = load_architecture_config(base).get('trained_through')
+    since = datetime.fromisoformat(since) if since else None
+
+    # Fix the upper bound now so sessions validated mid-run are left for the next one
+    until = _latest_validation(since)
+    if until is None:
+        return {'published': None, 'base': base, 'steps': 0, 'samples': 0}
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    output_path = checkpoint_path(version + 1, checkpoint_dir)
+    metrics = finetune_incremental(
+        lambda: iter_validated_sessions(since, until, chunk_size),
+        base,
+        output_path,
+        extra={
+            'version': version + 1,
+            'parent': os.path.basename(base),
+            'trained_through': until.isoformat(),
+            'created_at': datetime.now().astimezone().isoformat(),
+        },
+        **finetune_options,
+    )
+    if not metrics['samples']:
+        return {'published': None, 'base': base, **metrics}
+
+    if promote:
+        shutil.copyfile(output_path, DEFAULT_MODEL_PATH)
+        shutil.copyfile(architecture_config_path(output_path), architecture_config_path(DEFAULT_MODEL_PATH))
+
+    return {'published': output_path, 'base': base, 'version': version + 1, **metrics}
+
+
+def _latest_validation(since: Optional[datetime]) -> Optional[datetime]:
+    from django.db.models import Max
+    from chatbot.models import ChatSession
+
+    sessions = ChatSession.objects.filter(
+        is_complete=True,
+        validated_score__isnull=False,
+        validated_at__isnull=False,
+    )
+    if since is not None:
+        sessions = sessions.filter(validated_at__gt=since)
+    return sessions.aggregate(latest=Max('validated_at'))['latest']
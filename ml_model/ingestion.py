@@ -0,0 +1,147 @@
+"""Streaming ingestion of large review CSV exports into the training store.
+
+The CSV is read in fixed-size chunks. Label mapping and cleaning run
+vectorized on each chunk. Rows are deduplicated by a hash of the cleaned
+feedback and appended to a SQLite training store. The store's primary key
+does the cross-chunk deduplication on disk, so memory use depends on the
+chunk size, not on the file size.
+"""
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, asdict
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from .data_processing import LABEL_MAPPING, clean_text_series
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), 'training_data', 'training_store.sqlite3')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_reviews (
+    feedback_hash INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    burnout_score REAL NOT NULL,
+    label TEXT NOT NULL,
+    source TEXT NOT NULL
+)
+"""
+
+
+@dataclass
+class IngestionStats:
+    rows_read: int = 0
+    rows_unlabelled: int = 0
+    rows_empty: int = 0
+    rows_duplicate: int = 0
+    rows_inserted: int = 0
+    chunks: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def connect_store(store_path: str = DEFAULT_STORE_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    connection = sqlite3.connect(store_path)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+def feedback_hashes(texts: pd.Series) -> pd.Series:
+    """64-bit hash per cleaned feedback, stored as a signed SQLite integer"""
+    hashes = pd.util.hash_pandas_object(texts, index=False).values.view('int64')
+    return pd.Series(hashes, index=texts.index)
+
+
+def prepare_chunk(chunk: pd.DataFrame, text_col: str, label_col: str, stats: IngestionStats) -> pd.DataFrame:
+    """Map labels, clean text and hash one chunk without per-row Python loops"""
+    stats.rows_read += len(chunk)
+
+    scores = chunk[label_col].map(LABEL_MAPPING)
+    labelled = scores.notna()
+    stats.rows_unlabelled += int((~labelled).sum())
+
+    prepared = pd.DataFrame({
+        'text': clean_text_series(chunk.loc[labelled, text_col]),
+        'burnout_score': scores[labelled],
+        'label': chunk.loc[labelled, label_col],
+    })
+    non_empty = prepared['text'].str.len() > 0
+    stats.rows_empty += int((~non_empty).sum())
+    prepared = prepared[non_empty]
+
+    prepared['feedback_hash'] = feedback_hashes(prepared['text'])
+    deduplicated = prepared.drop_duplicates('feedback_hash')
+    stats.rows_duplicate += len(prepared) - len(deduplicated)
+    return deduplicated
+
+
+def ingest_csv(
+    csv_path: str,
+    store_path: str = DEFAULT_STORE_PATH,
+    chunksize: int = 10000,
+    text_col: str = 'feedback',
+    label_col: str = 'nine_box_category',
+) -> IngestionStats:
+    """Append a review CSV of any size to the training store, one chunk at a time"""
+    stats = IngestionStats()
+    source = os.path.basename(csv_path)
+    connection = connect_store(store_path)
+    try:
+        reader = pd.read_csv(
+            csv_path,
+            usecols=[text_col, label_col],
+            dtype=str,
+            chunksize=chunksize,
+            encoding='utf-8-sig',
+        )
+        for chunk in reader:
+            prepared = prepare_chunk(chunk, text_col, label_col, stats)
+            with connection:
+                before = connection.total_changes
+                connection.executemany(
+                    "INSERT OR IGNORE INTO training_reviews "
+                    "(feedback_hash, text, burnout_score, label, source) VALUES (?, ?, ?, ?, ?)",
+                    zip(
+                        prepared['feedback_hash'].tolist(),
+                        prepared['text'].tolist(),
+                        prepared['burnout_score'].tolist(),
+                        prepared['label'].tolist(),
+                        [source] * len(prepared),
+                    ),
+                )
+                inserted = connection.total_changes - before
+            stats.rows_inserted += inserted
+            stats.rows_duplicate += len(prepared) - inserted
+            stats.chunks += 1
+            logger.info("Chunk %d: %d new rows (%d read so far)", stats.chunks, inserted, stats.rows_read)
+    finally:
+        connection.close()
+    return stats
+
+
+def iter_training_store(store_path: str = DEFAULT_STORE_PATH, chunksize: int = 10000) -> Iterator[pd.DataFrame]:
+    """Yield the training store back as DataFrames of at most ``chunksize`` rows"""
+    connection = connect_store(store_path)
+    try:
+        yield from pd.read_sql_query(
+            "SELECT text, burnout_score, label, source FROM training_reviews ORDER BY rowid",
+            connection,
+            chunksize=chunksize,
+        )
+    finally:
+        connection.close()
+
+
+def count_training_rows(store_path: str = DEFAULT_STORE_PATH) -> Optional[int]:
+    if not os.path.exists(store_path):
+        return None
+    connection = connect_store(store_path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM training_reviews").fetchone()[0]
+    finally:
+        connection.close()
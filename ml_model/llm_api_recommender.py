@@ -1,17 +1,35 @@
+import hashlib
 import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import requests
-from requests import Timeout as RequestsTimeout, RequestException
+from requests import HTTPError, Timeout as RequestsTimeout, RequestException
 
-logger = logging.getLogger(__name__)
+from .llm_metrics import LatencyTracker
+from .llm_resilience import HedgeStats, hedged_call
+from .llm_router import (
+    Provider,
+    ProviderCircuitOpen,
+    ProviderRateLimited,
+    ProviderRouter,
+    ProviderUnavailable,
+    load_provider_configs,
+)
+from .llm_stream_parser import RecommendationStreamParser
+from .prompt_builder import BuiltPrompt, PromptBuilder
+from .rate_limiter import INTERACTIVE, RateLimitRejected, estimate_tokens
+from .single_flight import FileLockStore, SingleFlight
 
+logger = logging.getLogger(__name__)
 
-class GroqAPIUnavailable(RuntimeError):
-    """Raised when the Groq API cannot be reached."""
+# Earlier names, from when Groq was the only provider
+GroqAPIUnavailable = ProviderUnavailable
+GroqCircuitOpen = ProviderCircuitOpen
+GroqRateLimited = ProviderRateLimited
 
 
 @dataclass
@@ -25,239 +43,419 @@ class Recommendation:
 
 class LLMApiRecommender:
     """
-    Calls the FREE Groq API (llama3-8b-8192) to generate structured
-    burnout recovery recommendations.
+    Calls the FREE Groq API (or any configured OpenAI-compatible providers)
+    to generate structured burnout recovery recommendations.
     """
 
-    def __init__(self) -> None:
-        self.api_key = os.getenv("GROQ_API_KEY")
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.model = "llama-3.1-8b-instant"
-        
-        if not self.api_key:
-            logger.warning("GROQ_API_KEY is not set. Groq API calls will fail.")
-        
-        logger.info("Configured Groq API client for model %s", self.model)
-
-    def generate_recommendations(self, responses: List[Dict[str, str]]) -> Dict[str, Any]:
-        if not self.api_key:
-            raise GroqAPIUnavailable("GROQ_API_KEY not set")
-
-        logger.debug(
-            "Calling Groq model %s with %d response pairs",
-            self.model,
-            len(responses),
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        model: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        # Point GROQ_API_URL at a local stand-in, or list several endpoints in
+        # LLM_PROVIDERS, to exercise the client offline
+        configs = load_provider_configs(api_key, api_url, model)
+        for config in configs:
+            if config.missing_key:
+                logger.warning("%s is not set. LLM provider %s is disabled.", config.api_key_env, config.name)
+
+        breaker_settings = {
+            "failure_threshold": int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            "slow_call_seconds": float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "30")),
+            "slow_call_threshold": int(os.getenv("LLM_BREAKER_SLOW_CALLS", "5")),
+            "recovery_interval": float(os.getenv("LLM_BREAKER_RECOVERY_SECONDS", "30")),
+        }
+        self.router = ProviderRouter([
+            Provider(
+                config,
+                pool_size=pool_size or int(os.getenv("GROQ_POOL_SIZE", "10")),
+                max_retries=max_retries if max_retries is not None else int(os.getenv("GROQ_MAX_RETRIES", "2")),
+                deadline=deadline or float(os.getenv("GROQ_DEADLINE_SECONDS", "120")),
+                max_queue=int(os.getenv("LLM_QUEUE_MAX", "200")),
+                timeout_floor=float(os.getenv("LLM_TIMEOUT_FLOOR_SECONDS", "5")),
+                breaker_settings=breaker_settings,
+            )
+            for config in configs
+            if not config.missing_key
+        ])
+        self.queue_max_wait = float(os.getenv("LLM_QUEUE_MAX_WAIT_SECONDS", "60"))
+
+        self.first_recommendation_latency = LatencyTracker()
+        self.prompt_builder = PromptBuilder()
+        # Optional SemanticRecommendationCache; the chatbot app installs one
+        self.cache = None
+        # Identical concurrent prompts share one upstream call; set
+        # LLM_SINGLE_FLIGHT_DIR to also coalesce across worker processes
+        lock_dir = os.getenv("LLM_SINGLE_FLIGHT_DIR")
+        self.single_flight = SingleFlight(FileLockStore(lock_dir) if lock_dir else None)
+
+        # "p95" hedges at the best provider's p95, a number hedges after that many seconds
+        self.hedge_after = os.getenv("LLM_HEDGE_AFTER_SECONDS")
+        self.hedge_stats = HedgeStats()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge") if self.hedge_after else None
+
+        logger.info(
+            "Configured LLM providers: %s",
+            ", ".join(f"{p.name} ({p.model})" for p in self.router.providers) or "none",
         )
 
-        prompt = self._build_prompt(responses)
-        raw_response = self._invoke_model(prompt)
+    def stream_metrics(self) -> Dict[str, float]:
+        """Time from request to the first streamed recommendation"""
+        return self.first_recommendation_latency.summary()
+
+    def connection_metrics(self) -> Dict[str, Any]:
+        """Request, retry and connection-reuse counters of each provider's pooled session"""
+        return {provider.name: provider.http.metrics.snapshot() for provider in self.router.providers}
+
+    def is_available(self) -> bool:
+        """False when no provider is configured or every circuit is open"""
+        return self.router.is_available()
+
+    def provider_metrics(self) -> Dict[str, Any]:
+        """Ranking, failovers and per-provider latency histograms"""
+        return self.router.metrics()
+
+    def resilience_metrics(self) -> Dict[str, Any]:
+        return {
+            "providers": {
+                provider.name: {
+                    "circuit": provider.breaker.metrics(),
+                    "timeout_seconds": provider.timeouts.current(),
+                    "latency": provider.timeouts.latency.summary(),
+                }
+                for provider in self.router.providers
+            },
+            "hedging": self.hedge_stats.metrics(),
+        }
+
+    def prompt_metrics(self) -> Dict[str, Any]:
+        """Estimated prompt tokens sent and tokens saved by trimming and output budgets"""
+        return self.prompt_builder.metrics()
+
+    def rate_limit_metrics(self) -> Dict[str, Any]:
+        return {provider.name: provider.rate_limiter.metrics() for provider in self.router.providers}
+
+    def single_flight_metrics(self) -> Dict[str, int]:
+        return self.single_flight.metrics()
+
+    def cache_metrics(self) -> Optional[Dict[str, Any]]:
+        return self.cache.metrics() if self.cache else None
+
+    def generate_recommendations(
+        self,
+        responses: List[Dict[str, str]],
+        burnout_level: Optional[str] = None,
+        priority: int = INTERACTIVE,
+    ) -> Dict[str, Any]:
+        cache_key = self._cache_key(burnout_level, responses)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if not self.router.providers:
+            raise ProviderUnavailable("No LLM provider configured (set GROQ_API_KEY or LLM_PROVIDERS)")
+
+        logger.debug("Calling LLM router with %d response pairs", len(responses))
+
+        built = self.prompt_builder.build(responses, burnout_level)
+        prompt_hash = hashlib.sha256(
+            f"{self.router.signature}\n{built.max_tokens}\n{built.text}".encode("utf-8")
+        ).hexdigest()
+        structured_payload = self.single_flight.do(prompt_hash, lambda: self._complete_prompt(built, priority))
+        self._cache_store(cache_key, structured_payload)
+        return structured_payload
+
+    def _complete_prompt(self, built: BuiltPrompt, priority: int = INTERACTIVE) -> Dict[str, Any]:
+        raw_response, provider = self._invoke_model(built, priority)
         structured_payload = self._parse_model_response(raw_response)
         structured_payload["raw_response"] = raw_response
-        structured_payload["provider"] = "groq"
-        structured_payload["model"] = self.model
+        structured_payload["provider"] = provider.name
+        structured_payload["model"] = provider.model
+        structured_payload["token_budget"] = built.savings()
         return structured_payload
 
-    def _build_prompt(self, responses: List[Dict[str, str]]) -> str:
-        formatted_answers = []
-        for idx, item in enumerate(responses, start=1):
-            question = item.get("question", f"Question {idx}")
-            answer = item.get("response", "").strip()
-            formatted_answers.append(f"{idx}. {question}\nAnswer: {answer}")
-
-        answers_blob = "\n\n".join(formatted_answers) if formatted_answers else "No answers supplied."
-
-        # Analyze responses to determine appropriate focus
-        answer_text = " ".join([r.get("response", "").lower() for r in responses])
-        
-        positive_words = ["energized", "ready", "manageable", "happy", "good", "enjoy", "comfortable", "well", "excellent", "fantastic", "love", "content", "motivated", "doable"]
-        negative_words = ["drained", "exhausted", "can't handle", "quit", "unhappy", "stress", "tense", "overwhelmed", "hate", "burnt out", "burnout", "struggling"]
-        
-        positive_count = sum(1 for word in positive_words if word in answer_text)
-        negative_count = sum(1 for word in negative_words if word in answer_text)
-        
-        print(f"DEBUG: positive_count={positive_count}, negative_count={negative_count}")
-        
-        # Determine recommendation focus with MUCH STRONGER instructions
-        if negative_count >= 3:
-            focus_instruction = (
-                "USER IS IN CRISIS. Focus ONLY on: immediate recovery, professional help, urgent stress reduction. "
-                "Recommendations must be about survival and crisis management."
-            )
-            print("DEBUG: Using CRISIS MANAGEMENT focus")
-        elif positive_count >= 3 and negative_count == 0:
-            focus_instruction = (
-                "***CRITICAL CONTEXT: USER IS EXTREMELY HAPPY AND THRIVING***\n"
-                "IMPORTANT CONSTRAINTS:\n"
-                "1. User LOVES their current job and wants to stay long-term\n"
-                "2. User finds their workload manageable and energizing\n"
-                "3. User is already highly satisfied and motivated\n\n"
-                "***RECOMMENDATION RULES - MUST FOLLOW:***\n"
-                "- DO NOT push for promotions or leadership roles unless user explicitly wants them\n"
-                "- DO NOT suggest aggressive career advancement that might disrupt their happiness\n"
-                "- DO NOT mention stress, burnout, challenges, or prevention\n"
-                "- DO focus on sustaining their current positive state\n"
-                "- DO suggest ways to deepen existing satisfaction\n"
-                "- DO recommend knowledge sharing and mentoring OTHERS (not seeking mentors)\n"
-                "- DO suggest ways to amplify their positive impact without adding pressure\n"
-                "- Recommendations should feel like natural extensions of their current happiness\n\n"
-                "APPROPRIATE THEMES: knowledge sharing, mentoring others, passion projects, "
-                "sustainable growth, deepening expertise, positive team contributions"
-            )
-            print("DEBUG: Using GROWTH & MAINTENANCE focus")
-        else:
-            focus_instruction = (
-                "User shows mixed signals. Balance growth with sustainable habits and work-life balance."
-            )
-            print("DEBUG: Using BALANCE & PREVENTION focus")
-
-        schema_description = (
-            "{"
-            '"burnout_level": "LOW | MODERATE | HIGH", '
-            '"confidence": 0.0-1.0, '
-            '"summary": "2-3 sentence overview", '
-            '"recommendations": ['
-            "{"
-            '"title": "Short name", '
-            '"description": "Action steps (2 sentences)", '
-            '"why_it_helps": "1 sentence rationale", '
-            '"timeframe": "When to start + cadence", '
-            '"priority": "immediate | short_term | long_term"'
-            "}"
-            "]"
-            "}"
-        )
+    def stream_recommendations(
+        self,
+        responses: List[Dict[str, str]],
+        burnout_level: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield each recommendation as soon as its JSON object is complete.
 
-        # MUCH STRONGER system prompt with explicit constraints
-        system_prompt = (
-            "You are an empathetic workplace wellbeing specialist who respects when users are already happy and thriving. "
-            f"{focus_instruction}\n\n"
-            "Generate recommendations that ALIGN with the user's expressed feelings. "
-            "Your recommendations must NOT disrupt their current happiness and satisfaction. "
-            "Output a JSON object matching the schema exactly. Do not include markdown fences."
-        )
+        Events are ``{"type": "recommendation", "index", "recommendation"}``
+        followed by one ``{"type": "complete", "payload"}`` carrying the
+        same structure ``generate_recommendations`` returns.
+        """
+        cache_key = self._cache_key(burnout_level, responses)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.first_recommendation_latency.record(0.0)
+                for index, rec in enumerate(cached["recommendations"]):
+                    yield {"type": "recommendation", "index": index, "recommendation": rec}
+                yield {"type": "complete", "payload": cached}
+                return
 
-        return (
-            f"{system_prompt}\n\n"
-            "User's Assessment Answers:\n"
-            f"{answers_blob}\n\n"
-            f"JSON schema: {schema_description}\n"
-            "Return ONLY the JSON:"
-        )
+        if not self.router.providers:
+            raise ProviderUnavailable("No LLM provider configured (set GROQ_API_KEY or LLM_PROVIDERS)")
 
-    def _invoke_model(self, prompt: str) -> str:
-        """Call Groq API with correct format"""
+        built = self.prompt_builder.build(responses, burnout_level)
+        started = time.monotonic()
+        admitted = {}
+
+        def open_stream(provider: Provider, quota_wait: float):
+            payload = self._build_payload(built, provider, stream=True)
+            admitted["cost"] = self._estimate_cost(payload)
+            admitted["prompt_tokens"] = admitted["cost"] - payload["max_tokens"]
+            self._admit(provider, admitted["cost"], INTERACTIVE, quota_wait)
+            try:
+                return provider.http.post_json(provider.api_url, payload, stream=True), None
+            except RequestException as exc:
+                raise _provider_error(provider, exc) from exc
+
+        # Failover only happens before the first byte; a stream is never spliced across providers
+        response, provider = self.router.call(open_stream, self.queue_max_wait)
+        deadline_at = started + provider.http.deadline
+        parser = RecommendationStreamParser()
+        chunks = []
+        usage = {}
+        first_yielded = False
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # CORRECT Groq payload format
-            payload = {
-                "messages": [
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                "model": self.model,
-                "temperature": 0.7,
-                "max_tokens": 1000,
-                "top_p": 0.9
-            }
-            
+            with response:
+                for delta in _iter_stream_deltas(response, usage):
+                    chunks.append(delta)
+                    for rec in parser.feed(delta):
+                        if not first_yielded:
+                            # One delta can complete several recommendations; time the first
+                            first_yielded = True
+                            self.first_recommendation_latency.record(time.monotonic() - started)
+                        yield {
+                            "type": "recommendation",
+                            "index": len(parser.recommendations) - 1,
+                            "recommendation": _normalize_recommendation(rec),
+                        }
+                    if time.monotonic() > deadline_at:
+                        logger.warning(
+                            "%s stream exceeded %.0fs deadline; keeping partial output",
+                            provider.name,
+                            provider.http.deadline,
+                        )
+                        break
+        except RequestException as exc:
+            # Keep what already arrived; only fail when nothing is usable
+            if not parser.recommendations:
+                provider.record_failure()
+                raise _provider_error(provider, exc) from exc
+            logger.warning("%s stream interrupted (%s); keeping partial output", provider.name, exc)
+        finally:
+            # Admission reserved prompt + max_tokens; give back what the stream did not use
+            actual = usage.get("total_tokens") or admitted["prompt_tokens"] + estimate_tokens("".join(chunks))
+            provider.rate_limiter.settle(admitted["cost"], actual)
+
+        structured_payload = self._payload_from_parser(parser)
+        structured_payload["raw_response"] = "".join(chunks)
+        structured_payload["provider"] = provider.name
+        structured_payload["model"] = provider.model
+        structured_payload["token_budget"] = built.savings()
+        self._cache_store(cache_key, structured_payload)
+        yield {"type": "complete", "payload": structured_payload}
+
+    def _cache_key(self, burnout_level: Optional[str], responses: List[Dict[str, str]]):
+        if self.cache is None or not burnout_level or not responses:
+            return None
+        try:
+            return self.cache.key(burnout_level, responses)
+        except Exception as exc:
+            # The cache is an optimisation; never fail generation because of it
+            logger.warning("Recommendation cache lookup skipped: %s", exc)
+            return None
+
+    def _cache_store(self, cache_key, payload: Dict[str, Any]) -> None:
+        if cache_key is not None and not (payload.get("truncated") or payload.get("unparsed")):
+            self.cache.put(cache_key, payload)
+
+    def _build_payload(self, built: BuiltPrompt, provider: Provider, stream: bool = False) -> Dict[str, Any]:
+        # OpenAI-compatible chat-completions payload
+        payload = {
+            "messages": [
+                {
+                    "role": "user", 
+                    "content": built.text
+                }
+            ],
+            "model": provider.model,
+            "temperature": 0.7,
+            "max_tokens": built.max_tokens,
+            "top_p": 0.9
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _invoke_model(self, built: BuiltPrompt, priority: int = INTERACTIVE) -> Tuple[str, Provider]:
+        """Call the best-ranked provider, failing over down the ranking"""
+
+        def attempt(provider: Provider, quota_wait: float) -> Tuple[str, float]:
+            payload = self._build_payload(built, provider)
+            cost = self._estimate_cost(payload)
+            # Queue time is spent before the clock starts, so it never skews p95
+            self._admit(provider, cost, priority, quota_wait)
+            timeout = provider.timeouts.current()
+
             logger.debug(
-                "Sending request to Groq model %s (chars=%d)",
-                self.model,
-                len(prompt),
-            )
-            
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=120
+                "Sending request to %s model %s (chars=%d, max_tokens=%d, timeout=%.1fs)",
+                provider.name,
+                provider.model,
+                len(built.text),
+                built.max_tokens,
+                timeout,
             )
-            
-            # Debug: print the response to see the actual error
-            print(f"Groq API Response: {response.status_code} - {response.text}")
-            
-            response.raise_for_status()
-            
+
+            started = time.monotonic()
+            content = self._post_completion(provider, payload, timeout, cost)
+            elapsed = time.monotonic() - started
+            logger.debug("Received response from %s model %s in %.2fs", provider.name, provider.model, elapsed)
+            return content, elapsed
+
+        hedge_after = self._hedge_delay()
+        if hedge_after is None:
+            return self.router.call(attempt, self.queue_max_wait)
+        return hedged_call(
+            lambda: self.router.call(attempt, self.queue_max_wait),
+            hedge_after,
+            self._hedge_executor,
+            self.hedge_stats,
+            # The hedge starts on the next-best provider and only goes out if quota admits it right now
+            hedge_fn=lambda: self.router.call(attempt, 0.0, skip=1),
+        )
+
+    def _estimate_cost(self, payload: Dict[str, Any]) -> int:
+        """Tokens a request counts against TPM: prompt estimate plus max output"""
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in payload["messages"])
+        return prompt_tokens + payload["max_tokens"]
+
+    def _admit(self, provider: Provider, cost: int, priority: int, timeout: float) -> None:
+        try:
+            provider.rate_limiter.acquire(cost, priority=priority, timeout=timeout)
+        except RateLimitRejected as exc:
+            raise ProviderRateLimited(f"{provider.name} quota exhausted: {exc}") from exc
+
+    def _post_completion(self, provider: Provider, payload: Dict[str, Any], timeout: float, cost: int) -> str:
+        try:
+            # Retries and backoff are bounded by the per-call deadline
+            response = provider.http.post_json(provider.api_url, payload, deadline=timeout)
             result = response.json()
-            logger.debug("Received response from Groq model %s", self.model)
-            
+            usage = result.get("usage", {}).get("total_tokens")
+            if usage:
+                provider.rate_limiter.settle(cost, usage)
             return result["choices"][0]["message"]["content"]
-            
-        except RequestsTimeout as exc:
-            raise GroqAPIUnavailable("Groq API timed out") from exc
         except RequestException as exc:
-            logger.error("Network error while calling Groq API: %s", exc)
-            raise GroqAPIUnavailable("Network error talking to Groq API") from exc
+            raise _provider_error(provider, exc) from exc
         except Exception as exc:
-            logger.error("Groq API failure: %s", exc, exc_info=True)
-            raise GroqAPIUnavailable(f"Groq API failed: {exc}") from exc
+            logger.error("%s API failure: %s", provider.name, exc, exc_info=True)
+            raise ProviderUnavailable(f"{provider.name} API failed: {exc}") from exc
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_after:
+            return None
+        if self.hedge_after == "p95":
+            ranked = self.router.ranked()
+            return ranked[0].timeouts.p95() if ranked else None
+        return float(self.hedge_after)
 
     def _parse_model_response(self, raw_response: str) -> Dict[str, Any]:
-        cleaned = raw_response.strip()
-        
-        # Remove any markdown code blocks
-        if cleaned.startswith("```"):
-            cleaned = cleaned.strip("`")
-            if "\n" in cleaned:
-                cleaned = cleaned.split("\n", 1)[1]
-        
-        # Try to parse as-is first
-        try:
-            payload = json.loads(cleaned)
-        except json.JSONDecodeError as exc:
-            print(f"JSON parse failed, trying to fix: {exc}")
-            
-            # Try to fix common JSON issues
-            try:
-                # Remove any trailing commas that might break parsing
-                import re
-                cleaned = re.sub(r',\s*}', '}', cleaned)
-                cleaned = re.sub(r',\s*]', ']', cleaned)
-                payload = json.loads(cleaned)
-            except json.JSONDecodeError:
-                print(f"Could not parse LLM response as JSON: {cleaned}")
-                # Return a fallback structure instead of crashing
-                return {
-                    "burnout_level": "HIGH",
-                    "confidence": 0.9,
-                    "summary": "Based on your assessment responses, personalized recommendations were generated.",
-                    "recommendations": [
-                        {
-                            "title": "Review Generated Advice",
-                            "description": "The AI has provided detailed burnout recovery recommendations above.",
-                            "why_it_helps": "These are tailored to your specific situation.",
-                            "timeframe": "Immediately",
-                            "priority": "immediate"
-                        }
-                    ]
-                }
+        parser = RecommendationStreamParser()
+        parser.feed(raw_response)
+        return self._payload_from_parser(parser)
+
+    def _payload_from_parser(self, parser: RecommendationStreamParser) -> Dict[str, Any]:
+        payload = parser.finish()
+        if payload is None:
+            logger.warning("Could not parse LLM response as JSON")
+            # Return a fallback structure instead of crashing
+            return {
+                "burnout_level": "HIGH",
+                "confidence": 0.9,
+                "unparsed": True,
+                "summary": "Based on your assessment responses, personalized recommendations were generated.",
+                "recommendations": [
+                    {
+                        "title": "Review Generated Advice",
+                        "description": "The AI has provided detailed burnout recovery recommendations above.",
+                        "why_it_helps": "These are tailored to your specific situation.",
+                        "timeframe": "Immediately",
+                        "priority": "immediate"
+                    }
+                ]
+            }
+        if parser.truncated:
+            logger.warning(
+                "LLM response was cut off; salvaged %d complete recommendations",
+                len(parser.recommendations),
+            )
+            payload["truncated"] = True
 
         # Rest of your existing processing code...
         payload.setdefault("recommendations", [])
         payload.setdefault("summary", "")
         payload.setdefault("confidence", 0.5)
 
-        normalized_recs = []
-        for rec in payload["recommendations"]:
-            normalized_recs.append(
-                Recommendation(
-                    title=rec.get("title", "Personalized strategy"),
-                    description=rec.get("description", ""),
-                    why_it_helps=rec.get("why_it_helps", ""),
-                    timeframe=rec.get("timeframe", ""),
-                    priority=rec.get("priority", "short_term"),
-                ).__dict__
-            )
+        normalized_recs = [_normalize_recommendation(rec) for rec in payload["recommendations"]]
 
         payload["recommendations"] = normalized_recs[:5]
         return payload
 
 
+def _normalize_recommendation(rec: Dict[str, Any]) -> Dict[str, str]:
+    return Recommendation(
+        title=rec.get("title", "Personalized strategy"),
+        description=rec.get("description", ""),
+        why_it_helps=rec.get("why_it_helps", ""),
+        timeframe=rec.get("timeframe", ""),
+        priority=rec.get("priority", "short_term"),
+    ).__dict__
+
+
+def _provider_error(provider: Provider, exc: RequestException) -> ProviderUnavailable:
+    if isinstance(exc, HTTPError) and exc.response is not None and exc.response.status_code == 429:
+        return ProviderRateLimited(f"{provider.name} rate limit (429) persisted past retries")
+    if isinstance(exc, RequestsTimeout):
+        return ProviderUnavailable(f"{provider.name} API timed out")
+    logger.error("Network error talking to %s API: %s", provider.name, exc)
+    return ProviderUnavailable(f"Network error talking to {provider.name} API")
+
+
+def _iter_stream_deltas(response, usage: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Content deltas of an OpenAI-compatible ``text/event-stream`` completion.
+
+    Token usage, when the provider reports it on a chunk (``usage``, or
+    ``x_groq.usage`` on Groq), is copied into ``usage``.
+    """
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+            reported = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+            if reported and usage is not None:
+                usage.update(reported)
+            choices = chunk.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+        except (ValueError, AttributeError, IndexError) as exc:
+            # One bad frame must not throw away the recommendations already parsed
+            logger.warning("Skipping undecodable stream line %r: %s", data[:80], exc)
+            continue
+        if delta:
+            yield delta
+
+
 # Shared singleton
-llm_api_recommender = LLMApiRecommender()
\ No newline at end of file
+llm_api_recommender = LLMApiRecommender()
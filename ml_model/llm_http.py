@@ -0,0 +1,182 @@
+"""Pooled keep-alive HTTP client shared by the LLM recommenders.
+
+One ``requests.Session`` is kept per client, so repeated calls to the same
+host reuse a TCP/TLS connection instead of handshaking each time. Retries
+happen in this module rather than in urllib3, so every attempt and backoff
+fits inside one overall deadline. The connection pools count the sockets
+they open; subtracting that from the request count gives connection reuse.
+"""
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests import RequestException, Timeout as RequestsTimeout
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class DeadlineExceeded(RequestsTimeout):
+    """Raised when the overall deadline passes before a request succeeds."""
+
+
+@dataclass
+class ConnectionMetrics:
+    requests: int = 0
+    new_connections: int = 0
+    retries: int = 0
+    failures: int = 0
+    total_latency_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {item.name: getattr(self, item.name) for item in fields(self) if not item.name.startswith('_')}
+        data['reused_connections'] = max(data['requests'] - data['new_connections'], 0)
+        data['reuse_ratio'] = data['reused_connections'] / data['requests'] if data['requests'] else 0.0
+        data['average_latency_seconds'] = (
+            data['total_latency_seconds'] / data['requests'] if data['requests'] else 0.0
+        )
+        return data
+
+
+def _counting_pool(base, metrics: ConnectionMetrics):
+    class CountingPool(base):
+        def _new_conn(self):
+            metrics.add(new_connections=1)
+            return super()._new_conn()
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, metrics: ConnectionMetrics, **kwargs):
+        self._metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self._metrics),
+            'https': _counting_pool(HTTPSConnectionPool, self._metrics),
+        }
+
+
+class PooledHTTPClient:
+    """Keep-alive JSON POST client with deadline-bounded retries."""
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 10,
+        max_retries: int = 2,
+        deadline: float = 120.0,
+        connect_timeout: float = 5.0,
+        backoff: float = 0.5,
+        on_rate_limited: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self.max_retries = max_retries
+        # Told the Retry-After seconds of every 429, e.g. to pause a rate limiter
+        self.on_rate_limited = on_rate_limited
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.backoff = backoff
+        self.metrics = ConnectionMetrics()
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = _CountingAdapter(
+            self.metrics,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        deadline: Optional[float] = None,
+        stream: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """POST ``payload`` and return the successful response.
+
+        Connection errors, timeouts and retryable statuses are retried with
+        jittered backoff while the overall deadline allows. Other HTTP errors
+        are raised straight away via ``raise_for_status``.
+        """
+        deadline_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self.metrics.add(failures=1)
+                raise DeadlineExceeded(f"Deadline exceeded after {attempt} attempts to {url}")
+
+            started = time.monotonic()
+            try:
+                response = self.session.post(
+                    url,
+                    json=payload,
+                    headers=headers,
+                    stream=stream,
+                    timeout=(min(self.connect_timeout, remaining), remaining),
+                )
+            except RequestException as exc:
+                self.metrics.add(requests=1, total_latency_seconds=time.monotonic() - started)
+                if not self._can_retry(attempt, deadline_at):
+                    self.metrics.add(failures=1)
+                    raise
+                logger.warning("Request to %s failed (%s); retrying", url, exc)
+                retry_after = None
+            else:
+                self.metrics.add(requests=1, total_latency_seconds=time.monotonic() - started)
+                if response.status_code == 429 and self.on_rate_limited is not None:
+                    self.on_rate_limited(_retry_after_seconds(response.headers.get('Retry-After'), self.backoff))
+                if response.status_code not in RETRYABLE_STATUS or not self._can_retry(attempt, deadline_at):
+                    if response.status_code >= 400:
+                        self.metrics.add(failures=1)
+                    response.raise_for_status()
+                    return response
+                logger.warning("Request to %s returned %d; retrying", url, response.status_code)
+                retry_after = response.headers.get('Retry-After')
+                # Hand the connection back to the pool before backing off
+                response.close()
+
+            self._sleep_before_retry(attempt, deadline_at, retry_after)
+            attempt += 1
+            self.metrics.add(retries=1)
+
+    def _can_retry(self, attempt: int, deadline_at: float) -> bool:
+        return attempt < self.max_retries and time.monotonic() < deadline_at
+
+    def _sleep_before_retry(self, attempt: int, deadline_at: float, retry_after: Optional[str] = None) -> None:
+        delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+        if retry_after:
+            delay = max(delay, _retry_after_seconds(retry_after, delay))
+        time.sleep(max(0.0, min(delay, deadline_at - time.monotonic())))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _retry_after_seconds(value: Optional[str], default: float) -> float:
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
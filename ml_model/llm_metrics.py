@@ -0,0 +1,61 @@
+"""Small in-process latency trackers for the LLM clients."""
+import bisect
+import math
+import threading
+from collections import deque
+from typing import Dict, Sequence
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyTracker:
+    """Thread-safe count/mean/percentiles over the most recent samples"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            count, total = self._count, self._total
+        return {
+            'count': count,
+            'mean_seconds': total / count if count else 0.0,
+            'p50_seconds': self.percentile(0.50),
+            'p95_seconds': self.percentile(0.95),
+        }
+
+
+class LatencyHistogram:
+    """Counts of all samples ever recorded, per fixed latency bucket"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+
+    def record(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f'le_{bound:g}s' for bound in self.buckets] + ['gt_{:g}s'.format(self.buckets[-1])]
+        return dict(zip(labels, counts))
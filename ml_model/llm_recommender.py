@@ -0,0 +1,183 @@
+"""Offline recommendations for free-form burnout messages.
+
+This is a retrieval recommender, not a generator. A curated library of
+recommendations (``recommendation_library.json``) is embedded once, at
+import, into a compact float32 index. Each entry's text plus its trigger
+keywords becomes a TF-IDF vector over the library's own vocabulary of
+stemmed unigrams and bigrams. A message is embedded the same way and scored
+against the whole library with one matrix-vector product. The best matches come back,
+at most one per theme. No model or network is involved, so a lookup takes
+well under a millisecond.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .llm_metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recommendation_library.json')
+DEFAULT_TOP_K = 3
+# Matches weaker than this are treated as "no signal" and replaced by level defaults
+MIN_SCORE = 0.05
+LEVEL_BOOST = 0.05
+
+THEME_LABELS = {
+    'workload': 'workload',
+    'exhaustion': 'exhaustion',
+    'boundaries': 'work-life boundaries',
+    'focus': 'focus time',
+    'crisis': 'severe strain',
+    'manager': 'your relationship with your manager',
+    'role': 'role clarity',
+    'relationships': 'relationships at work',
+    'recognition': 'recognition',
+    'meaning': 'a loss of meaning',
+    'autonomy': 'autonomy',
+    'wellbeing': 'stress',
+    'mindset': 'self-pressure',
+    'growth': 'growth',
+    'thriving': 'what is going well',
+}
+
+_WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_STOPWORDS = frozenset(
+    "a an the and or but if of to in on at for with from by about as is are was were be been being am "
+    "i me my mine we our you your it its this that these those so very really just all any some "
+    "do does did have has had will would can could should there here then than when what which who".split()
+)
+_SUFFIXES = ('ness', 'ing', 'ion', 'ed', 'ly', 'es', 's')
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def _terms(text: str) -> List[str]:
+    words = [_stem(w.replace("'", '')) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfEmbedder:
+    """Sublinear TF-IDF over the library's own vocabulary; unseen terms are ignored"""
+
+    def fit(self, documents: List[str]) -> 'TfidfEmbedder':
+        document_frequency = Counter(term for text in documents for term in set(_terms(text)))
+        self.vocabulary = {term: column for column, term in enumerate(sorted(document_frequency))}
+        self.idf = np.array(
+            [math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in sorted(document_frequency)],
+            dtype=np.float32,
+        )
+        return self
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term, count in Counter(_terms(text)).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    matrix[row, column] = 1 + math.log(count)
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+class RetrievalRecommender:
+    def __init__(self, library_path: str = LIBRARY_PATH):
+        with open(library_path, encoding='utf-8') as handle:
+            self.library: List[Dict[str, Any]] = json.load(handle)
+        documents = [
+            ' '.join((entry['keywords'], entry['keywords'], entry['title'], entry['description'], entry['why_it_helps']))
+            for entry in self.library
+        ]
+        started = time.perf_counter()
+        self.embedder = TfidfEmbedder().fit(documents)
+        self.index = self.embedder.embed(documents)
+        self._levels = {
+            level: np.array([level in entry['levels'] for entry in self.library], dtype=np.float32)
+            for level in ('LOW', 'MODERATE', 'HIGH')
+        }
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        logger.info(
+            "Indexed %d curated recommendations (%.1f KB) in %.1f ms",
+            len(self.library), self.index.nbytes / 1024, (time.perf_counter() - started) * 1000,
+        )
+
+    def get_recommendations(self, user_message: str, burnout_level: Optional[str] = None,
+                            top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+        """Top-k library entries for a message, with a one-line summary"""
+        started = time.perf_counter()
+        text_scores = self.index @ self.embedder.embed([user_message])[0]
+        matched = float(text_scores.max(initial=0.0)) >= MIN_SCORE
+        scores = text_scores
+        level = (burnout_level or '').upper()
+        if level in self._levels:
+            # Level only breaks near-ties; without any text match it decides alone
+            scores = text_scores + self._levels[level] * (LEVEL_BOOST if matched else 1.0)
+
+        picks = self._diverse_top_k(scores, top_k)
+        recommendations = [
+            dict({name: self.library[row][name] for name in
+                  ('title', 'description', 'why_it_helps', 'timeframe', 'priority')},
+                 score=round(float(text_scores[row]), 4))
+            for row in picks
+        ]
+        elapsed = time.perf_counter() - started
+        self.latency.record(elapsed)
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['unmatched'] += not matched
+        return {
+            'recommendations': recommendations,
+            'summary': self._summary([self.library[row]['theme'] for row in picks if text_scores[row] >= MIN_SCORE]),
+            'source': 'retrieval',
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'requests': stats.get('requests', 0),
+            'unmatched': stats.get('unmatched', 0),
+            'library_size': len(self.library),
+            'index_bytes': self.index.nbytes,
+            'latency': self.latency.summary(),
+        }
+
+    def _diverse_top_k(self, scores: np.ndarray, top_k: int) -> List[int]:
+        """Best rows with at most one per theme, unless themes run out"""
+        order = np.argsort(-scores)
+        picks, themes = [], set()
+        for row in order:
+            theme = self.library[row]['theme']
+            if theme not in themes:
+                picks.append(int(row))
+                themes.add(theme)
+                if len(picks) == top_k:
+                    return picks
+        return picks + [int(row) for row in order if row not in picks][:top_k - len(picks)]
+
+    def _summary(self, themes: List[str]) -> str:
+        if not themes:
+            return "Here are a few general strategies to support your wellbeing at work."
+        unique = list(dict.fromkeys(THEME_LABELS.get(theme, theme) for theme in themes))
+        named = unique[0] if len(unique) == 1 else f"{', '.join(unique[:-1])} and {unique[-1]}"
+        return f"Your message points to {named}. These strategies match what you described."
+
+
+# Loaded once and shared; the library is small enough to index at import
+llm_recommender = RetrievalRecommender()
@@ -0,0 +1,186 @@
+"""Failure handling for calls to the LLM provider.
+
+``CircuitBreaker`` opens after a run of consecutive failures or slow calls.
+While it is open, callers fail immediately and serve their fallback, and a
+background thread probes the provider until it answers again.
+``AdaptiveTimeout`` sets each call's deadline from the observed p95
+latency instead of a fixed two minutes. ``hedged_call`` sends a duplicate
+request when the first one is slower than usual and keeps whichever
+answers first.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+from .llm_metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_seconds: float = 30.0,
+        slow_call_threshold: int = 5,
+        recovery_interval: float = 30.0,
+        max_recovery_interval: float = 300.0,
+        probe: Optional[Callable[[], bool]] = None,
+        name: str = 'llm',
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_threshold = slow_call_threshold
+        self.recovery_interval = recovery_interval
+        self.max_recovery_interval = max_recovery_interval
+        self.probe = probe
+        self.name = name
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._consecutive_slow = 0
+        self._times_opened = 0
+        self._short_circuited = 0
+        self._opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                self._short_circuited += 1
+                return False
+            return True
+
+    def record_success(self, elapsed: Optional[float] = None) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            if elapsed is not None and elapsed > self.slow_call_seconds:
+                self._consecutive_slow += 1
+                if self._consecutive_slow >= self.slow_call_threshold:
+                    self._open(f"{self._consecutive_slow} consecutive calls slower than {self.slow_call_seconds:.0f}s")
+            else:
+                self._consecutive_slow = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open(f"{self._consecutive_failures} consecutive failures")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._consecutive_failures,
+                'consecutive_slow_calls': self._consecutive_slow,
+                'times_opened': self._times_opened,
+                'short_circuited': self._short_circuited,
+                'open_for_seconds': time.monotonic() - self._opened_at if self._opened_at else 0.0,
+            }
+
+    def _open(self, reason: str) -> None:
+        # Called with the lock held
+        if self.state == self.OPEN:
+            return
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        logger.warning("Circuit %s opened: %s", self.name, reason)
+        threading.Thread(target=self._recover, name=f"{self.name}-circuit-probe", daemon=True).start()
+
+    def _close(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._opened_at = None
+            self._consecutive_failures = 0
+            self._consecutive_slow = 0
+        logger.info("Circuit %s closed: provider recovered", self.name)
+
+    def _recover(self) -> None:
+        interval = self.recovery_interval
+        while True:
+            time.sleep(interval)
+            try:
+                healthy = self.probe() if self.probe else True
+            except Exception as exc:
+                logger.debug("Circuit %s probe failed: %s", self.name, exc)
+                healthy = False
+            if healthy:
+                self._close()
+                return
+            interval = min(interval * 2, self.max_recovery_interval)
+
+
+class AdaptiveTimeout:
+    """Deadline of ``multiplier`` x observed p95, clamped to [floor, ceiling]"""
+
+    def __init__(self, floor: float = 5.0, ceiling: float = 120.0, multiplier: float = 2.0,
+                 min_samples: int = 20, window: int = 200):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+
+    def observe(self, seconds: float) -> None:
+        self.latency.record(seconds)
+
+    def p95(self) -> Optional[float]:
+        if self.latency.summary()['count'] < self.min_samples:
+            return None
+        return self.latency.percentile(0.95)
+
+    def current(self) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, p95 * self.multiplier))
+
+
+class HedgeStats:
+    """Hedges sent and won, shared by every request thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+def hedged_call(fn: Callable[[], Any], hedge_after: float, executor, stats: Optional[HedgeStats] = None,
+                hedge_fn: Optional[Callable[[], Any]] = None) -> Any:
+    """Run ``fn``; if it has not finished after ``hedge_after`` seconds, race ``hedge_fn`` (default: a copy).
+
+    The slower call cannot be cancelled mid-request; it finishes in the
+    background and its result is dropped.
+    """
+    primary = executor.submit(fn)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    hedge = executor.submit(hedge_fn or fn)
+    if stats is not None:
+        stats.incr('hedges_sent')
+    pending = {primary, hedge}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge and stats is not None:
+                    stats.incr('hedges_won')
+                return future.result()
+            first_error = first_error or future.exception()
+    raise first_error
@@ -0,0 +1,305 @@
+"""Routing across OpenAI-compatible chat-completion providers.
+
+Each configured provider has its own pooled client, quota limiter, circuit
+breaker and adaptive timeout. ``ProviderRouter.ranked`` orders providers by
+expected cost, which is recent median latency divided by recent success
+rate. Providers with no recent calls rank first, so each one is measured
+and a provider that failed earlier is tried again once its failures age
+out. ``call`` goes through that order and fails over to the next provider
+when one has an open circuit, has no quota or returns an error. Providers
+whose recent calls all failed are skipped. When no provider can answer
+straight away, the call queues for quota on the best one that is only
+rate limited instead of failing.
+
+Providers come from ``LLM_PROVIDERS``, a JSON list such as::
+
+    [{"name": "groq", "api_url": "https://api.groq.com/openai/v1/chat/completions",
+      "model": "llama-3.1-8b-instant", "api_key_env": "GROQ_API_KEY"},
+     {"name": "local", "api_url": "http://127.0.0.1:8001/v1/chat/completions",
+      "model": "mock-llm", "requests_per_minute": 600, "tokens_per_minute": 600000}]
+
+When ``LLM_PROVIDERS`` is unset, a single Groq provider is built from the
+``GROQ_*`` variables.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from requests import RequestException
+
+from .llm_http import PooledHTTPClient
+from .llm_metrics import LatencyHistogram
+from .llm_resilience import AdaptiveTimeout, CircuitBreaker
+from .rate_limiter import TokenBucketRateLimiter
+
+logger = logging.getLogger(__name__)
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+# Outcomes older than this stop counting towards a provider's success rate
+OUTCOME_WINDOW_SECONDS = 300.0
+MIN_SUCCESS_RATE = 0.05
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised when an LLM provider cannot be reached."""
+
+
+class ProviderCircuitOpen(ProviderUnavailable):
+    """Raised without calling out while every provider's circuit is open."""
+
+
+class ProviderRateLimited(ProviderUnavailable):
+    """Raised when a provider's quota is exhausted (queue limit or final 429)."""
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    api_url: str
+    model: str
+    api_key: Optional[str] = None
+    api_key_env: Optional[str] = None
+    requests_per_minute: float = 30.0
+    tokens_per_minute: float = 6000.0
+
+    @property
+    def missing_key(self) -> bool:
+        """A key was asked for through ``api_key_env`` but is not set"""
+        return bool(self.api_key_env) and not self.api_key
+
+
+def load_provider_configs(
+    api_key: Optional[str] = None,
+    api_url: Optional[str] = None,
+    model: Optional[str] = None,
+) -> List[ProviderConfig]:
+    """Provider list from ``LLM_PROVIDERS``, else the single Groq provider"""
+    raw = os.getenv("LLM_PROVIDERS")
+    if not raw or api_key or api_url or model:
+        return [ProviderConfig(
+            name="groq",
+            api_url=api_url or os.getenv("GROQ_API_URL", GROQ_API_URL),
+            model=model or os.getenv("GROQ_MODEL", GROQ_MODEL),
+            api_key=api_key or os.getenv("GROQ_API_KEY"),
+            api_key_env="GROQ_API_KEY",
+            requests_per_minute=float(os.getenv("GROQ_RPM", "30")),
+            tokens_per_minute=float(os.getenv("GROQ_TPM", "6000")),
+        )]
+
+    try:
+        entries = json.loads(raw)
+    except ValueError as exc:
+        raise ValueError(f"LLM_PROVIDERS is not valid JSON: {exc}") from exc
+    configs = []
+    for index, entry in enumerate(entries):
+        key_env = entry.get("api_key_env")
+        configs.append(ProviderConfig(
+            name=entry.get("name") or f"provider-{index}",
+            api_url=entry["api_url"],
+            model=entry["model"],
+            api_key=entry.get("api_key") or (os.getenv(key_env) if key_env else None),
+            api_key_env=key_env,
+            requests_per_minute=float(entry.get("requests_per_minute", 30)),
+            tokens_per_minute=float(entry.get("tokens_per_minute", 6000)),
+        ))
+    return configs
+
+
+class Provider:
+    """One OpenAI-compatible endpoint with its own client, quota and health state"""
+
+    def __init__(
+        self,
+        config: ProviderConfig,
+        pool_size: int = 10,
+        max_retries: int = 2,
+        deadline: float = 120.0,
+        max_queue: int = 200,
+        timeout_floor: float = 5.0,
+        breaker_settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.config = config
+        self.name = config.name
+        self.api_url = config.api_url
+        self.model = config.model
+        self.rate_limiter = TokenBucketRateLimiter(
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_queue=max_queue,
+        )
+        headers = {"Content-Type": "application/json"}
+        if config.api_key:
+            headers["Authorization"] = f"Bearer {config.api_key}"
+        self.http = PooledHTTPClient(
+            headers=headers,
+            pool_size=pool_size,
+            max_retries=max_retries,
+            deadline=deadline,
+            on_rate_limited=self.rate_limiter.penalize,
+        )
+        # Per-call deadline follows this provider's p95, capped by the client deadline
+        self.timeouts = AdaptiveTimeout(floor=timeout_floor, ceiling=self.http.deadline)
+        self.breaker = CircuitBreaker(probe=self.probe, name=config.name, **(breaker_settings or {}))
+        self.histogram = LatencyHistogram()
+        self._outcomes = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def record_success(self, elapsed: Optional[float] = None) -> None:
+        """``elapsed`` is None for streams, whose duration is not a latency"""
+        if elapsed is not None:
+            self.timeouts.observe(elapsed)
+            self.histogram.record(elapsed)
+        with self._lock:
+            self._outcomes.append((time.monotonic(), True))
+        self.breaker.record_success(elapsed)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append((time.monotonic(), False))
+        self.breaker.record_failure()
+
+    def success_rate(self) -> Optional[float]:
+        cutoff = time.monotonic() - OUTCOME_WINDOW_SECONDS
+        with self._lock:
+            recent = [ok for at, ok in self._outcomes if at >= cutoff]
+        return sum(recent) / len(recent) if recent else None
+
+    def score(self) -> float:
+        """Expected seconds per successful call; lower is better, 0.0 when untried"""
+        success_rate = self.success_rate()
+        if success_rate is None:
+            return 0.0
+        latency = self.timeouts.latency
+        # Never answered yet: assume the worst until it does
+        typical = latency.percentile(0.50) if latency.summary()["count"] else self.timeouts.ceiling
+        return typical / max(success_rate, MIN_SUCCESS_RATE)
+
+    def probe(self) -> bool:
+        """Cheap health check used while the circuit is open: list models"""
+        models_url = self.api_url.rsplit("/chat/completions", 1)[0] + "/models"
+        try:
+            response = self.http.session.get(models_url, timeout=10)
+            return response.status_code < 500 and response.status_code != 429
+        except RequestException:
+            return False
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "api_url": self.api_url,
+            "model": self.model,
+            "score": self.score(),
+            "success_rate": self.success_rate(),
+            "circuit": self.breaker.metrics(),
+            "timeout_seconds": self.timeouts.current(),
+            "latency": self.timeouts.latency.summary(),
+            "latency_histogram": self.histogram.snapshot(),
+        }
+
+
+class ProviderRouter:
+    def __init__(self, providers: List[Provider]):
+        self.providers = providers
+        # Part of the single-flight key: the same prompt routed elsewhere is a different call
+        self.signature = "|".join(f"{p.name}:{p.api_url}:{p.model}" for p in providers)
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def ranked(self) -> List[Provider]:
+        # sorted() is stable, so configuration order breaks ties
+        return sorted(self.providers, key=lambda provider: provider.score())
+
+    def is_available(self) -> bool:
+        return any(provider.breaker.state == CircuitBreaker.CLOSED for provider in self.providers)
+
+    def call(
+        self,
+        fn: Callable[[Provider, float], Tuple[Any, Optional[float]]],
+        max_wait: float,
+        skip: int = 0,
+    ) -> Tuple[Any, Provider]:
+        """Run ``fn(provider, quota_wait)`` on the best provider, failing over down the ranking.
+
+        ``fn`` returns ``(result, elapsed)``; ``elapsed`` is recorded as that
+        provider's latency unless it is None. ``skip`` rotates the ranking so
+        a hedged call starts on a different provider than the primary.
+
+        The first pass never waits for quota. If every provider was either
+        out of quota or failing, the call queues for up to ``max_wait`` on
+        the best-ranked provider that was only rate limited.
+        """
+        ranked = self.ranked()
+        if skip and len(ranked) > 1:
+            skip %= len(ranked)
+            ranked = ranked[skip:] + ranked[:skip]
+        candidates = [provider for provider in ranked if provider.breaker.allow()]
+        if not candidates:
+            raise ProviderCircuitOpen("Every LLM provider circuit is open; serving fallback recommendations")
+        # Providers failing every recent call are not a fallback; they age back in
+        # once their outcomes leave the window
+        candidates = [provider for provider in candidates if provider.success_rate() != 0.0] or candidates
+
+        with self._lock:
+            self._stats["calls"] += 1
+        last_error: Optional[ProviderUnavailable] = None
+        rate_limited: List[Provider] = []
+        for position, provider in enumerate(candidates):
+            if position:
+                with self._lock:
+                    self._stats["failovers"] += 1
+                logger.warning("Failing over from %s to %s: %s", candidates[position - 1].name, provider.name, last_error)
+            try:
+                return self._attempt(fn, provider, 0.0), provider
+            except ProviderRateLimited as exc:
+                # Quota pressure is not an outage; leave the breaker alone
+                rate_limited.append(provider)
+                last_error = exc
+            except ProviderUnavailable as exc:
+                provider.record_failure()
+                last_error = exc
+
+        if rate_limited and max_wait > 0:
+            # Queue rather than fail: wait for quota on the best provider that is merely busy
+            provider = rate_limited[0]
+            with self._lock:
+                self._stats["queued"] += 1
+            logger.info("No provider could answer now; queueing up to %.0fs for %s", max_wait, provider.name)
+            try:
+                return self._attempt(fn, provider, max_wait), provider
+            except ProviderRateLimited as exc:
+                last_error = exc
+            except ProviderUnavailable as exc:
+                provider.record_failure()
+                last_error = exc
+
+        with self._lock:
+            self._stats["exhausted"] += 1
+        raise last_error
+
+    def _attempt(self, fn, provider: Provider, quota_wait: float) -> Any:
+        result, elapsed = fn(provider, quota_wait)
+        provider.record_success(elapsed)
+        with self._lock:
+            self._stats[f"served_by:{provider.name}"] += 1
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "calls": stats.get("calls", 0),
+            "failovers": stats.get("failovers", 0),
+            "queued": stats.get("queued", 0),
+            "exhausted": stats.get("exhausted", 0),
+            "ranking": [provider.name for provider in self.ranked()],
+            "providers": {
+                provider.name: dict(provider.metrics(), served=stats.get(f"served_by:{provider.name}", 0))
+                for provider in self.providers
+            },
+        }
@@ -0,0 +1,151 @@
+"""Incremental parser for the recommendation JSON the LLM streams back.
+
+Every character is inspected once as chunks arrive. Text before the
+top-level object and after it closes (markdown fences, chatter) is dropped,
+and trailing commas are removed on the fly. Each element of
+``recommendations`` is decoded as soon as its closing brace arrives, so the
+whole buffer is never re-parsed. If the stream is cut off, ``finish``
+still returns every value and recommendation that was complete.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+RECOMMENDATIONS_KEY = "recommendations"
+
+
+class RecommendationStreamParser:
+    def __init__(self) -> None:
+        self._buf: List[str] = []      # normalised text of the top-level object
+        self._stack: List[str] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._pending_comma = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self._in_recommendations = False
+        self._element_start = 0
+        self.fields: Dict[str, Any] = {}
+        self.recommendations: List[Dict[str, Any]] = []
+
+    @property
+    def truncated(self) -> bool:
+        return self._started and not self._done
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; return the recommendations it completed"""
+        completed = []
+        for char in chunk:
+            if self._done:
+                break
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._open(char)
+                continue
+            if self._in_string:
+                self._buf.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = "".join(self._buf[self._string_start:])
+                continue
+            if char.isspace():
+                self._buf.append(char)
+                continue
+            if char == ",":
+                self._end_value()
+                self._pending_comma = True
+                continue
+
+            if self._pending_comma:
+                self._pending_comma = False
+                if char not in "}]":
+                    self._buf.append(",")
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = len(self._buf)
+                self._buf.append(char)
+            elif char in "{[":
+                self._open(char)
+            elif char in "}]":
+                rec = self._close(char)
+                if rec is not None:
+                    completed.append(rec)
+            elif char == ":" and len(self._stack) == 1:
+                self._buf.append(char)
+                self._key = _loads(self._last_string)
+                self._value_start = len(self._buf)
+            else:
+                self._buf.append(char)
+        return completed
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Full payload, or whatever was complete if the stream was cut off"""
+        if self._done:
+            payload = _loads("".join(self._buf))
+            if isinstance(payload, dict):
+                return payload
+        if not self.fields and not self.recommendations:
+            return None
+        payload = dict(self.fields)
+        payload[RECOMMENDATIONS_KEY] = list(self.recommendations)
+        return payload
+
+    def _open(self, char: str) -> None:
+        if (
+            char == "{"
+            and self._in_recommendations
+            and len(self._stack) == 2
+        ):
+            self._element_start = len(self._buf)
+        elif char == "[" and len(self._stack) == 1 and self._key == RECOMMENDATIONS_KEY:
+            self._in_recommendations = True
+        self._stack.append(char)
+        self._buf.append(char)
+
+    def _close(self, char: str) -> Optional[Dict[str, Any]]:
+        if not self._stack:
+            return None
+        if len(self._stack) == 1 and char == "}":
+            self._end_value()
+        self._stack.pop()
+        self._buf.append(char)
+
+        depth = len(self._stack)
+        if depth == 0:
+            self._done = True
+        elif depth == 1 and self._in_recommendations:
+            self._in_recommendations = False
+        elif depth == 2 and self._in_recommendations and char == "}":
+            rec = _loads("".join(self._buf[self._element_start:]))
+            if isinstance(rec, dict):
+                self.recommendations.append(rec)
+                return rec
+        return None
+
+    def _end_value(self) -> None:
+        """Record the top-level value that a ',' or the final '}' just ended"""
+        if len(self._stack) != 1 or self._key is None:
+            return
+        value = _loads("".join(self._buf[self._value_start:]))
+        if value is not None:
+            self.fields[self._key] = value
+        self._key = None
+
+
+def _loads(text: Optional[str]) -> Any:
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
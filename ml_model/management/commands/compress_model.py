@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from ml_model.compression import compress
+from ml_model.evaluation import evaluate_checkpoint
+from ml_model.training_pipeline import DEFAULT_MODEL_PATH
+
+
+class Command(BaseCommand):
+    help = "Prune attention heads and classifier-head neurons to a FLOP budget and write a smaller checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the compressed checkpoint (.pth)")
+        parser.add_argument('--checkpoint', default=DEFAULT_MODEL_PATH)
+        parser.add_argument('--flop-budget', type=float, default=0.75, help="Target FLOPs as a fraction of the original")
+        parser.add_argument('--head-keep', type=float, default=0.5, help="Fraction of classifier-head neurons kept per layer")
+        parser.add_argument('--recovery-steps', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=16)
+
+    def handle(self, *args, **options):
+        report = compress(
+            options['output'],
+            model_path=options['checkpoint'],
+            flop_budget=options['flop_budget'],
+            head_keep_ratio=options['head_keep'],
+            recovery_steps=options['recovery_steps'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f"FLOPs @ {report['seq_len']} tokens: {report['flops_before'] / 1e9:.2f} G -> "
+            f"{report['flops_after'] / 1e9:.2f} G ({report['flop_ratio']:.0%})"
+        )
+        self.stdout.write(
+            f"Attention heads pruned: {report['heads_pruned']}/{report['heads_total']}; "
+            f"classifier head {report['head_dims_before']} -> {report['head_dims_after']}"
+        )
+        self.stdout.write(
+            f"Validation MAE: {report['val_mae_before']:.4f} original, {report['val_mae_pruned']:.4f} pruned, "
+            f"{report['val_mae_after']:.4f} after {report['recovery_steps']} recovery steps"
+        )
+        self.stdout.write(
+            f"Checkpoint size: {report['size_bytes_before'] / 1e6:.1f} MB -> {report['size_bytes_after'] / 1e6:.1f} MB"
+        )
+
+        original = evaluate_checkpoint(options['checkpoint'])
+        compressed = evaluate_checkpoint(options['output'])
+        self.stdout.write(
+            f"test_set.csv: MAE {original['mae']:.4f} -> {compressed['mae']:.4f}, "
+            f"latency {original['latency_ms_per_sample']:.2f} -> {compressed['latency_ms_per_sample']:.2f} ms/sample"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Compressed checkpoint written to {options['output']}"))
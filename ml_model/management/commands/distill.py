@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from ml_model.distillation import DEFAULT_STUDENT_CONFIG, compare_to_teacher, distill
+from ml_model.training_pipeline import DEFAULT_MODEL_PATH
+
+
+class Command(BaseCommand):
+    help = "Distill the burnout classifier into a compact student and compare them on test_set.csv"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the student checkpoint (.pth)")
+        parser.add_argument('--teacher', default=DEFAULT_MODEL_PATH)
+        parser.add_argument('--layers', type=int, default=DEFAULT_STUDENT_CONFIG['encoder_layers'], help="Transformer layers kept in the student")
+        parser.add_argument('--head-dims', default=','.join(map(str, DEFAULT_STUDENT_CONFIG['head_dims'])), help="Comma-separated hidden widths of the student head")
+        parser.add_argument('--dropout', type=float, default=0.1)
+        parser.add_argument('--alpha', type=float, default=0.7, help="Weight of the teacher targets versus the true labels")
+        parser.add_argument('--max-epochs', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=16)
+
+    def handle(self, *args, **options):
+        head_dims = [int(width) for width in options['head_dims'].split(',') if width]
+        student_config = {
+            'encoder_layers': options['layers'],
+            'head_dims': head_dims,
+            'head_dropouts': [options['dropout']] * (len(head_dims) + 1),
+        }
+        result = distill(
+            options['output'],
+            teacher_path=options['teacher'],
+            student_config=student_config,
+            max_epochs=options['max_epochs'],
+            batch_size=options['batch_size'],
+            alpha=options['alpha'],
+        )
+        self.stdout.write(f"Student trained: best val MAE {result['best_val_mae']:.4f} at epoch {result['best_epoch']}")
+
+        report = compare_to_teacher(options['output'], options['teacher'])
+        teacher, student = report['teacher'], report['student']
+        self.stdout.write(f"           {'MAE':>8} {'R²':>8} {'ms/sample':>10}")
+        self.stdout.write(f"  teacher  {teacher['mae']:>8.4f} {teacher['r2']:>8.4f} {teacher['latency_ms_per_sample']:>10.2f}")
+        self.stdout.write(f"  student  {student['mae']:>8.4f} {student['r2']:>8.4f} {student['latency_ms_per_sample']:>10.2f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Speedup {report['speedup']:.2f}x, MAE delta {report['mae_delta']:+.4f}, "
+            f"R² delta {report['r2_delta']:+.4f}; drop-in checkpoint at {options['output']}"
+        ))
@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.evaluation import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_TOLERANCES,
+    LEVELS,
+    check_regression,
+    evaluate_checkpoint,
+    load_baseline,
+    save_baseline,
+)
+from ml_model.training_pipeline import DEFAULT_MODEL_PATH, TEST_CSV
+
+
+class Command(BaseCommand):
+    help = "Score a checkpoint on test_set.csv in batches and gate it against the stored baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkpoint', default=DEFAULT_MODEL_PATH)
+        parser.add_argument('--csv', default=TEST_CSV)
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+        parser.add_argument('--save-baseline', action='store_true', help="Store these metrics as the new baseline")
+        parser.add_argument('--json', action='store_true', help="Print the metrics as JSON")
+        parser.add_argument('--early-exit-margin', type=float, help="Score with early exit at this margin from 0.35/0.65")
+        for name, default in DEFAULT_TOLERANCES.items():
+            parser.add_argument(f"--max-{name.replace('_', '-')}", dest=name, type=float, default=default)
+
+    def handle(self, *args, **options):
+        metrics = evaluate_checkpoint(
+            options['checkpoint'],
+            options['csv'],
+            batch_size=options['batch_size'],
+            early_exit_margin=options['early_exit_margin'],
+        )
+
+        if options['json']:
+            self.stdout.write(json.dumps(metrics, indent=2))
+        else:
+            self._print_metrics(metrics)
+
+        if options['save_baseline']:
+            save_baseline(metrics, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        baseline = load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}; run with --save-baseline to create one"
+            ))
+            return
+
+        failures = check_regression(metrics, baseline, {name: options[name] for name in DEFAULT_TOLERANCES})
+        if failures:
+            raise CommandError("Regression gate failed:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Regression gate passed"))
+
+    def _print_metrics(self, metrics):
+        self.stdout.write(f"{metrics['checkpoint']} on {metrics['dataset']} ({metrics['samples']} samples)")
+        self.stdout.write(f"  MAE {metrics['mae']:.4f}  R² {metrics['r2']:.4f}  level accuracy {metrics['level_accuracy']:.3f}")
+        self.stdout.write(
+            f"  {metrics['latency_ms_per_sample']:.2f} ms/sample, {metrics['samples_per_second']:.1f} samples/s "
+            f"(batch size {metrics['batch_size']})"
+        )
+        self.stdout.write("  confusion (rows = true, cols = predicted): " + " ".join(f"{level:>9}" for level in LEVELS))
+        for level in LEVELS:
+            row = metrics['level_confusion'][level]
+            self.stdout.write(f"  {level:>9}: " + " ".join(f"{row[col]:>9}" for col in LEVELS))
+        if metrics['early_exit_margin'] is not None:
+            early_exit = metrics['early_exit']
+            distribution = ", ".join(
+                f"layer {layer}: {share:.0%}" for layer, share in early_exit['exit_distribution'].items()
+            )
+            self.stdout.write(
+                f"  early exit (margin {metrics['early_exit_margin']}): "
+                f"{early_exit['average_layers_executed']:.2f} layers on average; {distribution}"
+            )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from ml_model.incremental_training import CHECKPOINT_DIR, run_incremental_update
+
+
+class Command(BaseCommand):
+    help = "Fine-tune the latest checkpoint on HR-validated sessions completed since it was trained"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+        parser.add_argument('--chunk-size', type=int, default=500, help="Sessions fetched per query")
+        parser.add_argument('--max-steps', type=int, default=200, help="Upper bound on optimizer steps")
+        parser.add_argument('--epochs', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument('--learning-rate', type=float, default=1e-5)
+        parser.add_argument('--top-layers', type=int, default=2, help="Transformer layers unfrozen below the head")
+        parser.add_argument('--promote', action='store_true', help="Also copy the new checkpoint over the production model")
+
+    def handle(self, *args, **options):
+        result = run_incremental_update(
+            checkpoint_dir=options['checkpoint_dir'],
+            chunk_size=options['chunk_size'],
+            promote=options['promote'],
+            max_steps=options['max_steps'],
+            epochs=options['epochs'],
+            batch_size=options['batch_size'],
+            learning_rate=options['learning_rate'],
+            top_layers=options['top_layers'],
+        )
+
+        if not result['published']:
+            self.stdout.write(self.style.WARNING(f"No new validated sessions since {result['base']}; nothing published"))
+            return
+
+        self.stdout.write(
+            f"Fine-tuned {result['base']} on {result['samples']} sessions for {result['steps']} steps: "
+            f"val MAE {result['val_mae_before']:.4f} -> {result['val_mae_after']:.4f}"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Published v{result['version']} at {result['published']}"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.ingestion import DEFAULT_STORE_PATH, count_training_rows, ingest_csv
+
+
+class Command(BaseCommand):
+    help = "Stream review CSV exports into the deduplicated training store in bounded-memory chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_paths', nargs='+', help="Review CSV files to ingest")
+        parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="SQLite training store to append to")
+        parser.add_argument('--chunksize', type=int, default=10000, help="Rows read per chunk")
+        parser.add_argument('--text-col', default='feedback')
+        parser.add_argument('--label-col', default='nine_box_category')
+
+    def handle(self, *args, **options):
+        for csv_path in options['csv_paths']:
+            try:
+                stats = ingest_csv(
+                    csv_path,
+                    store_path=options['store'],
+                    chunksize=options['chunksize'],
+                    text_col=options['text_col'],
+                    label_col=options['label_col'],
+                )
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Failed to ingest {csv_path}: {exc}")
+
+            self.stdout.write(
+                f"{csv_path}: {stats.rows_read} read, {stats.rows_inserted} inserted, "
+                f"{stats.rows_duplicate} duplicates, {stats.rows_unlabelled} unlabelled, "
+                f"{stats.rows_empty} empty ({stats.chunks} chunks)"
+            )
+
+        total = count_training_rows(options['store'])
+        self.stdout.write(self.style.SUCCESS(f"Training store {options['store']} now holds {total} rows"))
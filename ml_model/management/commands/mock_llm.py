@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.mock_llm_server import MockLLMConfig, make_server
+
+
+class Command(BaseCommand):
+    help = "Run a local OpenAI-compatible chat-completions server with injectable latency, errors and 429s"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--latency', default='lognormal:0.4,0.5',
+                            help="Time to first token: fixed:S, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA")
+        parser.add_argument('--tokens-per-second', type=float, default=400.0)
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of calls answered 500/503")
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of calls answered 429")
+        parser.add_argument('--retry-after', type=float, default=2.0, help="Retry-After seconds sent with 429s")
+        parser.add_argument('--rpm', type=float, default=None, help="Enforce a real requests-per-minute quota")
+        parser.add_argument('--malformed-rate', type=float, default=0.0,
+                            help="Fraction of bodies returned fenced, prose-wrapped, truncated or broken")
+        parser.add_argument('--canned', help="JSON file with one payload or a list of payloads to return in rotation")
+        parser.add_argument('--model', default='mock-llm')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        canned = []
+        if options['canned']:
+            try:
+                with open(options['canned']) as handle:
+                    loaded = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read canned payloads: {exc}")
+            canned = loaded if isinstance(loaded, list) else [loaded]
+
+        try:
+            config = MockLLMConfig(
+                latency=options['latency'],
+                tokens_per_second=options['tokens_per_second'],
+                error_rate=options['error_rate'],
+                rate_limit_rate=options['rate_limit_rate'],
+                retry_after_seconds=options['retry_after'],
+                requests_per_minute=options['rpm'],
+                malformed_rate=options['malformed_rate'],
+                canned=canned,
+                model=options['model'],
+                seed=options['seed'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        server = make_server(config, options['host'], options['port'])
+        url = f"http://{options['host']}:{server.server_port}/v1/chat/completions"
+        self.stdout.write(self.style.SUCCESS(f"Mock LLM serving {url} (GROQ_API_URL={url})"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served: {json.dumps(server.state.snapshot(), sort_keys=True)}")
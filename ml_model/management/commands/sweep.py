@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.hyperparameter_sweep import DEFAULT_GRID, run_sweep
+
+
+class Command(BaseCommand):
+    help = "Run a parallel hyperparameter sweep over the classifier head and focal loss"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help="Directory for checkpoints, the token cache and leaderboard.csv")
+        parser.add_argument('--grid', help="JSON file mapping parameter names to lists of values")
+        parser.add_argument('--workers', type=int, default=2, help="Trials run in parallel")
+        parser.add_argument('--cores-per-trial', type=int, help="Cores pinned to each worker (default: split evenly)")
+        parser.add_argument('--max-trials', type=int, help="Randomly sample at most this many grid points")
+        parser.add_argument('--max-epochs', type=int, default=10)
+        parser.add_argument('--patience', type=int, default=2, help="Epochs without validation MAE improvement before stopping")
+        parser.add_argument('--exit-layers', default='', help="Comma-separated layer indices that get jointly trained early-exit heads")
+        parser.add_argument('--cache', help="Pre-tokenized dataset cache to share (default: <output_dir>/token_cache.pt)")
+
+    def handle(self, *args, **options):
+        grid = DEFAULT_GRID
+        if options['grid']:
+            try:
+                with open(options['grid']) as handle:
+                    grid = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read grid file: {exc}")
+
+        try:
+            results = run_sweep(
+                options['output_dir'],
+                grid=grid,
+                workers=options['workers'],
+                cores_per_trial=options['cores_per_trial'],
+                max_trials=options['max_trials'],
+                base_config={
+                    'max_epochs': options['max_epochs'],
+                    'patience': options['patience'],
+                    'exit_layers': tuple(int(layer) for layer in options['exit_layers'].split(',') if layer),
+                },
+                cache_path=options['cache'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for row in results:
+            self.stdout.write(
+                f"#{row['rank']} trial {row['trial_id']}: val MAE {row['best_val_mae']:.4f} "
+                f"({row['cpu_hours']:.3f} CPU-h) {row['params']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Leaderboard written to {options['output_dir']}/leaderboard.csv"))
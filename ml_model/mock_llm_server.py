@@ -0,0 +1,272 @@
+"""Local OpenAI-compatible stand-in for the LLM providers.
+
+It serves ``POST /v1/chat/completions`` (plain or ``stream: true`` SSE) and
+``GET /v1/models``, the two calls the recommender makes, plus
+``GET /stats`` for the counters. Every response is drawn from a seeded RNG,
+so a run can be repeated exactly:
+
+* latency: time to first token, ``fixed:S``, ``uniform:LO,HI``,
+  ``normal:MEAN,SD`` or ``lognormal:MEDIAN,SIGMA`` (seconds), then
+  ``tokens_per_second`` for the rest of the body
+* ``error_rate``: 500/503 responses
+* ``rate_limit_rate``: injected 429s with ``Retry-After``; ``requests_per_minute``
+  also enforces a real sliding-window quota
+* ``malformed_rate``: prose-wrapped, fenced, truncated or broken JSON
+
+By default the body is a valid recommendation payload with as many
+recommendations as the prompt asks for. ``canned`` replaces it with fixed
+payloads, used in rotation.
+
+Point ``GROQ_API_URL`` (or an ``LLM_PROVIDERS`` entry) at
+``http://127.0.0.1:<port>/v1/chat/completions`` to use it, or start one in
+process with ``start_mock_server``.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+MALFORMED_KINDS = ('prose', 'fenced', 'truncated', 'broken')
+_RECOMMENDATION_COUNT = re.compile(r"Provide exactly (\d+) recommendations")
+_PRIORITIES = ('immediate', 'short_term', 'long_term')
+
+
+def parse_latency(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    """``"lognormal:0.8,0.5"`` -> ``("lognormal", (0.8, 0.5))``"""
+    kind, _, args = spec.partition(':')
+    params = tuple(float(value) for value in args.split(',')) if args else ()
+    expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f"Bad latency spec {spec!r}; use fixed:S, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA")
+    return kind, params
+
+
+@dataclass
+class MockLLMConfig:
+    latency: str = 'lognormal:0.4,0.5'
+    tokens_per_second: float = 400.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 2.0
+    requests_per_minute: Optional[float] = None
+    malformed_rate: float = 0.0
+    canned: List[Dict[str, Any]] = field(default_factory=list)
+    model: str = 'mock-llm'
+    seed: int = 0
+
+    def __post_init__(self):
+        self.latency_kind, self.latency_params = parse_latency(self.latency)
+
+
+class MockLLMState:
+    """Seeded decisions and counters shared by the server's handler threads"""
+
+    def __init__(self, config: MockLLMConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._canned_index = 0
+        self.stats = Counter()
+
+    def plan(self, prompt: str) -> Dict[str, Any]:
+        """Decide one response up front, under the lock, so runs are reproducible"""
+        config = self.config
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if config.requests_per_minute:
+                while self._recent and self._recent[0] < now - 60:
+                    self._recent.popleft()
+                if len(self._recent) >= config.requests_per_minute:
+                    self.stats['quota_429'] += 1
+                    return {'status': 429, 'retry_after': max(1.0, 60 - (now - self._recent[0]))}
+                self._recent.append(now)
+
+            roll = self._rng.random()
+            if roll < config.rate_limit_rate:
+                self.stats['injected_429'] += 1
+                return {'status': 429, 'retry_after': config.retry_after_seconds}
+            if roll < config.rate_limit_rate + config.error_rate:
+                self.stats['errors'] += 1
+                return {'status': self._rng.choice((500, 503)), 'delay': self._latency()}
+
+            body = self._body(prompt)
+            if self._rng.random() < config.malformed_rate:
+                kind = self._rng.choice(MALFORMED_KINDS)
+                self.stats[f'malformed_{kind}'] += 1
+                body = _malform(body, kind, self._rng)
+            else:
+                self.stats['ok'] += 1
+            return {'status': 200, 'delay': self._latency(), 'body': body}
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def _latency(self) -> float:
+        kind, params = self.config.latency_kind, self.config.latency_params
+        if kind == 'fixed':
+            value = params[0]
+        elif kind == 'uniform':
+            value = self._rng.uniform(*params)
+        elif kind == 'normal':
+            value = self._rng.gauss(*params)
+        else:
+            median, sigma = params
+            value = median * self._rng.lognormvariate(0.0, sigma)
+        return max(0.0, value)
+
+    def _body(self, prompt: str) -> str:
+        if self.config.canned:
+            payload = self.config.canned[self._canned_index % len(self.config.canned)]
+            self._canned_index += 1
+            return json.dumps(payload)
+        match = _RECOMMENDATION_COUNT.search(prompt)
+        count = int(match.group(1)) if match else 5
+        level = self._rng.choice(('LOW', 'MODERATE', 'HIGH'))
+        return json.dumps({
+            'burnout_level': level,
+            'confidence': round(self._rng.uniform(0.5, 0.95), 2),
+            'summary': f"Mock assessment summary for a {level.lower()} burnout profile. "
+                       "Generated locally for load testing.",
+            'recommendations': [
+                {
+                    'title': f"Mock recommendation {index + 1}",
+                    'description': "Block out a recurring focus period. Review your workload with your manager.",
+                    'why_it_helps': "Predictable recovery time lowers sustained stress.",
+                    'timeframe': "Start this week, review every Friday",
+                    'priority': _PRIORITIES[index % len(_PRIORITIES)],
+                }
+                for index in range(count)
+            ],
+        })
+
+
+def _malform(body: str, kind: str, rng: random.Random) -> str:
+    if kind == 'prose':
+        return f"Sure! Here are your recommendations:\n{body}\nLet me know if you need more."
+    if kind == 'fenced':
+        return f"```json\n{body}\n```"
+    if kind == 'truncated':
+        return body[:rng.randint(len(body) // 3, len(body) - 2)]
+    # Unquoted keys and a stray trailing brace: nothing recoverable
+    return re.sub(r'"(\w+)":', r'\1:', body, count=3) + '}'
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockLLMState = None
+
+    def log_message(self, format, *args):
+        logger.debug("mock-llm %s", format % args)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': self.state.config.model, 'object': 'model'}]})
+        elif self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.state.snapshot())
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'invalid JSON body'}})
+            return
+        prompt = "\n".join(message.get('content', '') for message in request.get('messages', []))
+        plan = self.state.plan(prompt)
+
+        if plan['status'] == 429:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}},
+                            headers={'Retry-After': f"{plan['retry_after']:.0f}"})
+            return
+        time.sleep(plan['delay'])
+        if plan['status'] != 200:
+            self._send_json(plan['status'], {'error': {'message': 'Injected upstream failure'}})
+            return
+
+        body = plan['body']
+        if request.get('max_tokens'):
+            # Like a real provider, stop at the output budget
+            body = body[:int(request['max_tokens']) * CHARS_PER_TOKEN]
+        model = request.get('model') or self.state.config.model
+        if request.get('stream'):
+            self._stream(body, model)
+            return
+        time.sleep(estimate_tokens(body) / self.state.config.tokens_per_second)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(body)
+        self._send_json(200, {
+            'id': f"mock-{int(time.time() * 1000)}",
+            'object': 'chat.completion',
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': body}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream(self, body: str, model: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        # About four tokens per chunk, paced at tokens_per_second
+        step = 4 * CHARS_PER_TOKEN
+        pause = 4 / self.state.config.tokens_per_second
+        try:
+            for start in range(0, len(body), step):
+                chunk = {'object': 'chat.completion.chunk', 'model': model,
+                         'choices': [{'index': 0, 'delta': {'content': body[start:start + step]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(pause)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up mid-stream (deadline, cancelled request)
+            pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_server(config: MockLLMConfig, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Bind a server; ``port=0`` picks a free port (see ``server.server_port``)"""
+    handler = type('BoundMockLLMHandler', (MockLLMHandler,), {'state': MockLLMState(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    return server
+
+
+def start_mock_server(config: Optional[MockLLMConfig] = None, host: str = '127.0.0.1', port: int = 0):
+    """Serve on a daemon thread; returns ``(server, completions_url)``"""
+    server = make_server(config or MockLLMConfig(), host, port)
+    threading.Thread(target=server.serve_forever, name='mock-llm', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1/chat/completions"
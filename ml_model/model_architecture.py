@@ -1,6 +1,9 @@
+import json
+import os
+
+import torch
 import torch.nn as nn
 from transformers import DistilBertForSequenceClassification
-<<<<<<< HEAD
 import warnings
 import logging
 
@@ -8,10 +11,22 @@ import logging
 warnings.filterwarnings("ignore", message="Some weights of.*were not initialized")
 logging.getLogger("transformers").setLevel(logging.ERROR)
 
+DEFAULT_HEAD_DIMS = (1024, 512, 256)
+DEFAULT_HEAD_DROPOUTS = (0.3, 0.2, 0.1, 0.1)
+EXIT_HEAD_DIM = 64
+
+
 class UltimateBurnoutClassifier(nn.Module):
-    def __init__(self):
+    """Ultimate burnout classifier with advanced architecture"""
+    def __init__(self, head_dims=DEFAULT_HEAD_DIMS, head_dropouts=DEFAULT_HEAD_DROPOUTS, encoder_layers=None,
+                 pruned_heads=None, exit_layers=None):
         super().__init__()
-        
+        if len(head_dropouts) != len(head_dims) + 1:
+            raise ValueError("head_dropouts needs one entry per hidden layer plus the input dropout")
+
+        self.head_dims = tuple(head_dims)
+        self.head_dropouts = tuple(head_dropouts)
+
         # Suppress warnings for this specific call
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
@@ -20,20 +35,21 @@ class UltimateBurnoutClassifier(nn.Module):
                 num_labels=1,
                 ignore_mismatched_sizes=True
             )
-=======
-import torch
 
-class UltimateBurnoutClassifier(nn.Module):
-    """Ultimate burnout classifier with advanced architecture"""
-    def __init__(self):
-        super().__init__()
-        self.encoder = DistilBertForSequenceClassification.from_pretrained(
-            'distilbert-base-uncased',
-            num_labels=1,
-            ignore_mismatched_sizes=True
-        )
->>>>>>> 6f3ffefb422d0b370699f66f63b11dd4b23f4e47
-        
+        # Compact variants keep an evenly spaced subset of the transformer layers
+        self.encoder_layers = encoder_layers
+        if encoder_layers is not None and encoder_layers < self.encoder.config.n_layers:
+            kept = kept_layer_indices(self.encoder.config.n_layers, encoder_layers)
+            transformer = self.encoder.distilbert.transformer
+            transformer.layer = nn.ModuleList([transformer.layer[i] for i in kept])
+            transformer.n_layers = encoder_layers
+            self.encoder.config.n_layers = encoder_layers
+
+        # Structurally pruned attention heads, {layer index: [original head indices]}
+        self.pruned_heads = {}
+        if pruned_heads:
+            self.prune_attention_heads(pruned_heads)
+
         # Strategic freezing
         for name, param in self.encoder.named_parameters():
             if any(f'layer.{i}' in name for i in [3, 4, 5]):
@@ -41,32 +57,73 @@ class UltimateBurnoutClassifier(nn.Module):
             else:
                 param.requires_grad = False
 
-        # Advanced classification head
-        self.encoder.classifier = nn.Sequential(
-            nn.Dropout(0.3),
-            nn.Linear(768, 1024),
-            nn.GELU(),
-            nn.LayerNorm(1024),
-            nn.Dropout(0.2),
-            nn.Linear(1024, 512),
-            nn.GELU(),
-            nn.LayerNorm(512),
-            nn.Dropout(0.1),
-            nn.Linear(512, 256),
-            nn.GELU(),
-            nn.LayerNorm(256),
-            nn.Dropout(0.1),
-            nn.Linear(256, 1),
+        # Advanced classification head (Dropout -> Linear -> GELU -> LayerNorm per block,
+        # the default widths give the original 768 -> 1024 -> 512 -> 256 -> 1 stack)
+        layers = []
+        in_dim = self.encoder.config.dim
+        for width, dropout in zip(self.head_dims, self.head_dropouts):
+            layers.extend([
+                nn.Dropout(dropout),
+                nn.Linear(in_dim, width),
+                nn.GELU(),
+                nn.LayerNorm(width),
+            ])
+            in_dim = width
+        layers.extend([
+            nn.Dropout(self.head_dropouts[-1]),
+            nn.Linear(in_dim, 1),
             nn.Sigmoid()
-        )
+        ])
+        self.encoder.classifier = nn.Sequential(*layers)
+
+        # Lightweight regression heads on the [CLS] state after intermediate layers, for early exit
+        self.exit_layers = tuple(sorted(exit_layers or ()))
+        self.exit_heads = nn.ModuleDict({
+            str(layer): nn.Sequential(
+                nn.Linear(self.encoder.config.dim, EXIT_HEAD_DIM),
+                nn.GELU(),
+                nn.Linear(EXIT_HEAD_DIM, 1),
+                nn.Sigmoid()
+            )
+            for layer in self.exit_layers
+        })
+
+    def architecture_config(self):
+        """Keyword arguments needed to rebuild this model around a saved state dict"""
+        config = {
+            'head_dims': list(self.head_dims),
+            'head_dropouts': list(self.head_dropouts),
+        }
+        if self.encoder_layers is not None:
+            config['encoder_layers'] = self.encoder_layers
+        if self.pruned_heads:
+            config['pruned_heads'] = {str(layer): sorted(heads) for layer, heads in self.pruned_heads.items()}
+        if self.exit_layers:
+            config['exit_layers'] = list(self.exit_layers)
+        return config
+
+    def prune_attention_heads(self, heads_to_prune):
+        """Physically remove attention heads, {layer index: [head indices]}"""
+        heads_to_prune = {int(layer): list(heads) for layer, heads in heads_to_prune.items() if heads}
+        self.encoder.prune_heads(heads_to_prune)
+        for layer, heads in heads_to_prune.items():
+            self.pruned_heads[layer] = sorted(set(self.pruned_heads.get(layer, [])) | set(heads))
 
     def forward(self, input_ids, attention_mask):
         outputs = self.encoder(input_ids=input_ids, attention_mask=attention_mask)
-<<<<<<< HEAD
-        return outputs.logits.squeeze()
-=======
         return outputs.logits.squeeze()
 
+    def forward_with_exits(self, input_ids, attention_mask):
+        """Main score plus one score per exit head, for joint training"""
+        outputs = self.encoder(input_ids=input_ids, attention_mask=attention_mask, output_hidden_states=True)
+        # hidden_states[0] is the embedding output, hidden_states[i + 1] the output of layer i
+        exit_scores = [
+            self.exit_heads[str(layer)](outputs.hidden_states[layer + 1][:, 0]).reshape(-1)
+            for layer in self.exit_layers
+        ]
+        return outputs.logits.reshape(-1), exit_scores
+
+
 class FocalLoss(nn.Module):
     """Focal loss for handling class imbalance"""
     def __init__(self, alpha=1, gamma=2, reduction='mean'):
@@ -87,4 +144,56 @@ class FocalLoss(nn.Module):
             return focal_loss.sum()
         else:
             return focal_loss
->>>>>>> 6f3ffefb422d0b370699f66f63b11dd4b23f4e47
+
+
+def kept_layer_indices(total_layers, kept_layers):
+    """Evenly spaced layer indices, always keeping the last layer"""
+    step = total_layers / kept_layers
+    return [min(total_layers - 1, int(round((i + 1) * step)) - 1) for i in range(kept_layers)]
+
+
+def set_trainable_layers(model, top_layers):
+    """Freeze the encoder except its top ``top_layers`` transformer layers and the head"""
+    num_layers = model.encoder.config.n_layers
+    trainable = [f'layer.{i}.' for i in range(max(num_layers - top_layers, 0), num_layers)]
+    for name, param in model.encoder.named_parameters():
+        param.requires_grad = (
+            name.startswith(('pre_classifier.', 'classifier.'))
+            or any(prefix in name for prefix in trainable)
+        )
+
+
+def architecture_config_path(model_path):
+    """Sidecar JSON stored next to a checkpoint describing its architecture"""
+    return f"{os.path.splitext(model_path)[0]}.json"
+
+
+def save_checkpoint(model, model_path, extra=None):
+    """Save a state dict plus the architecture sidecar needed to reload it"""
+    torch.save(model.state_dict(), model_path)
+    config = model.architecture_config()
+    if extra:
+        config.update(extra)
+    with open(architecture_config_path(model_path), 'w') as handle:
+        json.dump(config, handle, indent=2)
+
+
+def load_architecture_config(model_path):
+    """Read a checkpoint's sidecar; checkpoints without one use the default architecture"""
+    config_path = architecture_config_path(model_path)
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path) as handle:
+        return json.load(handle)
+
+
+def build_classifier(config=None):
+    """Instantiate the classifier described by an architecture config"""
+    config = config or {}
+    return UltimateBurnoutClassifier(
+        head_dims=config.get('head_dims', DEFAULT_HEAD_DIMS),
+        head_dropouts=config.get('head_dropouts', DEFAULT_HEAD_DROPOUTS),
+        encoder_layers=config.get('encoder_layers'),
+        pruned_heads=config.get('pruned_heads'),
+        exit_layers=config.get('exit_layers'),
+    )
@@ -1,58 +1,161 @@
+import os
+import numpy as np
 import torch
 import warnings
 import logging
 from transformers import DistilBertTokenizer
-from .model_architecture import UltimateBurnoutClassifier
+from .model_architecture import build_classifier, load_architecture_config
 from .data_processing import clean_text, simple_burnout_classification
+from .early_exit import early_exit_scores
+
+EARLY_EXIT_MARGIN_ENV = 'BURNOUT_EARLY_EXIT_MARGIN'
+
+RECOMMENDATIONS = {
+    "LOW": "Maintain healthy work habits and self-care routines",
+    "MODERATE": "Implement stress management strategies and consider workload adjustments",
+    "HIGH": "Seek professional support immediately and consider workplace changes",
+}
+
+
+def score_texts(model, tokenizer, texts, device, batch_size=64, max_length=128,
+                early_exit_margin=None, exit_stats=None):
+    """Clean, tokenize and score texts in batches; the shared inference path.
+
+    Batches are padded to their longest member instead of ``max_length``; the
+    attention mask hides the padding, so scores match the padded version.
+    With ``early_exit_margin`` set and a model trained with exit heads,
+    confident inputs return from an intermediate layer.
+    """
+    use_early_exit = early_exit_margin is not None and bool(getattr(model, 'exit_layers', ()))
+    cleaned = [clean_text(text) for text in texts]
+    scores = []
+    with torch.no_grad():
+        for start in range(0, len(cleaned), batch_size):
+            encoding = tokenizer(
+                cleaned[start:start + batch_size],
+                truncation=True,
+                padding=True,
+                max_length=max_length,
+                return_tensors='pt'
+            )
+            input_ids = encoding['input_ids'].to(device)
+            attention_mask = encoding['attention_mask'].to(device)
+            if use_early_exit:
+                outputs = early_exit_scores(model, input_ids, attention_mask, early_exit_margin, exit_stats)
+            else:
+                outputs = model(input_ids, attention_mask)
+            scores.extend(outputs.reshape(-1).tolist())
+    return scores
+
+
+def _window_starts(n_tokens, body, stride):
+    if n_tokens <= body:
+        return [0]
+    step = body - stride
+    return list(range(0, n_tokens - body, step)) + [n_tokens - body]
+
+
+def score_long_text(model, tokenizer, text, device, max_length=128, stride=32, batch_size=64,
+                    early_exit_margin=None, exit_stats=None):
+    """Score text of any length with overlapping windows, one batched pass and a token-weighted mean.
+
+    Windows hold ``max_length`` tokens including [CLS]/[SEP], and neighbours
+    share at least ``stride`` tokens, so a sentence cut at one window's edge
+    is seen whole by the next. Each token counts once: a window's weight is the sum over its tokens of
+    1 / (number of windows containing that token), so overlaps are not
+    double-counted. Returns ``(score, window_scores)``.
+    """
+    ids = tokenizer.encode(clean_text(text), add_special_tokens=False)
+    body = max_length - tokenizer.num_special_tokens_to_add()
+    starts = _window_starts(len(ids), body, stride)
+    windows = [ids[start:start + body] for start in starts]
+    use_early_exit = early_exit_margin is not None and bool(getattr(model, 'exit_layers', ()))
+    window_scores = []
+    with torch.no_grad():
+        for offset in range(0, len(windows), batch_size):
+            encoding = tokenizer.pad(
+                {'input_ids': [tokenizer.build_inputs_with_special_tokens(window)
+                               for window in windows[offset:offset + batch_size]]},
+                padding=True,
+                return_tensors='pt',
+            )
+            input_ids = encoding['input_ids'].to(device)
+            attention_mask = encoding['attention_mask'].to(device)
+            if use_early_exit:
+                outputs = early_exit_scores(model, input_ids, attention_mask, early_exit_margin, exit_stats)
+            else:
+                outputs = model(input_ids, attention_mask)
+            window_scores.extend(outputs.reshape(-1).tolist())
+
+    if len(windows) == 1:
+        return window_scores[0], window_scores
+    coverage = np.zeros(len(ids))
+    for start in starts:
+        coverage[start:start + body] += 1
+    weights = np.array([(1.0 / coverage[start:start + body]).sum() for start in starts])
+    return float(np.dot(weights, window_scores) / weights.sum()), window_scores
+
+
+def embed_texts(model, tokenizer, texts, device, batch_size=64, max_length=128):
+    """Mean-pooled, L2-normalised encoder embeddings of texts, shape (n, dim)"""
+    cleaned = [clean_text(text) for text in texts]
+    embeddings = []
+    with torch.no_grad():
+        for start in range(0, len(cleaned), batch_size):
+            encoding = tokenizer(
+                cleaned[start:start + batch_size],
+                truncation=True,
+                padding=True,
+                max_length=max_length,
+                return_tensors='pt'
+            )
+            attention_mask = encoding['attention_mask'].to(device)
+            hidden = model.encoder.distilbert(
+                input_ids=encoding['input_ids'].to(device),
+                attention_mask=attention_mask,
+            ).last_hidden_state
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            embeddings.append(torch.nn.functional.normalize(pooled, dim=-1).cpu())
+    if not embeddings:
+        return torch.empty(0, model.encoder.config.dim).numpy()
+    return torch.cat(embeddings).numpy()
+
+
+def early_exit_margin_from_env():
+    """Early-exit margin configured via the environment, or None to always run full depth"""
+    value = os.getenv(EARLY_EXIT_MARGIN_ENV)
+    return float(value) if value else None
+
+
+def burnout_result(score):
+    """Build the public prediction payload for a score"""
+    # Use SIMPLE classification
+    level, color = simple_burnout_classification(score)
+    return {
+        'score': score,
+        'level': level,
+        'color': color,
+        'recommendation': RECOMMENDATIONS[level]
+    }
+
 
 def predict_burnout_silent(text, model_path='ultimate_burnout_model.pth'):
     """COMPLETELY SILENT prediction function"""
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    
+
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         logging.getLogger("transformers").setLevel(logging.ERROR)
 
         tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
-        model = UltimateBurnoutClassifier()
+        model = build_classifier(load_architecture_config(model_path))
 
         # Load model in complete silence
         model.load_state_dict(torch.load(model_path, map_location=device), strict=False)
         model.to(device)
         model.eval()
 
-        # Clean text
-        text = clean_text(text)
+        score = score_texts(model, tokenizer, [text], device)[0]
 
-        # Tokenize
-        encoding = tokenizer(
-            text,
-            truncation=True,
-            padding='max_length',
-            max_length=128,
-            return_tensors='pt'
-        )
-
-        # Predict
-        with torch.no_grad():
-            input_ids = encoding['input_ids'].to(device)
-            attention_mask = encoding['attention_mask'].to(device)
-            score = model(input_ids, attention_mask).item()
-
-    # Use SIMPLE classification
-    level, color = simple_burnout_classification(score)
-
-    # Enhanced recommendations
-    if level == "LOW":
-        recommendation = "Maintain healthy work habits and self-care routines"
-    elif level == "MODERATE":
-        recommendation = "Implement stress management strategies and consider workload adjustments"
-    else:  # HIGH
-        recommendation = "Seek professional support immediately and consider workplace changes"
-
-    return {
-        'score': score,
-        'level': level,
-        'color': color,
-        'recommendation': recommendation
-    }
\ No newline at end of file
+    return burnout_result(score)
@@ -0,0 +1,242 @@
+"""Token-budgeted prompts for the LLM recommender.
+
+The static parts of the prompt are formatted once, at import: the three
+focus-specific system prompts and the JSON schema. Per request, only the
+answers are formatted. An answer over ``answer_token_budget`` keeps its
+first sentence plus its most burnout-relevant sentences, in their original
+order, until the budget is spent. ``max_tokens`` comes from the number of
+recommendations the burnout level calls for, not a flat 1000, because
+generation time grows with the output budget the model is allowed to fill.
+"""
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# What every request used to ask for; savings are reported against it
+LEGACY_MAX_TOKENS = 1000
+DEFAULT_ANSWER_TOKEN_BUDGET = 120
+
+# Recommendations requested per level; the response parser keeps at most five
+RECOMMENDATION_COUNTS = {"LOW": 3, "MODERATE": 4, "HIGH": 5}
+MAX_RECOMMENDATIONS = 5
+
+# Measured on llama-3.1-8b-instant output for this schema: the summary
+# envelope is ~110 tokens and each recommendation ~125
+ENVELOPE_TOKENS = 110
+TOKENS_PER_RECOMMENDATION = 125
+OUTPUT_HEADROOM = 1.25
+
+POSITIVE_WORDS = (
+    "energized", "ready", "manageable", "happy", "good", "enjoy", "comfortable", "well",
+    "excellent", "fantastic", "love", "content", "motivated", "doable",
+)
+NEGATIVE_WORDS = (
+    "drained", "exhausted", "can't handle", "quit", "unhappy", "stress", "tense",
+    "overwhelmed", "hate", "burnt out", "burnout", "struggling",
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+CRISIS_FOCUS = (
+    "USER IS IN CRISIS. Focus ONLY on: immediate recovery, professional help, urgent stress reduction. "
+    "Recommendations must be about survival and crisis management."
+)
+GROWTH_FOCUS = (
+    "***CRITICAL CONTEXT: USER IS EXTREMELY HAPPY AND THRIVING***\n"
+    "IMPORTANT CONSTRAINTS:\n"
+    "1. User LOVES their current job and wants to stay long-term\n"
+    "2. User finds their workload manageable and energizing\n"
+    "3. User is already highly satisfied and motivated\n\n"
+    "***RECOMMENDATION RULES - MUST FOLLOW:***\n"
+    "- DO NOT push for promotions or leadership roles unless user explicitly wants them\n"
+    "- DO NOT suggest aggressive career advancement that might disrupt their happiness\n"
+    "- DO NOT mention stress, burnout, challenges, or prevention\n"
+    "- DO focus on sustaining their current positive state\n"
+    "- DO suggest ways to deepen existing satisfaction\n"
+    "- DO recommend knowledge sharing and mentoring OTHERS (not seeking mentors)\n"
+    "- DO suggest ways to amplify their positive impact without adding pressure\n"
+    "- Recommendations should feel like natural extensions of their current happiness\n\n"
+    "APPROPRIATE THEMES: knowledge sharing, mentoring others, passion projects, "
+    "sustainable growth, deepening expertise, positive team contributions"
+)
+BALANCE_FOCUS = "User shows mixed signals. Balance growth with sustainable habits and work-life balance."
+
+SCHEMA_DESCRIPTION = (
+    "{"
+    '"burnout_level": "LOW | MODERATE | HIGH", '
+    '"confidence": 0.0-1.0, '
+    '"summary": "2-3 sentence overview", '
+    '"recommendations": ['
+    "{"
+    '"title": "Short name", '
+    '"description": "Action steps (2 sentences)", '
+    '"why_it_helps": "1 sentence rationale", '
+    '"timeframe": "When to start + cadence", '
+    '"priority": "immediate | short_term | long_term"'
+    "}"
+    "]"
+    "}"
+)
+
+
+def _system_prompt(focus_instruction: str) -> str:
+    return (
+        "You are an empathetic workplace wellbeing specialist who respects when users are already happy and thriving. "
+        f"{focus_instruction}\n\n"
+        "Generate recommendations that ALIGN with the user's expressed feelings. "
+        "Your recommendations must NOT disrupt their current happiness and satisfaction. "
+        "Output a JSON object matching the schema exactly. Do not include markdown fences.\n\n"
+        "User's Assessment Answers:\n"
+    )
+
+
+SYSTEM_PROMPTS = {
+    "crisis": _system_prompt(CRISIS_FOCUS),
+    "growth": _system_prompt(GROWTH_FOCUS),
+    "balance": _system_prompt(BALANCE_FOCUS),
+}
+SYSTEM_PROMPT_TOKENS = {focus: estimate_tokens(text) for focus, text in SYSTEM_PROMPTS.items()}
+# The recommendation count is the only per-request part of the closing block
+PROMPT_TAILS = {
+    count: (
+        f"\n\nJSON schema: {SCHEMA_DESCRIPTION}\n"
+        f"Provide exactly {count} recommendations.\n"
+        "Return ONLY the JSON:"
+    )
+    for count in range(1, MAX_RECOMMENDATIONS + 1)
+}
+PROMPT_TAIL_TOKENS = {count: estimate_tokens(text) for count, text in PROMPT_TAILS.items()}
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    max_tokens: int
+    recommendation_count: int
+    input_tokens: int
+    input_tokens_saved: int
+    output_tokens_saved: int
+
+    def savings(self) -> Dict[str, int]:
+        return {
+            "input_tokens": self.input_tokens,
+            "input_tokens_saved": self.input_tokens_saved,
+            "max_tokens": self.max_tokens,
+            "output_tokens_saved": self.output_tokens_saved,
+        }
+
+
+class PromptBuilder:
+    def __init__(self, answer_token_budget: Optional[int] = None, max_output_tokens: int = LEGACY_MAX_TOKENS):
+        self.answer_token_budget = answer_token_budget or int(
+            os.getenv("LLM_ANSWER_TOKEN_BUDGET", DEFAULT_ANSWER_TOKEN_BUDGET))
+        self.max_output_tokens = max_output_tokens
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def build(self, responses: List[Dict[str, str]], burnout_level: Optional[str] = None) -> BuiltPrompt:
+        focus = self._focus(responses)
+        count = RECOMMENDATION_COUNTS.get((burnout_level or "").upper(), MAX_RECOMMENDATIONS)
+
+        formatted_answers = []
+        trimmed_tokens = 0
+        answers_trimmed = 0
+        for idx, item in enumerate(responses, start=1):
+            question = item.get("question", f"Question {idx}")
+            answer = item.get("response", "").strip()
+            short_answer, saved = self.trim_answer(answer)
+            if saved:
+                answers_trimmed += 1
+                trimmed_tokens += saved
+            formatted_answers.append(f"{idx}. {question}\nAnswer: {short_answer}")
+        answers_blob = "\n\n".join(formatted_answers) if formatted_answers else "No answers supplied."
+
+        max_tokens = self.max_tokens_for(count)
+        built = BuiltPrompt(
+            text=SYSTEM_PROMPTS[focus] + answers_blob + PROMPT_TAILS[count],
+            max_tokens=max_tokens,
+            recommendation_count=count,
+            input_tokens=SYSTEM_PROMPT_TOKENS[focus] + estimate_tokens(answers_blob) + PROMPT_TAIL_TOKENS[count],
+            input_tokens_saved=trimmed_tokens,
+            output_tokens_saved=max(0, LEGACY_MAX_TOKENS - max_tokens),
+        )
+
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._stats["answers_trimmed"] += answers_trimmed
+            self._stats["input_tokens"] += built.input_tokens
+            self._stats["input_tokens_saved"] += built.input_tokens_saved
+            self._stats["output_tokens_saved"] += built.output_tokens_saved
+        logger.info(
+            "LLM prompt (%s focus, %d recommendations): ~%d input tokens (%d saved), max_tokens=%d (%d saved)",
+            focus, count, built.input_tokens, built.input_tokens_saved, max_tokens, built.output_tokens_saved,
+        )
+        return built
+
+    def max_tokens_for(self, recommendation_count: int) -> int:
+        needed = (ENVELOPE_TOKENS + recommendation_count * TOKENS_PER_RECOMMENDATION) * OUTPUT_HEADROOM
+        return min(self.max_output_tokens, int(math.ceil(needed)))
+
+    def trim_answer(self, answer: str) -> Tuple[str, int]:
+        """Cut an answer down to the budget; return it with the tokens saved"""
+        tokens = estimate_tokens(answer)
+        if tokens <= self.answer_token_budget:
+            return answer, 0
+
+        sentences = [s for s in _SENTENCE_END.split(answer) if s]
+        # The opening sentence usually carries the direct answer, so it always stays
+        ranked = sorted(range(1, len(sentences)), key=lambda i: -_relevance(sentences[i]))
+        keep = {0}
+        used = estimate_tokens(sentences[0])
+        for i in ranked:
+            cost = estimate_tokens(sentences[i])
+            if used + cost <= self.answer_token_budget:
+                keep.add(i)
+                used += cost
+
+        trimmed = " ".join(sentences[i] for i in sorted(keep))
+        if estimate_tokens(trimmed) > self.answer_token_budget:
+            limit = self.answer_token_budget * CHARS_PER_TOKEN - 1
+            trimmed = trimmed[:limit].rsplit(" ", 1)[0]
+        if trimmed != answer:
+            trimmed += "…"
+        return trimmed, max(0, tokens - estimate_tokens(trimmed))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "prompts": stats.get("prompts", 0),
+            "answers_trimmed": stats.get("answers_trimmed", 0),
+            "input_tokens": stats.get("input_tokens", 0),
+            "input_tokens_saved": stats.get("input_tokens_saved", 0),
+            "output_tokens_saved": stats.get("output_tokens_saved", 0),
+            "answer_token_budget": self.answer_token_budget,
+        }
+
+    def _focus(self, responses: List[Dict[str, str]]) -> str:
+        # Counted on the full answers, before any trimming
+        answer_text = " ".join(r.get("response", "").lower() for r in responses)
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in answer_text)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in answer_text)
+        logger.debug("positive_count=%d, negative_count=%d", positive_count, negative_count)
+
+        if negative_count >= 3:
+            return "crisis"
+        if positive_count >= 3 and negative_count == 0:
+            return "growth"
+        return "balance"
+
+
+def _relevance(sentence: str) -> int:
+    lowered = sentence.lower()
+    return sum(1 for word in POSITIVE_WORDS + NEGATIVE_WORDS if word in lowered)
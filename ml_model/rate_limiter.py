@@ -0,0 +1,141 @@
+"""Client-side token-bucket rate limiting for the LLM provider's quota.
+
+Two buckets refill continuously, one for requests per minute and one for
+tokens per minute. A request is admitted once both can cover it. Its token
+cost is the estimated prompt size plus the ``max_tokens`` it may generate.
+Callers that cannot be admitted yet wait in a priority queue: interactive
+before batch, FIFO within a priority. They are rejected only when the
+queue is full or their wait limit runs out. A 429 from the provider pauses
+all admissions for its ``Retry-After``.
+"""
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from .llm_metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+CHARS_PER_TOKEN = 4
+
+
+class RateLimitRejected(RuntimeError):
+    """Raised when a request cannot be admitted within its wait limit"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)"""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_queue: int = 200):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = Counter()
+        self._queue_wait = {priority: LatencyTracker() for priority in PRIORITY_NAMES}
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """Block until admitted and return the seconds spent queued"""
+        # A request larger than the whole budget would never fit; let it drain the bucket instead
+        cost = min(float(tokens), float(self.tokens_per_minute))
+        entry = (priority, next(self._sequence))
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._stats['rejected_queue_full'] += 1
+                raise RateLimitRejected(f"LLM request queue full ({self.max_queue} waiting)")
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_needed(cost, now) if self._queue[0] == entry else None
+                    if wait == 0.0:
+                        self._requests -= 1
+                        self._tokens -= cost
+                        heapq.heappop(self._queue)
+                        self._cond.notify_all()
+                        break
+                    if deadline is not None and now >= deadline:
+                        self._stats['rejected_timeout'] += 1
+                        raise RateLimitRejected(f"waited {now - started:.1f}s for LLM quota")
+                    remaining = deadline - now if deadline is not None else None
+                    self._cond.wait(min(t for t in (wait, remaining, 1.0) if t is not None))
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+        waited = time.monotonic() - started
+        self._queue_wait[priority].record(waited)
+        self._stats['admitted'] += 1
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the provider reports real usage"""
+        with self._cond:
+            self._tokens += min(float(estimated_tokens), float(self.tokens_per_minute)) - actual_tokens
+            self._cond.notify_all()
+
+    def penalize(self, retry_after: float) -> None:
+        """Provider answered 429: hold every admission for ``retry_after`` seconds"""
+        with self._cond:
+            self._stats['throttled_429'] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._requests = min(self._requests, 0.0)
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning("LLM provider rate limited us; pausing requests for %.1fs", retry_after)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill(time.monotonic())
+            stats = dict(self._stats)
+            snapshot = {
+                'queue_depth': len(self._queue),
+                'available_requests': self._requests,
+                'available_tokens': self._tokens,
+            }
+        snapshot.update({
+            'admitted': stats.get('admitted', 0),
+            'rejected_queue_full': stats.get('rejected_queue_full', 0),
+            'rejected_timeout': stats.get('rejected_timeout', 0),
+            'throttled_429': stats.get('throttled_429', 0),
+            'queue_wait': {name: self._queue_wait[priority].summary() for priority, name in PRIORITY_NAMES.items()},
+        })
+        return snapshot
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_needed(self, cost: float, now: float) -> float:
+        """Seconds until both buckets cover the request (0.0 when it fits now)"""
+        if now < self._paused_until:
+            return self._paused_until - now
+        request_wait = max(0.0, 1 - self._requests) * 60 / self.requests_per_minute
+        token_wait = max(0.0, cost - self._tokens) * 60 / self.tokens_per_minute
+        return max(request_wait, token_wait)
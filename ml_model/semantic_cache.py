@@ -0,0 +1,250 @@
+"""Semantic cache of LLM recommendation payloads.
+
+Entries are keyed on the burnout level plus an embedding of the answer set.
+Each answer is embedded separately and the unit vectors are concatenated,
+so the cosine of two keys is the mean per-answer cosine. A fixed Gaussian
+random projection shrinks the key to ``dim`` floats (128 by default, about
+0.5 KB per entry). Vectors live in one contiguous float32 matrix per level,
+so a lookup is a single matrix-vector product. That stays in the
+low-millisecond range at a few hundred thousand entries.
+
+Entries expire after ``ttl_seconds``. Once ``max_entries`` is reached, the
+least recently used entry is evicted.
+
+Only the recommendations are shared between assessments. The LLM summary
+describes one employee's answers, so it is never stored, and a hit carries
+a generic summary for its burnout level instead.
+
+The default threshold is deliberately strict. Mean-pooled DistilBERT
+vectors sit close together even for unrelated answers. Before lowering it,
+run ``calibrate`` (or ``manage.py calibrate_cache``) on held-out pairs
+labelled same/different.
+"""
+import copy
+import logging
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.99
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 300_000
+DEFAULT_DIM = 128
+
+CacheKey = namedtuple('CacheKey', ['index', 'vector'])
+
+# Never shared with another employee's assessment
+PRIVATE_FIELDS = ('raw_response', 'cache', 'token_budget', 'summary')
+SHARED_SUMMARY = (
+    "Recommendations for a {level} burnout level, based on assessments with answers similar to yours."
+)
+
+
+class VectorIndex:
+    """Growable matrix of unit vectors with brute-force cosine search"""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self.size = 0
+        self._vectors = np.empty((capacity, dim), dtype=np.float32)
+        self._created = np.empty(capacity, dtype=np.float64)
+        self._last_used = np.empty(capacity, dtype=np.float64)
+        self._values: List[Any] = []
+
+    def add(self, vector: np.ndarray, value: Any, now: float) -> None:
+        if self.size == len(self._vectors):
+            self._grow()
+        self._vectors[self.size] = vector
+        self._created[self.size] = now
+        self._last_used[self.size] = now
+        self._values.append(value)
+        self.size += 1
+
+    def remove(self, row: int) -> None:
+        # Move the last row into the gap so live rows stay contiguous
+        last = self.size - 1
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._created[row] = self._created[last]
+            self._last_used[row] = self._last_used[last]
+            self._values[row] = self._values[last]
+        self._values.pop()
+        self.size = last
+
+    def nearest(self, vector: np.ndarray) -> Tuple[int, float]:
+        if not self.size:
+            return -1, float('-inf')
+        similarities = self._vectors[:self.size] @ vector
+        row = int(np.argmax(similarities))
+        return row, float(similarities[row])
+
+    def value(self, row: int) -> Any:
+        return self._values[row]
+
+    def touch(self, row: int, now: float) -> None:
+        self._last_used[row] = now
+
+    def created(self, row: int) -> float:
+        return float(self._created[row])
+
+    def least_recently_used(self) -> Tuple[int, float]:
+        row = int(np.argmin(self._last_used[:self.size]))
+        return row, float(self._last_used[row])
+
+    def remove_expired(self, cutoff: float) -> int:
+        expired = np.flatnonzero(self._created[:self.size] < cutoff)
+        # Highest rows first, so the row swapped into each gap is a live one
+        for row in expired[::-1]:
+            self.remove(int(row))
+        return len(expired)
+
+    def _grow(self) -> None:
+        capacity = len(self._vectors) * 2
+        for name in ('_vectors', '_created', '_last_used'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+
+class SemanticRecommendationCache:
+    """Nearest-neighbour cache in front of the LLM recommender"""
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], np.ndarray],
+        threshold: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        dim: Optional[int] = None,
+        seed: int = 0,
+    ):
+        self._embed = embed
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv('LLM_CACHE_THRESHOLD', DEFAULT_THRESHOLD))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv('LLM_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+        self.max_entries = max_entries or int(os.getenv('LLM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        self.dim = dim or int(os.getenv('LLM_CACHE_DIM', DEFAULT_DIM))
+        self.seed = seed
+        self._indexes: Dict[Tuple[str, int], VectorIndex] = {}
+        self._projections: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def key(self, burnout_level: str, responses: List[Dict[str, str]]) -> CacheKey:
+        """Embed an answer set; done outside the lock since it runs the encoder"""
+        answers = [item.get('response', '') for item in responses]
+        embeddings = np.asarray(self._embed(answers), dtype=np.float32)
+        flat = embeddings.reshape(-1) / np.sqrt(max(len(answers), 1))
+        vector = flat @ self._projection(flat.shape[0])
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        return CacheKey((burnout_level, len(answers)), vector)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            self._stats['lookups'] += 1
+            index = self._indexes.get(key.index)
+            row, similarity = index.nearest(key.vector) if index else (-1, float('-inf'))
+            if row >= 0 and index.created(row) < now - self.ttl_seconds:
+                index.remove(row)
+                self._stats['expirations'] += 1
+                row = -1
+            if row < 0 or similarity < self.threshold:
+                self._stats['misses'] += 1
+                return None
+            index.touch(row, now)
+            self._stats['hits'] += 1
+            payload = copy.deepcopy(index.value(row))
+        payload['summary'] = SHARED_SUMMARY.format(level=key.index[0])
+        payload['cache'] = {'hit': True, 'similarity': similarity}
+        return payload
+
+    def put(self, key: CacheKey, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        stored = {name: value for name, value in payload.items() if name not in PRIVATE_FIELDS}
+        with self._lock:
+            index = self._indexes.get(key.index)
+            if index is None:
+                index = self._indexes[key.index] = VectorIndex(self.dim)
+            self._stats['expirations'] += index.remove_expired(now - self.ttl_seconds)
+            while len(self) >= self.max_entries:
+                self._evict_lru()
+            index.add(key.vector, copy.deepcopy(stored), now)
+            self._stats['inserts'] += 1
+
+    def calibrate(self, pairs: List[Tuple[str, List[Dict[str, str]], List[Dict[str, str]], bool]]) -> Dict[str, Any]:
+        """Check the threshold against labelled ``(level, responses_a, responses_b, same)`` pairs.
+
+        ``same`` means one set of recommendations suits both answer sets.
+        Reports the similarity range of each group, the hits the current
+        threshold would allow, and the lowest threshold with no hit on a
+        different pair.
+        """
+        same, different = [], []
+        for level, responses_a, responses_b, is_same in pairs:
+            a, b = self.key(level, responses_a), self.key(level, responses_b)
+            if a.index != b.index:
+                continue  # different levels or answer counts never share an index
+            (same if is_same else different).append(float(a.vector @ b.vector))
+        same, different = np.asarray(same), np.asarray(different)
+
+        def summary(values):
+            if not len(values):
+                return None
+            return {'count': len(values), 'min': float(values.min()), 'median': float(np.median(values)),
+                    'max': float(values.max())}
+
+        safe = float(np.nextafter(np.float32(different.max()), np.float32(1))) if len(different) else None
+        return {
+            'threshold': self.threshold,
+            'same': summary(same),
+            'different': summary(different),
+            'false_hits': int((different >= self.threshold).sum()),
+            'same_hit_rate': float((same >= self.threshold).mean()) if len(same) else None,
+            'min_safe_threshold': safe,
+            'same_hit_rate_at_min_safe': float((same >= safe).mean()) if len(same) and safe is not None else None,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self)
+        lookups = stats.get('lookups', 0)
+        return {
+            'lookups': lookups,
+            'hits': stats.get('hits', 0),
+            'misses': stats.get('misses', 0),
+            'hit_rate': stats.get('hits', 0) / lookups if lookups else 0.0,
+            'inserts': stats.get('inserts', 0),
+            'evictions': stats.get('evictions', 0),
+            'expirations': stats.get('expirations', 0),
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'threshold': self.threshold,
+        }
+
+    def __len__(self) -> int:
+        return sum(index.size for index in self._indexes.values())
+
+    def _evict_lru(self) -> None:
+        candidates = [(index.least_recently_used(), index) for index in self._indexes.values() if index.size]
+        (row, _), index = min(candidates, key=lambda item: item[0][1])
+        index.remove(row)
+        self._stats['evictions'] += 1
+
+    def _projection(self, in_dim: int) -> np.ndarray:
+        projection = self._projections.get(in_dim)
+        if projection is None:
+            rng = np.random.default_rng(self.seed + in_dim)
+            projection = (rng.standard_normal((in_dim, self.dim)) / np.sqrt(self.dim)).astype(np.float32)
+            self._projections[in_dim] = projection
+        return projection
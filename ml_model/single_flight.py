@@ -0,0 +1,160 @@
+"""Single-flight coalescing of identical LLM calls.
+
+When callers run the same key concurrently, the first one (the leader)
+makes the upstream call. The others wait and receive a copy of its result,
+or its exception.
+
+``FileLockStore`` extends this across worker processes on one host. The
+leader holds an ``flock`` on ``<dir>/<key>.lock`` while it works and writes
+its result to ``<key>.json`` before unlocking. A process that finds the
+lock taken waits for it, then reuses that fresh result. If the leader
+failed, it makes the call itself.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class FileLockStore:
+    """Cross-process leader election through lock files in a local directory"""
+
+    def __init__(self, directory: str, wait_timeout: float = 130.0, poll_interval: float = 0.05,
+                 prune_every: int = 100, max_file_age: float = 3600.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.prune_every = prune_every
+        self.max_file_age = max_file_age
+        self._runs = 0
+        self.shared_results = 0
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        base = os.path.join(self.directory, key)
+        with open(base + '.lock', 'a') as handle:
+            if not self._try_lock(handle):
+                arrived = time.time()
+                if self._wait_for_lock(handle):
+                    shared = self._read_result(base + '.json', since=arrived - 1.0)
+                    if shared is not None:
+                        self.shared_results += 1
+                        return shared
+                else:
+                    logger.warning("Timed out waiting for in-flight LLM call %s; calling directly", key[:12])
+                    return fn()
+            try:
+                result = fn()
+                self._write_result(base + '.json', result)
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                self._maybe_prune()
+
+    def _try_lock(self, handle) -> bool:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _wait_for_lock(self, handle) -> bool:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            if self._try_lock(handle):
+                return True
+        return False
+
+    def _read_result(self, path: str, since: float) -> Optional[Any]:
+        try:
+            with open(path) as handle:
+                record = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return record['result'] if record.get('written_at', 0) >= since else None
+
+    def _write_result(self, path: str, result: Any) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump({'written_at': time.time(), 'result': result}, handle)
+        os.replace(tmp_path, path)
+
+    def _maybe_prune(self) -> None:
+        self._runs += 1
+        if self._runs % self.prune_every:
+            return
+        cutoff = time.time() - self.max_file_age
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self, lock_store: Optional[FileLockStore] = None):
+        if lock_store is not None and fcntl is None:
+            logger.warning("fcntl unavailable; LLM calls are only coalesced within this process")
+            lock_store = None
+        self.lock_store = lock_store
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = Counter()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self.lock_store.run(key, fn) if self.lock_store else fn()
+            return copy.deepcopy(call.result)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'calls': stats.get('calls', 0),
+            'coalesced': stats.get('coalesced', 0),
+            'shared_across_workers': self.lock_store.shared_results if self.lock_store else 0,
+        }
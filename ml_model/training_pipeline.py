@@ -1,18 +1,208 @@
 # This contains your training code if you need to retrain
 # You can keep the complex training logic here but only use it when needed
+import copy
+import logging
+import os
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+
 import torch
 import pandas as pd
 import numpy as np
-from torch.utils.data import DataLoader
-from transformers import AdamW, DistilBertTokenizer
+from torch.utils.data import DataLoader, TensorDataset
+from transformers import DistilBertTokenizer
 from sklearn.metrics import r2_score, mean_absolute_error
-import matplotlib.pyplot as plt
 
-from .model_architecture import UltimateBurnoutClassifier, FocalLoss
-from .data_processing import BurnoutDataset, clean_text, ultimate_label_mapping
+from .model_architecture import (
+    DEFAULT_HEAD_DIMS,
+    DEFAULT_HEAD_DROPOUTS,
+    FocalLoss,
+    UltimateBurnoutClassifier,
+    save_checkpoint,
+)
+from .data_processing import BurnoutDataset, clean_text, load_labelled_reviews, ultimate_label_mapping
+
+logger = logging.getLogger(__name__)
+
+TRAINING_DATA_DIR = os.path.join(os.path.dirname(__file__), 'training_data')
+TRAIN_CSV = os.path.join(TRAINING_DATA_DIR, 'train_set.csv')
+VALIDATION_CSV = os.path.join(TRAINING_DATA_DIR, 'validation_set.csv')
+TEST_CSV = os.path.join(TRAINING_DATA_DIR, 'test_set.csv')
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'ultimate_burnout_model.pth')
+
+
+@dataclass
+class TrainingConfig:
+    head_dims: Tuple[int, ...] = DEFAULT_HEAD_DIMS
+    head_dropouts: Tuple[float, ...] = DEFAULT_HEAD_DROPOUTS
+    focal_alpha: float = 1.0
+    focal_gamma: float = 2.0
+    learning_rate: float = 2e-5
+    weight_decay: float = 0.01
+    batch_size: int = 16
+    max_epochs: int = 10
+    patience: int = 2
+    seed: int = 42
+    # Intermediate layers with early-exit heads, trained jointly with the main head
+    exit_layers: Tuple[int, ...] = ()
+    exit_loss_weight: float = 0.3
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def tokenize_texts(tokenizer, texts, max_length=128):
+    """Tokenize a list of texts in one call, padded to a fixed length"""
+    encoding = tokenizer(
+        list(texts),
+        truncation=True,
+        padding='max_length',
+        max_length=max_length,
+        return_tensors='pt'
+    )
+    return encoding['input_ids'], encoding['attention_mask']
+
+
+def build_token_cache(cache_path, max_length=128, train_csv=TRAIN_CSV, validation_csv=VALIDATION_CSV):
+    """Tokenize the train/validation splits once and store the tensors on disk.
+
+    Every trial of a sweep loads this file instead of re-running the tokenizer.
+    """
+    if os.path.exists(cache_path):
+        logger.info("Reusing token cache at %s", cache_path)
+        return cache_path
+
+    tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
+    cache = {'max_length': max_length}
+    for split, csv_path in (('train', train_csv), ('validation', validation_csv)):
+        df = load_labelled_reviews(csv_path)
+        input_ids, attention_mask = tokenize_texts(tokenizer, df['text'], max_length)
+        cache[split] = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'score': torch.tensor(df['burnout_score'].values, dtype=torch.float),
+        }
+        logger.info("Tokenized %d %s rows", len(df), split)
+
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    torch.save(cache, cache_path)
+    return cache_path
+
+
+def load_token_cache(cache_path):
+    """Load a token cache as (train, validation) TensorDatasets"""
+    cache = torch.load(cache_path)
+    return tuple(
+        TensorDataset(
+            cache[split]['input_ids'],
+            cache[split]['attention_mask'],
+            cache[split]['score'],
+        )
+        for split in ('train', 'validation')
+    )
+
+
+def evaluate_model(model, loader, device):
+    """Return (MAE, R²) of the model over a (input_ids, attention_mask, score) loader"""
+    model.eval()
+    predictions, targets = [], []
+    with torch.no_grad():
+        for input_ids, attention_mask, scores in loader:
+            outputs = model(input_ids.to(device), attention_mask.to(device))
+            predictions.append(outputs.reshape(-1).cpu())
+            targets.append(scores.reshape(-1))
+    predictions = torch.cat(predictions).numpy()
+    targets = torch.cat(targets).numpy()
+    return float(mean_absolute_error(targets, predictions)), float(r2_score(targets, predictions))
+
+
+def train_model(config: TrainingConfig, train_dataset, val_dataset, device=None, output_path: Optional[str] = None):
+    """Train one model with early stopping on validation MAE.
+
+    The weights of the best epoch are restored before returning and, when
+    ``output_path`` is given, saved there together with their architecture sidecar.
+    """
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    torch.manual_seed(config.seed)
+    np.random.seed(config.seed)
+
+    model = UltimateBurnoutClassifier(
+        config.head_dims,
+        config.head_dropouts,
+        exit_layers=config.exit_layers,
+    ).to(device)
+    criterion = FocalLoss(alpha=config.focal_alpha, gamma=config.focal_gamma)
+    optimizer = torch.optim.AdamW(
+        [p for p in model.parameters() if p.requires_grad],
+        lr=config.learning_rate,
+        weight_decay=config.weight_decay,
+    )
+
+    train_loader = DataLoader(train_dataset, batch_size=config.batch_size, shuffle=True)
+    val_loader = DataLoader(val_dataset, batch_size=config.batch_size * 4)
+
+    best_mae, best_r2, best_epoch = float('inf'), float('nan'), 0
+    best_state = None
+    epochs_without_improvement = 0
+    epochs_run = 0
+
+    for epoch in range(1, config.max_epochs + 1):
+        model.train()
+        for input_ids, attention_mask, scores in train_loader:
+            optimizer.zero_grad()
+            scores = scores.to(device).reshape(-1)
+            if config.exit_layers:
+                outputs, exit_outputs = model.forward_with_exits(input_ids.to(device), attention_mask.to(device))
+                loss = criterion(outputs, scores) + config.exit_loss_weight * sum(
+                    criterion(exit_output, scores) for exit_output in exit_outputs
+                ) / len(exit_outputs)
+            else:
+                outputs = model(input_ids.to(device), attention_mask.to(device))
+                loss = criterion(outputs.reshape(-1), scores)
+            loss.backward()
+            optimizer.step()
+
+        epochs_run = epoch
+        val_mae, val_r2 = evaluate_model(model, val_loader, device)
+        logger.info("Epoch %d: val MAE %.4f, R² %.4f", epoch, val_mae, val_r2)
+
+        if val_mae < best_mae:
+            best_mae, best_r2, best_epoch = val_mae, val_r2, epoch
+            best_state = copy.deepcopy(model.state_dict())
+            epochs_without_improvement = 0
+        else:
+            epochs_without_improvement += 1
+            if epochs_without_improvement >= config.patience:
+                logger.info("Early stopping after epoch %d (best epoch %d)", epoch, best_epoch)
+                break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    if output_path:
+        save_checkpoint(model, output_path)
+
+    return model, {
+        'best_val_mae': best_mae,
+        'best_val_r2': best_r2,
+        'best_epoch': best_epoch,
+        'epochs_run': epochs_run,
+    }
+
+
+def train_model_if_needed(model_path=DEFAULT_MODEL_PATH, config: Optional[TrainingConfig] = None):
+    """Train the production model from the bundled splits if no checkpoint exists"""
+    if os.path.exists(model_path):
+        logger.info("Model already present at %s, skipping training", model_path)
+        return None
+
+    config = config or TrainingConfig()
+    tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
+    datasets = []
+    for csv_path in (TRAIN_CSV, VALIDATION_CSV):
+        df = load_labelled_reviews(csv_path)
+        input_ids, attention_mask = tokenize_texts(tokenizer, df['text'])
+        scores = torch.tensor(df['burnout_score'].values, dtype=torch.float)
+        datasets.append(TensorDataset(input_ids, attention_mask, scores))
 
-def train_model_if_needed():
-    """Function to retrain model if needed - contains your training logic"""
-    # This would contain your training pipeline
-    # Only implement if you need training capabilities in production
-    pass
\ No newline at end of file
+    _, metrics = train_model(config, *datasets, output_path=model_path)
+    return metrics